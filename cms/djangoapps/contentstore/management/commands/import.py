@@ -21,6 +21,9 @@ class Command(BaseCommand):
         make_option('--nostatic',
                     action='store_true',
                     help='Skip import of static content'),
+        make_option('--incremental',
+                    action='store_true',
+                    help='Only rewrite the blocks and assets which changed since the last import'),
     )
 
     def handle(self, *args, **options):
@@ -30,6 +33,7 @@ class Command(BaseCommand):
 
         data_dir = args[0]
         do_import_static = not (options.get('nostatic', False))
+        incremental = options.get('incremental', False)
         if len(args) > 1:
             course_dirs = args[1:]
         else:
@@ -40,13 +44,19 @@ class Command(BaseCommand):
             dis=do_import_static))
         mstore = modulestore()
 
+        import_changes = {}
         _, course_items = import_from_xml(
             mstore, ModuleStoreEnum.UserID.mgmt_command, data_dir, course_dirs, load_error_modules=False,
             static_content_store=contentstore(), verbose=True,
             do_import_static=do_import_static,
             create_new_course_if_not_present=True,
+            incremental=incremental,
+            import_changes=import_changes,
         )
 
+        for course_id, changes in import_changes.iteritems():
+            self.stdout.write(u'Changes in {0}: {1}\n'.format(course_id, unicode(changes)))
+
         for course in course_items:
             course_id = course.id
             if not are_permissions_roles_seeded(course_id):
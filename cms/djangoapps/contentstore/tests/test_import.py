@@ -10,6 +10,8 @@ from django.conf import settings
 import copy
 
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import ItemFactory
+from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.django import modulestore
 from xmodule.contentstore.django import contentstore
 from opaque_keys.edx.locations import SlashSeparatedCourseKey, AssetLocation
@@ -117,6 +119,78 @@ class ContentStoreImportTest(ModuleStoreTestCase):
         print "static_asset_path = {0}".format(course.static_asset_path)
         self.assertEqual(course.static_asset_path, 'test_import_course')
 
+    def test_incremental_reimport(self):
+        '''
+        An incremental re-import only rewrites what changed and deletes what is no longer in the xml
+        '''
+        module_store, content_store, course = self.load_test_import_course()
+        extra_chapter = ItemFactory.create(
+            parent_location=course.location, category='chapter', display_name='Not in the xml'
+        )
+
+        changes = {}
+        import_from_xml(
+            module_store,
+            self.user.id,
+            'common/test/data/',
+            ['test_import_course'],
+            static_content_store=content_store,
+            do_import_static=False,
+            incremental=True,
+            import_changes=changes,
+        )
+        course_changes = changes[course.id]
+
+        self.assertEqual(course_changes.created, [])
+        self.assertIn(course.location, course_changes.updated)
+        self.assertIn(course.id.make_usage_key('video', 'separate_file_video'), course_changes.unchanged)
+        self.assertIn(
+            AssetLocation.from_deprecated_string('/c4x/edX/test_import_course/asset/should_be_imported.html'),
+            course_changes.unchanged
+        )
+        self.assertEqual(course_changes.deleted, [extra_chapter.location])
+        with self.assertRaises(ItemNotFoundError):
+            module_store.get_item(extra_chapter.location)
+        self.assertNotIn(extra_chapter.location, module_store.get_course(course.id).children)
+
+    def test_incremental_reimport_deletes_leaves(self):
+        '''
+        Blocks that aren't direct only (verticals and their components) are deleted in every revision
+        '''
+        module_store, content_store, course = self.load_test_import_course()
+        sequential = module_store.get_items(course.id, category='sequential')[0]
+        extra_vertical = ItemFactory.create(
+            parent_location=sequential.location, category='vertical', display_name='Not in the xml'
+        )
+        extra_problem = ItemFactory.create(
+            parent_location=extra_vertical.location, category='problem', display_name='Not in the xml either'
+        )
+
+        def reimport():
+            """Re-imports the course incrementally, returning its changes"""
+            changes = {}
+            import_from_xml(
+                module_store,
+                self.user.id,
+                'common/test/data/',
+                ['test_import_course'],
+                static_content_store=content_store,
+                do_import_static=False,
+                incremental=True,
+                import_changes=changes,
+            )
+            return changes[course.id]
+
+        self.assertEqual(
+            set(reimport().deleted), set([extra_vertical.location, extra_problem.location])
+        )
+        remaining = [block.location for block in module_store.get_items(course.id)]
+        self.assertNotIn(extra_vertical.location, remaining)
+        self.assertNotIn(extra_problem.location, remaining)
+
+        # nothing is left behind to be deleted again
+        self.assertEqual(reimport().deleted, [])
+
     def test_asset_import_nostatic(self):
         '''
         This test validates that an image asset is NOT imported when do_import_static=False
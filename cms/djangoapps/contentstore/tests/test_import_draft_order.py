@@ -41,3 +41,26 @@ class DraftReorderTestCase(ModuleStoreTestCase):
         self.assertEqual(course_key.make_usage_key('vertical', 'asecond'), verticals[0])
         self.assertEqual(course_key.make_usage_key('vertical', 'secondsubsection'), verticals[1])
         self.assertEqual(course_key.make_usage_key('vertical', 'zsecond'), verticals[2])
+
+    def test_incremental_reimport_keeps_drafts(self):
+        store = modulestore()
+        _, course_items = import_from_xml(store, self.user.id, 'common/test/data/', ['import_draft_order'])
+        course_key = course_items[0].id
+        sequential_key = course_key.make_usage_key('sequential', '0f4f7649b10141b0bdc9922dcf94515a')
+        verticals = store.get_item(sequential_key).children
+
+        changes = {}
+        import_from_xml(
+            store, self.user.id, 'common/test/data/', ['import_draft_order'],
+            incremental=True, import_changes=changes
+        )
+        course_changes = changes[course_key]
+
+        # the private verticals are neither deleted nor rewritten when they haven't changed
+        self.assertEqual(course_changes.deleted, [])
+        self.assertEqual(course_changes.created, [])
+        for name in ('a', 'b', 'c', 'd', 'z', 'asecond', 'zsecond'):
+            vertical_key = course_key.make_usage_key('vertical', name)
+            self.assertIn(vertical_key, course_changes.unchanged)
+            self.assertNotIn(vertical_key, course_changes.updated)
+        self.assertEqual(verticals, store.get_item(sequential_key).children)
@@ -10,11 +10,14 @@ import tarfile
 import tempfile
 from path import path
 from uuid import uuid4
+from StringIO import StringIO
 
 from django.test.utils import override_settings
 from django.conf import settings
 from contentstore.utils import reverse_course_url
 
+from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.tests.factories import ItemFactory
 
 from contentstore.tests.utils import CourseTestCase
@@ -280,6 +283,23 @@ class ExportTestCase(CourseTestCase):
         resp = self.client.get(self.url + '?_accept=application/x-tgz')
         self._verify_export_succeeded(resp)
 
+    def test_export_targz_contents(self):
+        """
+        The streamed tar.gz holds the course xml, the policies and the assets.
+        """
+        asset_key = StaticContent.compute_location(self.course.id, 'sample.txt')
+        contentstore().save(StaticContent(asset_key, 'sample.txt', 'text/plain', 'sample content', import_path='sample.txt'))
+
+        resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+        self._verify_export_succeeded(resp)
+
+        name = self.course.url_name
+        tar_file = tarfile.open(fileobj=StringIO(resp.content), mode='r:gz')
+        self.assertIn(name + '/course.xml', tar_file.getnames())
+        self.assertEqual(tar_file.extractfile(name + '/static/sample.txt').read(), 'sample content')
+        assets_policy = json.load(tar_file.extractfile(name + '/policies/assets.json'))
+        self.assertEqual(assets_policy['sample.txt']['displayname'], 'sample.txt')
+
     def _verify_export_succeeded(self, resp):
         """ Export success helper method. """
         self.assertEquals(resp.status_code, 200)
@@ -115,6 +115,9 @@ EMAIL_HOST = ENV_TOKENS.get('EMAIL_HOST', EMAIL_HOST)
 EMAIL_PORT = ENV_TOKENS.get('EMAIL_PORT', EMAIL_PORT)
 EMAIL_USE_TLS = ENV_TOKENS.get('EMAIL_USE_TLS', EMAIL_USE_TLS)
 
+XBLOCK_METRICS_SAMPLE_RATE = ENV_TOKENS.get('XBLOCK_METRICS_SAMPLE_RATE', XBLOCK_METRICS_SAMPLE_RATE)
+XBLOCK_METRICS_FLUSH_INTERVAL = ENV_TOKENS.get('XBLOCK_METRICS_FLUSH_INTERVAL', XBLOCK_METRICS_FLUSH_INTERVAL)
+
 LMS_BASE = ENV_TOKENS.get('LMS_BASE')
 # Note that FEATURES['PREVIEW_LMS_BASE'] gets read in from the environment file.
 
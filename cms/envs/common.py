@@ -228,6 +228,10 @@ MIDDLEWARE_CLASSES = (
     # Detects user-requested locale from 'accept-language' header in http request
     'django.middleware.locale.LocaleMiddleware',
 
+    # Invalidates the cached enrollment counts changed by the request
+    # needs to run before TransactionMiddleware, so it invalidates them after the commit
+    'student.middleware.EnrollmentCountsMiddleware',
+
     'django.middleware.transaction.TransactionMiddleware',
     # needs to run after locale middleware (or anything that modifies the request context)
     'edxmako.middleware.MakoMiddleware',
@@ -261,6 +265,12 @@ XBLOCK_MIXINS = (LmsBlockMixin, InheritanceMixin, XModuleMixin)
 # xblocks can be added via advanced settings
 XBLOCK_SELECT_FUNCTION = prefer_xmodules
 
+# XBlock render and handler calls are counted in-process and sent to datadog
+# every XBLOCK_METRICS_FLUSH_INTERVAL seconds. Only this fraction of the calls
+# is timed for the edxapp.xmodule.duration histogram.
+XBLOCK_METRICS_SAMPLE_RATE = 0.1
+XBLOCK_METRICS_FLUSH_INTERVAL = 10
+
 ############################ Modulestore Configuration ################################
 MODULESTORE_BRANCH = 'draft-preferred'
 
@@ -143,6 +143,20 @@ CACHES = {
 
 }
 
+# Check the shared cache on every ConfigurationModel.current(), so that tests
+# don't see configuration left behind in the process-local copies by earlier tests
+CONFIGURATION_LOCAL_CACHE_TIMEOUT = 0
+
+# Don't keep the roles of users in the shared cache, which outlives the
+# database rows (and reused user ids) of each test
+ROLE_CACHE_TIMEOUT = 0
+
+# Likewise for the enrollment counts of courses
+ENROLLMENT_COUNTS_CACHE_TIMEOUT = 0
+
+# Likewise for the cohort memberships of users
+COHORT_CACHE_TIMEOUT = 0
+
 # Add external_auth to Installed apps for testing
 INSTALLED_APPS += ('external_auth', )
 
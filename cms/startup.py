@@ -17,6 +17,8 @@ def run():
 
     add_mimetypes()
 
+    configure_xblock_metrics()
+
 
 def add_mimetypes():
     """
@@ -30,3 +32,15 @@ def add_mimetypes():
     mimetypes.add_type('application/x-font-opentype', '.otf')
     mimetypes.add_type('application/x-font-ttf', '.ttf')
     mimetypes.add_type('application/font-woff', '.woff')
+
+
+def configure_xblock_metrics():
+    """
+    Apply the XBLOCK_METRICS_* settings to the in-process XBlock metrics aggregator.
+    """
+    from xmodule.util.metrics import BLOCK_METRICS
+
+    BLOCK_METRICS.configure(
+        sample_rate=settings.XBLOCK_METRICS_SAMPLE_RATE,
+        flush_interval=settings.XBLOCK_METRICS_FLUSH_INTERVAL,
+    )
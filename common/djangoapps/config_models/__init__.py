@@ -53,6 +53,11 @@ timeout in each ``ConfigurationModel`` by setting the ``cache_timeout`` property
 You can change the name of the cache key used by the ``ConfigurationModel`` by overriding
 the ``cache_key_name`` function.
 
+Each process also keeps its own copy of the current configuration, and only checks a version
+stamp in the shared cache for changes every ``CONFIGURATION_LOCAL_CACHE_TIMEOUT`` seconds
+(5 by default). Saving a new configuration entry clears the version stamp, so the change reaches
+every process within that time.
+
 Extension
 ---------
 
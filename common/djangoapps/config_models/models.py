@@ -1,6 +1,10 @@
 """
 Django Model baseclass for database-backed configuration.
 """
+import time
+from uuid import uuid4
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.cache import get_cache, InvalidCacheBackendError
@@ -10,6 +14,18 @@ try:
 except InvalidCacheBackendError:
     from django.core.cache import cache
 
+# Process-local copies of the current configuration entries, keyed by cache key name,
+# as (time of the next check against the shared cache, version, configuration) tuples.
+_local_cache = {}  # pylint: disable=invalid-name
+
+
+def local_cache_timeout():
+    """
+    The number of seconds a process uses its local copy of a configuration before
+    checking the version stamp in the shared cache for changes.
+    """
+    return getattr(settings, 'CONFIGURATION_LOCAL_CACHE_TIMEOUT', 5)
+
 
 class ConfigurationModel(models.Model):
     """
@@ -35,28 +51,58 @@ class ConfigurationModel(models.Model):
         Clear the cached value when saving a new configuration entry
         """
         super(ConfigurationModel, self).save(*args, **kwargs)
+        # Drop the entry before the version stamp, so a process that misses the stamp in
+        # between can't reload the old entry and stamp it as current
         cache.delete(self.cache_key_name())
+        # Dropping the version stamp makes other processes discard their local copies
+        cache.delete(self.cache_version_key_name())
+        _local_cache.pop(self.cache_key_name(), None)
 
     @classmethod
     def cache_key_name(cls):
         """Return the name of the key to use to cache the current configuration"""
         return 'configuration/{}/current'.format(cls.__name__)
 
+    @classmethod
+    def cache_version_key_name(cls):
+        """Return the name of the key to use to cache the version stamp of the current configuration"""
+        return '{}/version'.format(cls.cache_key_name())
+
     @classmethod
     def current(cls):
         """
         Return the active configuration entry, either from cache,
         from the database, or by creating a new empty entry (which is not
         persisted).
+
+        Each process keeps its own copy of the entry, and only checks the
+        version stamp in the shared cache for changes once every
+        CONFIGURATION_LOCAL_CACHE_TIMEOUT seconds.
         """
-        cached = cache.get(cls.cache_key_name())
-        if cached is not None:
-            return cached
+        key = cls.cache_key_name()
+        now = time.time()
+
+        local = _local_cache.get(key)
+        if local is not None and local[0] > now:
+            return local[2]
+
+        version = cache.get(cls.cache_version_key_name())
+        if local is not None and version is not None and local[1] == version:
+            _local_cache[key] = (now + local_cache_timeout(), version, local[2])
+            return local[2]
+
+        if version is None:
+            version = uuid4().hex
+            cache.set(cls.cache_version_key_name(), version, cls.cache_timeout)
+
+        current = cache.get(key)
+        if current is None:
+            try:
+                current = cls.objects.order_by('-change_date')[0]
+            except IndexError:
+                current = cls()
 
-        try:
-            current = cls.objects.order_by('-change_date')[0]
-        except IndexError:
-            current = cls()
+            cache.set(key, current, cls.cache_timeout)
 
-        cache.set(cls.cache_key_name(), current, cls.cache_timeout)
+        _local_cache[key] = (now + local_cache_timeout(), version, current)
         return current
@@ -5,10 +5,12 @@ Tests of ConfigurationModel
 from django.contrib.auth.models import User
 from django.db import models
 from django.test import TestCase
+from django.test.utils import override_settings
 
 from freezegun import freeze_time
 
 from mock import patch
+from config_models import models as config_models
 from config_models.models import ConfigurationModel
 
 
@@ -30,6 +32,7 @@ class ConfigurationModelTests(TestCase):
     def setUp(self):
         self.user = User()
         self.user.save()
+        config_models._local_cache.clear()  # pylint: disable=protected-access
 
     def test_cache_deleted_on_save(self, mock_cache):
         ExampleConfig(changed_by=self.user).save()
@@ -74,3 +77,73 @@ class ConfigurationModelTests(TestCase):
         ExampleConfig.current()
 
         mock_cache.set.assert_called_with(ExampleConfig.cache_key_name(), first, 300)
+
+
+@patch('config_models.models.cache')
+class ConfigurationModelLocalCacheTests(TestCase):
+    """
+    Tests of the process-local copies of ConfigurationModels
+    """
+    def setUp(self):
+        self.user = User()
+        self.user.save()
+        config_models._local_cache.clear()  # pylint: disable=protected-access
+
+    def use_dict_cache(self, mock_cache):
+        """
+        Back the mocked shared cache with a dict, which is returned.
+        """
+        shared = {}
+        mock_cache.get.side_effect = shared.get
+        mock_cache.set.side_effect = lambda key, value, timeout: shared.__setitem__(key, value)
+        mock_cache.delete.side_effect = lambda key: shared.pop(key, None)
+        return shared
+
+    @override_settings(CONFIGURATION_LOCAL_CACHE_TIMEOUT=60)
+    def test_local_copy_used(self, mock_cache):
+        self.use_dict_cache(mock_cache)
+
+        first = ExampleConfig(changed_by=self.user)
+        first.string_field = 'first'
+        first.save()
+
+        self.assertEquals(ExampleConfig.current().string_field, 'first')
+        calls = mock_cache.get.call_count
+
+        with self.assertNumQueries(0):
+            self.assertEquals(ExampleConfig.current().string_field, 'first')
+        self.assertEquals(mock_cache.get.call_count, calls)
+
+        # Saving in this process drops the local copy
+        second = ExampleConfig(changed_by=self.user)
+        second.string_field = 'second'
+        second.save()
+        self.assertEquals(ExampleConfig.current().string_field, 'second')
+
+    @override_settings(CONFIGURATION_LOCAL_CACHE_TIMEOUT=5)
+    def test_version_checked(self, mock_cache):
+        shared = self.use_dict_cache(mock_cache)
+
+        first = ExampleConfig(changed_by=self.user)
+        first.string_field = 'first'
+        first.save()
+
+        with freeze_time('2014-01-01 00:00:00'):
+            self.assertEquals(ExampleConfig.current().string_field, 'first')
+
+        # The version stamp is unchanged, so the local copy is still used
+        calls = mock_cache.get.call_count
+        with freeze_time('2014-01-01 00:00:10'):
+            self.assertEquals(ExampleConfig.current().string_field, 'first')
+        self.assertEquals(mock_cache.get.call_count, calls + 1)
+
+        # Another process changes the configuration
+        ExampleConfig.objects.filter(pk=first.pk).update(string_field='changed')
+        del shared[ExampleConfig.cache_version_key_name()]
+        del shared[ExampleConfig.cache_key_name()]
+
+        with freeze_time('2014-01-01 00:00:12'):
+            self.assertEquals(ExampleConfig.current().string_field, 'first')
+
+        with freeze_time('2014-01-01 00:00:20'):
+            self.assertEquals(ExampleConfig.current().string_field, 'changed')
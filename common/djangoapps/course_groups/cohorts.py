@@ -3,16 +3,29 @@ This file contains the logic for cohort groups, as exposed internally to the
 forums, and to the cohort admin views.
 """
 
+from django.conf import settings
+from django.core.cache import cache
 from django.http import Http404
 import logging
 import random
 
 from courseware import courses
 from student.models import get_user_by_username_or_email
-from .models import CourseUserGroup
+from .models import CourseUserGroup, cohort_cache_key
 
 log = logging.getLogger(__name__)
 
+# Cached for users that have no cohort in a course, as cohort ids start at 1
+_NO_COHORT = 0
+
+
+def cohort_cache_timeout():
+    """
+    How long (in seconds) a user's cohort membership in a course is cached.
+    If 0, memberships are always read from the database.
+    """
+    return getattr(settings, 'COHORT_CACHE_TIMEOUT', 60 * 60)
+
 
 # tl;dr: global state is bad.  capa reseeds random every time a problem is loaded.  Even
 # if and when that's fixed, it's a good idea to have a local generator to avoid any other
@@ -48,9 +61,34 @@ def get_cohort_id(user, course_key):
     """
     Given a course key and a user, return the id of the cohort that user is
     assigned to in that course.  If they don't have a cohort, return None.
+
+    Unlike get_cohort, this does not need to load the cohort itself once the
+    user's membership is cached.
+    """
+    course = _get_course(course_key)
+    if not course.is_cohorted:
+        return None
+
+    cohort_id = _get_cohort_ids([user.id], course_key)[user.id]
+    if cohort_id is None:
+        cohort = _auto_cohort(user, course)
+        cohort_id = None if cohort is None else cohort.id
+    return cohort_id
+
+
+def get_cohort_ids(user_ids, course_key):
+    """
+    Given a list of user ids and a course key, return a dict of user id to the
+    id of the cohort that user is assigned to in that course, or None if they
+    don't have a cohort.  Users are not auto-cohorted.
+
+    Raises:
+       ValueError if the CourseKey doesn't exist.
     """
-    cohort = get_cohort(user, course_key)
-    return None if cohort is None else cohort.id
+    if not _get_course(course_key).is_cohorted:
+        return dict((user_id, None) for user_id in user_ids)
+
+    return _get_cohort_ids(user_ids, course_key)
 
 
 def is_commentable_cohorted(course_key, commentable_id):
@@ -118,22 +156,39 @@ def get_cohort(user, course_key):
     """
     # First check whether the course is cohorted (users shouldn't be in a cohort
     # in non-cohorted courses, but settings can change after course starts)
-    try:
-        course = courses.get_course_by_id(course_key)
-    except Http404:
-        raise ValueError("Invalid course_key")
-
+    course = _get_course(course_key)
     if not course.is_cohorted:
         return None
 
+    cohort_id = _get_cohort_ids([user.id], course_key)[user.id]
+    if cohort_id is not None:
+        try:
+            return CourseUserGroup.objects.get(id=cohort_id)
+        except CourseUserGroup.DoesNotExist:
+            # Didn't find the group.  We'll go on to create one if needed.
+            pass
+
+    return _auto_cohort(user, course)
+
+
+def _get_course(course_key):
+    """
+    Return the course for the CourseKey.
+
+    Raises:
+       ValueError if the CourseKey doesn't exist.
+    """
     try:
-        return CourseUserGroup.objects.get(course_id=course_key,
-                                            group_type=CourseUserGroup.COHORT,
-                                            users__id=user.id)
-    except CourseUserGroup.DoesNotExist:
-        # Didn't find the group.  We'll go on to create one if needed.
-        pass
+        return courses.get_course_by_id(course_key)
+    except Http404:
+        raise ValueError("Invalid course_key")
+
 
+def _auto_cohort(user, course):
+    """
+    Put the user in a random one of the course's auto_cohort_groups, creating it
+    if needed.  Return the cohort, or None if the course isn't auto-cohorted.
+    """
     if not course.auto_cohort:
         return None
 
@@ -143,22 +198,107 @@ def get_cohort(user, course_key):
         # Nowhere to put user
         log.warning("Course %s is auto-cohorted, but there are no"
                     " auto_cohort_groups specified",
-                    course_key)
+                    course.id)
         return None
 
     # Put user in a random group, creating it if needed
     group_name = local_random().choice(choices)
 
     group, created = CourseUserGroup.objects.get_or_create(
-        course_id=course_key,
+        course_id=course.id,
         group_type=CourseUserGroup.COHORT,
         name=group_name
     )
 
     user.course_groups.add(group)
+    if cohort_cache_timeout():
+        cache.set(cohort_cache_key(user.id, course.id), group.id, cohort_cache_timeout())
     return group
 
 
+def assign_auto_cohorts(course_key, users):
+    """
+    Put each of the users that don't have a cohort in the course into a random
+    one of the course's auto_cohort_groups, with one insert for all of them.
+
+    Arguments:
+        course_key: CourseKey
+        users: a list of Django User objects
+
+    Returns:
+        A dict of cohort name to the number of users newly added to it.  Empty
+        if the course isn't auto-cohorted.
+
+    Raises:
+       ValueError if the CourseKey doesn't exist.
+    """
+    course = _get_course(course_key)
+    if not (course.is_cohorted and course.auto_cohort and course.auto_cohort_groups):
+        return {}
+
+    cohort_ids = _get_cohort_ids([user.id for user in users], course_key)
+    unassigned = [user for user in users if cohort_ids[user.id] is None]
+
+    groups = {}
+    for name in course.auto_cohort_groups:
+        groups[name], created = CourseUserGroup.objects.get_or_create(
+            course_id=course_key,
+            group_type=CourseUserGroup.COHORT,
+            name=name
+        )
+
+    memberships = []
+    for user in unassigned:
+        group = groups[local_random().choice(course.auto_cohort_groups)]
+        memberships.append(CourseUserGroup.users.through(courseusergroup_id=group.id, user_id=user.id))
+
+    # bulk_create doesn't send m2m_changed, so update the cache here
+    CourseUserGroup.users.through.objects.bulk_create(memberships)
+    if cohort_cache_timeout():
+        cache.set_many(dict(
+            (cohort_cache_key(membership.user_id, course_key), membership.courseusergroup_id)
+            for membership in memberships
+        ), cohort_cache_timeout())
+
+    counts = dict((name, 0) for name in groups)
+    group_names = dict((group.id, name) for name, group in groups.items())
+    for membership in memberships:
+        counts[group_names[membership.courseusergroup_id]] += 1
+    return counts
+
+
+def _get_cohort_ids(user_ids, course_key):
+    """
+    Return a dict of user id to the id of the user's cohort in the course (or
+    None), reading through the cache.  Does not check whether the course is
+    cohorted.
+    """
+    cache_keys = dict((cohort_cache_key(user_id, course_key), user_id) for user_id in user_ids)
+    cohort_ids = dict(
+        (cache_keys[cache_key], cohort_id or None)
+        for cache_key, cohort_id in cache.get_many(cache_keys.keys()).items()
+    )
+
+    missing = [user_id for user_id in user_ids if user_id not in cohort_ids]
+    if missing:
+        found = dict(CourseUserGroup.users.through.objects.filter(
+            courseusergroup__course_id=course_key,
+            courseusergroup__group_type=CourseUserGroup.COHORT,
+            user__id__in=missing,
+        ).values_list('user_id', 'courseusergroup_id'))
+
+        if cohort_cache_timeout():
+            cache.set_many(dict(
+                (cohort_cache_key(user_id, course_key), found.get(user_id, _NO_COHORT))
+                for user_id in missing
+            ), cohort_cache_timeout())
+
+        for user_id in missing:
+            cohort_ids[user_id] = found.get(user_id)
+
+    return cohort_ids
+
+
 def get_course_cohorts(course_key):
     """
     Get a list of all the cohorts in the given course.
@@ -0,0 +1,56 @@
+"""
+Management command to put the enrolled students of an auto-cohorted course
+that don't have a cohort yet into one of its auto_cohort_groups.
+"""
+from textwrap import dedent
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from course_groups.cohorts import assign_auto_cohorts
+
+# How many students to look up and assign at once
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    """
+    Assign the active students of the given course that don't have a cohort
+    to a random one of the course's auto_cohort_groups, as get_cohort would
+    do on their first visit to the discussions.
+    """
+    args = "<course_id>"
+    help = dedent(__doc__).strip()
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("Usage: assign_auto_cohorts <course_id>")
+
+        try:
+            course_key = SlashSeparatedCourseKey.from_deprecated_string(args[0])
+        except InvalidKeyError:
+            raise CommandError("Invalid course_id")
+
+        student_ids = list(User.objects.filter(
+            courseenrollment__course_id=course_key,
+            courseenrollment__is_active=True,
+        ).order_by('id').values_list('id', flat=True))
+
+        counts = {}
+        for start in xrange(0, len(student_ids), BATCH_SIZE):
+            students = User.objects.filter(id__in=student_ids[start:start + BATCH_SIZE])
+            try:
+                batch_counts = assign_auto_cohorts(course_key, list(students))
+            except ValueError:
+                raise CommandError("Course {} not found".format(args[0]))
+
+            for name, count in batch_counts.items():
+                counts[name] = counts.get(name, 0) + count
+
+        if not counts:
+            self.stdout.write("No students were assigned to a cohort.\n")
+        for name, count in sorted(counts.items()):
+            self.stdout.write(u"{}: added {} students\n".format(name, count).encode('utf-8'))
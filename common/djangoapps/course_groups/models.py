@@ -1,7 +1,10 @@
 import logging
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import m2m_changed, pre_delete
+from django.dispatch import receiver
 from xmodule_django.models import CourseKeyField
 
 log = logging.getLogger(__name__)
@@ -32,3 +35,47 @@ class CourseUserGroup(models.Model):
     COHORT = 'cohort'
     GROUP_TYPE_CHOICES = ((COHORT, 'Cohort'),)
     group_type = models.CharField(max_length=20, choices=GROUP_TYPE_CHOICES)
+
+
+def cohort_cache_key(user_id, course_key):
+    """
+    The cache key for the user's cohort membership in the course, as kept by
+    course_groups.cohorts.
+    """
+    return u"course_groups.cohort.{}.{}".format(course_key.to_deprecated_string(), user_id)
+
+
+@receiver(m2m_changed, sender=CourseUserGroup.users.through)
+def invalidate_cohort_membership(sender, instance, action, reverse, pk_set, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drop the cached cohort memberships of the users added to or removed from
+    groups.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if reverse:
+        # instance is a User, pk_set holds CourseUserGroup ids
+        if action == 'pre_clear':
+            groups = instance.course_groups.all()
+        else:
+            groups = CourseUserGroup.objects.filter(id__in=pk_set)
+        cache_keys = [cohort_cache_key(instance.id, group.course_id) for group in groups]
+    else:
+        # instance is a CourseUserGroup, pk_set holds User ids
+        if action == 'pre_clear':
+            pk_set = instance.users.values_list('id', flat=True)
+        cache_keys = [cohort_cache_key(user_id, instance.course_id) for user_id in pk_set]
+
+    cache.delete_many(cache_keys)
+
+
+@receiver(pre_delete, sender=CourseUserGroup)
+def invalidate_deleted_group(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drop the cached cohort memberships of the users in a group being deleted.
+    """
+    cache.delete_many([
+        cohort_cache_key(user_id, instance.course_id)
+        for user_id in instance.users.values_list('id', flat=True)
+    ])
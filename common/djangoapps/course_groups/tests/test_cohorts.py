@@ -1,12 +1,14 @@
 import django.test
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.core.cache import cache
 
 from django.test.utils import override_settings
 
 from course_groups.models import CourseUserGroup
-from course_groups.cohorts import (get_cohort, get_course_cohorts,
-                                   is_commentable_cohorted, get_cohort_by_name)
+from course_groups.cohorts import (get_cohort, get_cohort_id, get_cohort_ids, get_course_cohorts,
+                                   is_commentable_cohorted, get_cohort_by_name, add_user_to_cohort,
+                                   assign_auto_cohorts)
 
 from xmodule.modulestore.django import modulestore, clear_existing_modulestores
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
@@ -85,6 +87,7 @@ class TestCohorts(django.test.TestCase):
         Make sure that course is reloaded every time--clear out the modulestore.
         """
         clear_existing_modulestores()
+        cache.clear()
         self.toy_course_key = SlashSeparatedCourseKey("edX", "toy", "2012_Fall")
 
     def test_get_cohort(self):
@@ -254,3 +257,88 @@ class TestCohorts(django.test.TestCase):
         self.assertTrue(
             is_commentable_cohorted(course.id, to_id("Feedback")),
             "Feedback was listed as cohorted.  Should be.")
+
+    @override_settings(COHORT_CACHE_TIMEOUT=60)
+    def test_get_cohort_ids(self):
+        """
+        Make sure get_cohort_ids() looks up many users at once, and caches them.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        self.config_course_cohorts(course, [], cohorted=True)
+
+        users = [User.objects.create(username="test_{0}".format(i), email="a@b{0}.com".format(i))
+                 for i in range(4)]
+        cohort = CourseUserGroup.objects.create(name="TestCohort",
+                                                course_id=course.id,
+                                                group_type=CourseUserGroup.COHORT)
+        cohort.users.add(users[0], users[1])
+        user_ids = [user.id for user in users]
+
+        with self.assertNumQueries(1):
+            cohort_ids = get_cohort_ids(user_ids, course.id)
+        self.assertEqual(cohort_ids, {users[0].id: cohort.id, users[1].id: cohort.id,
+                                      users[2].id: None, users[3].id: None})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cohort_ids(user_ids, course.id), cohort_ids)
+            self.assertEqual(get_cohort_id(users[0], course.id), cohort.id)
+            self.assertIsNone(get_cohort_id(users[2], course.id))
+
+    @override_settings(COHORT_CACHE_TIMEOUT=60)
+    def test_cohort_cache_invalidation(self):
+        """
+        Make sure changes to cohort membership are seen after the membership was cached.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        self.config_course_cohorts(course, [], cohorted=True)
+
+        user = User.objects.create(username="test", email="a@b.com")
+        cohort1 = CourseUserGroup.objects.create(name="TestCohort",
+                                                 course_id=course.id,
+                                                 group_type=CourseUserGroup.COHORT)
+        cohort2 = CourseUserGroup.objects.create(name="TestCohort2",
+                                                 course_id=course.id,
+                                                 group_type=CourseUserGroup.COHORT)
+
+        self.assertIsNone(get_cohort_id(user, course.id))
+
+        add_user_to_cohort(cohort1, user.username)
+        self.assertEqual(get_cohort_id(user, course.id), cohort1.id)
+
+        add_user_to_cohort(cohort2, user.username)
+        self.assertEqual(get_cohort_id(user, course.id), cohort2.id)
+
+        user.course_groups.clear()
+        self.assertIsNone(get_cohort_id(user, course.id))
+
+        cohort1.users.add(user)
+        cohort1.delete()
+        self.assertIsNone(get_cohort_id(user, course.id))
+
+    def test_assign_auto_cohorts(self):
+        """
+        Make sure assign_auto_cohorts() only assigns users that don't have a cohort.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        users = [User.objects.create(username="test_{0}".format(i), email="a@b{0}.com".format(i))
+                 for i in range(10)]
+        cohort = CourseUserGroup.objects.create(name="TestCohort",
+                                                course_id=course.id,
+                                                group_type=CourseUserGroup.COHORT)
+        cohort.users.add(users[0])
+
+        self.config_course_cohorts(course, [], cohorted=True)
+        self.assertEqual(assign_auto_cohorts(course.id, users), {}, "Course isn't auto-cohorted")
+
+        self.config_course_cohorts(course, [], cohorted=True,
+                                   auto_cohort=True,
+                                   auto_cohort_groups=["AutoGroup"])
+        self.assertEqual(assign_auto_cohorts(course.id, users), {"AutoGroup": 9})
+        self.assertEqual(get_cohort(users[0], course.id).id, cohort.id, "users[0] should stay put")
+
+        auto_group = get_cohort_by_name(course.id, "AutoGroup")
+        self.assertEqual(auto_group.users.count(), 9)
+        self.assertEqual(get_cohort_ids([user.id for user in users[1:]], course.id),
+                         dict((user.id, auto_group.id) for user in users[1:]))
+
+        self.assertEqual(assign_auto_cohorts(course.id, users), {"AutoGroup": 0})
@@ -60,18 +60,45 @@ class CourseMode(models.Model):
         found_course_modes = cls.objects.filter(Q(course_id=course_id) &
                                                 (Q(expiration_datetime__isnull=True) |
                                                 Q(expiration_datetime__gte=now)))
-        modes = ([Mode(
-            mode.mode_slug,
-            mode.mode_display_name,
-            mode.min_price,
-            mode.suggested_prices,
-            mode.currency,
-            mode.expiration_datetime
-        ) for mode in found_course_modes])
+        modes = [cls._to_mode(mode) for mode in found_course_modes]
         if not modes:
             modes = [cls.DEFAULT_MODE]
         return modes
 
+    @classmethod
+    def modes_for_courses(cls, course_id_list):
+        """
+        Returns a dict mapping each course id in course_id_list to the list of
+        its non-expired modes, using a single query.
+
+        Courses with no modes set in the table are mapped to the default mode
+        """
+        now = datetime.now(pytz.UTC)
+        found_course_modes = cls.objects.filter(Q(course_id__in=course_id_list) &
+                                                (Q(expiration_datetime__isnull=True) |
+                                                Q(expiration_datetime__gte=now)))
+        modes_by_course = dict((course_id, []) for course_id in course_id_list)
+        for mode in found_course_modes:
+            modes_by_course[mode.course_id].append(cls._to_mode(mode))
+        for course_id, modes in modes_by_course.iteritems():
+            if not modes:
+                modes_by_course[course_id] = [cls.DEFAULT_MODE]
+        return modes_by_course
+
+    @staticmethod
+    def _to_mode(course_mode):
+        """
+        Returns the Mode tuple for a CourseMode row
+        """
+        return Mode(
+            course_mode.mode_slug,
+            course_mode.mode_display_name,
+            course_mode.min_price,
+            course_mode.suggested_prices,
+            course_mode.currency,
+            course_mode.expiration_datetime
+        )
+
     @classmethod
     def modes_for_course_dict(cls, course_id):
         """
@@ -80,6 +107,18 @@ class CourseMode(models.Model):
         """
         return {mode.slug: mode for mode in cls.modes_for_course(course_id)}
 
+    @classmethod
+    def modes_for_courses_dict(cls, course_id_list):
+        """
+        Returns a dict mapping each course id in course_id_list to the
+        dictionary of its non-expired modes keyed by mode slug, using a
+        single query.
+        """
+        return {
+            course_id: {mode.slug: mode for mode in modes}
+            for course_id, modes in cls.modes_for_courses(course_id_list).iteritems()
+        }
+
     @classmethod
     def mode_for_course(cls, course_id, mode_slug):
         """
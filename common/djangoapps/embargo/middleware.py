@@ -44,6 +44,20 @@ from embargo.models import EmbargoedCourse, EmbargoedState, IPFilter
 
 log = logging.getLogger(__name__)
 
+# The process-wide GeoIP database reader, see _geoip_reader
+_GEOIP = None
+
+
+def _geoip_reader():
+    """
+    Return the GeoIP database reader shared by every request this process serves. The database is
+    memory mapped, so opening it once saves re-reading the file on each request.
+    """
+    global _GEOIP  # pylint: disable=global-statement
+    if _GEOIP is None:
+        _GEOIP = pygeoip.GeoIP(settings.GEOIP_PATH, pygeoip.MMAP_CACHE)
+    return _GEOIP
+
 
 class EmbargoMiddleware(object):
     """
@@ -76,11 +90,11 @@ class EmbargoMiddleware(object):
                 response = HttpResponseRedirect(redirect_url) if redirect_url \
                            else HttpResponseForbidden('Access Denied')
 
-            # If we're having performance issues, add caching here
             ip_addr = get_ip(request)
+            ip_filter = IPFilter.current()
 
             # if blacklisted, immediately fail
-            if ip_addr in IPFilter.current().blacklist_ips:
+            if ip_addr in ip_filter.blacklist_ips:
                 if course_is_embargoed:
                     msg = "Embargo: Restricting IP address %s to course %s because IP is blacklisted." % \
                           (ip_addr, course_id)
@@ -90,10 +104,10 @@ class EmbargoMiddleware(object):
                 log.info(msg)
                 return response
 
-            country_code_from_ip = pygeoip.GeoIP(settings.GEOIP_PATH).country_code_by_addr(ip_addr)
+            country_code_from_ip = _geoip_reader().country_code_by_addr(ip_addr)
             is_embargoed = country_code_from_ip in EmbargoedState.current().embargoed_countries_list
             # Fail if country is embargoed and the ip address isn't explicitly whitelisted
-            if is_embargoed and ip_addr not in IPFilter.current().whitelist_ips:
+            if is_embargoed and ip_addr not in ip_filter.whitelist_ips:
                 if course_is_embargoed:
                     msg = "Embargo: Restricting IP address %s to course %s because IP is from country %s." % \
                           (ip_addr, course_id, country_code_from_ip)
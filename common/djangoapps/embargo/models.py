@@ -14,8 +14,10 @@ file and check it in at the same time as your model changes. To do that,
 import ipaddr
 
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 
-from config_models.models import ConfigurationModel
+from config_models.models import ConfigurationModel, cache
 from xmodule_django.models import CourseKeyField, NoneToEmptyManager
 
 
@@ -31,6 +33,13 @@ class EmbargoedCourse(models.Model):
     # Whether or not to embargo
     embargoed = models.BooleanField(default=False)
 
+    # The cache key of the set of embargoed course ids
+    CACHE_KEY = 'embargo/embargoed_course_ids'
+
+    # The number of seconds the set of embargoed course ids is cached. Saving or deleting a
+    # record clears the cached set, so this only bounds how long a stale set could survive.
+    cache_timeout = 600
+
     @classmethod
     def is_embargoed(cls, course_id):
         """
@@ -38,11 +47,22 @@ class EmbargoedCourse(models.Model):
 
         If course has not been explicitly embargoed, returns False.
         """
-        try:
-            record = cls.objects.get(course_id=course_id)
-            return record.embargoed
-        except cls.DoesNotExist:
+        if course_id is None:
             return False
+        return unicode(course_id) in cls.embargoed_course_ids()
+
+    @classmethod
+    def embargoed_course_ids(cls):
+        """
+        Returns the set of ids (as unicode strings) of the embargoed courses, from the cache if possible.
+        """
+        course_ids = cache.get(cls.CACHE_KEY)
+        if course_ids is None:
+            course_ids = frozenset(
+                unicode(record.course_id) for record in cls.objects.filter(embargoed=True)
+            )
+            cache.set(cls.CACHE_KEY, course_ids, cls.cache_timeout)
+        return course_ids
 
     def __unicode__(self):
         not_em = "Not "
@@ -89,10 +109,19 @@ class IPFilter(ConfigurationModel):
     class IPFilterList(object):
         """
         Represent a list of IP addresses with support of networks.
+
+        The networks are indexed by IP version and prefix length, so checking an address
+        costs one set lookup per distinct prefix length rather than a scan of every network.
         """
 
         def __init__(self, ips):
             self.networks = [ipaddr.IPNetwork(ip) for ip in ips]
+            # (ip version, prefix length) -> set of the network addresses, as ints
+            self._prefixes = {}
+            for network in self.networks:
+                self._prefixes.setdefault(
+                    (network.version, network.prefixlen), set()
+                ).add(int(network.network))
 
         def __iter__(self):
             for network in self.networks:
@@ -104,26 +133,52 @@ class IPFilter(ConfigurationModel):
             except ValueError:
                 return False
 
-            for network in self.networks:
-                if network.Contains(ip):
+            address = int(ip)
+            for (version, prefixlen), network_addresses in self._prefixes.iteritems():
+                if version != ip.version:
+                    continue
+                host_bits = ip.max_prefixlen - prefixlen
+                if (address >> host_bits) << host_bits in network_addresses:
                     return True
 
             return False
 
+    # A process-wide cache of the compiled IPFilterLists, keyed by the comma-separated list they're
+    # built from. The lists are only edited through the admin, so this stays tiny.
+    _compiled_lists = {}
+
+    @classmethod
+    def _compile(cls, addresses):
+        """
+        Return the IPFilterList of the comma-separated addresses, compiling it only the first time
+        """
+        if addresses == '':
+            return []
+        compiled = cls._compiled_lists.get(addresses)
+        if compiled is None:
+            compiled = cls.IPFilterList([addr.strip() for addr in addresses.split(',')])
+            cls._compiled_lists[addresses] = compiled
+        return compiled
+
     @property
     def whitelist_ips(self):
         """
         Return a list of valid IP addresses to whitelist
         """
-        if self.whitelist == '':
-            return []
-        return self.IPFilterList([addr.strip() for addr in self.whitelist.split(',')])  # pylint: disable=no-member
+        return self._compile(self.whitelist)
 
     @property
     def blacklist_ips(self):
         """
         Return a list of valid IP addresses to blacklist
         """
-        if self.blacklist == '':
-            return []
-        return self.IPFilterList([addr.strip() for addr in self.blacklist.split(',')])  # pylint: disable=no-member
+        return self._compile(self.blacklist)
+
+
+@receiver(post_save, sender=EmbargoedCourse)
+@receiver(post_delete, sender=EmbargoedCourse)
+def clear_embargoed_course_ids(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Clear the cached set of embargoed course ids when an EmbargoedCourse changes
+    """
+    cache.delete(EmbargoedCourse.CACHE_KEY)
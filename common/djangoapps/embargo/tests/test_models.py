@@ -3,10 +3,15 @@ from django.test import TestCase
 
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from embargo.models import EmbargoedCourse, EmbargoedState, IPFilter
+from config_models.models import cache
 
 
 class EmbargoModelsTest(TestCase):
     """Test each of the 3 models in embargo.models"""
+    def tearDown(self):
+        # Explicitly clear the configuration cache so tests don't interfere with each other
+        cache.clear()
+
     def test_course_embargo(self):
         course_id = SlashSeparatedCourseKey('abc', '123', 'doremi')
         # Test that course is not authorized by default
@@ -95,3 +100,34 @@ class EmbargoModelsTest(TestCase):
         self.assertTrue('1.1.0.1' in cblacklist)
         self.assertTrue('1.1.1.0' in cblacklist)
         self.assertFalse('1.2.0.0' in cblacklist)
+
+    def test_ip_mixed_networks_blocking(self):
+        blacklist = '1.1.0.0/16, 10.0.0.1, 2001:db8::/32, 172.16.5.0/24'
+
+        IPFilter(blacklist=blacklist).save()
+
+        cblacklist = IPFilter.current().blacklist_ips
+        self.assertTrue('1.1.255.255' in cblacklist)
+        self.assertTrue('10.0.0.1' in cblacklist)
+        self.assertFalse('10.0.0.2' in cblacklist)
+        self.assertTrue('172.16.5.200' in cblacklist)
+        self.assertFalse('172.16.6.1' in cblacklist)
+        self.assertTrue('2001:db8::1' in cblacklist)
+        self.assertFalse('2001:db9::1' in cblacklist)
+        self.assertFalse('not an ip' in cblacklist)
+        # the compiled list is reused for as long as the configuration is unchanged
+        self.assertIs(IPFilter.current().blacklist_ips, cblacklist)
+
+    def test_embargoed_course_ids_cached(self):
+        course_id = SlashSeparatedCourseKey('abc', '123', 'doremi')
+        EmbargoedCourse(course_id=course_id, embargoed=True).save()
+        self.assertTrue(EmbargoedCourse.is_embargoed(course_id))
+
+        with self.assertNumQueries(0):
+            self.assertTrue(EmbargoedCourse.is_embargoed(course_id))
+            self.assertFalse(EmbargoedCourse.is_embargoed(SlashSeparatedCourseKey('abc', '123', 'other')))
+            self.assertFalse(EmbargoedCourse.is_embargoed(None))
+
+        # deleting the record clears the cached set
+        EmbargoedCourse.objects.get(course_id=course_id).delete()
+        self.assertFalse(EmbargoedCourse.is_embargoed(course_id))
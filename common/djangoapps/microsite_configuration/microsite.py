@@ -14,6 +14,10 @@ from django.conf import settings
 CURRENT_REQUEST_CONFIGURATION = threading.local()
 CURRENT_REQUEST_CONFIGURATION.data = {}
 
+# Whether each microsite template override path exists. Microsite templates
+# are deployed with the code, so this is only looked up once per process.
+_TEMPLATE_OVERRIDE_EXISTS = {}
+
 
 def has_configuration_set():
     """
@@ -62,7 +66,10 @@ def get_template_path(relative_path):
     if microsite_template_path:
         search_path = os.path.join(microsite_template_path, relative_path)
 
-        if os.path.isfile(search_path):
+        if search_path not in _TEMPLATE_OVERRIDE_EXISTS:
+            _TEMPLATE_OVERRIDE_EXISTS[search_path] = os.path.isfile(search_path)
+
+        if _TEMPLATE_OVERRIDE_EXISTS[search_path]:
             path = '{0}/templates/{1}'.format(
                 get_value('microsite_name'),
                 relative_path
@@ -2,8 +2,13 @@
 Some additional unit tests for Microsite logic. The LMS covers some of the Microsite testing, this adds
 some additional coverage
 """
+import os.path
+
 import django.test
+from django.conf import settings
+from mock import patch
 
+from microsite_configuration import microsite
 from microsite_configuration.microsite import get_value_for_org
 
 
@@ -24,3 +29,20 @@ class TestMicrosites(django.test.TestCase):
         # now test when we call in a value Microsite ORG, note this is defined in test.py configuration
         value = get_value_for_org("TestMicrositeX", "university", "default_value")
         self.assertEquals(value, "test_microsite")
+
+    def test_get_template_path(self):
+        """
+        Make sure template overrides are found, and only looked up on disk once
+        """
+        microsite.CURRENT_REQUEST_CONFIGURATION.data = {
+            'microsite_name': 'test_microsite',
+            'template_dir': settings.MICROSITE_ROOT_DIR / 'test_microsite' / 'templates',
+        }
+        try:
+            with patch('microsite_configuration.microsite.os.path.isfile', wraps=os.path.isfile) as mock_isfile:
+                for __ in xrange(3):
+                    self.assertEquals(microsite.get_template_path('footer.html'), 'test_microsite/templates/footer.html')
+                    self.assertEquals(microsite.get_template_path('not-overridden.html'), 'not-overridden.html')
+                self.assertLessEqual(mock_isfile.call_count, 2)
+        finally:
+            microsite.clear()
@@ -0,0 +1,20 @@
+"""
+A cache that is cleared at the start and end of every request.
+"""
+from request_cache.middleware import RequestCache
+
+
+def get_cache(name):
+    """
+    Return the request cache namespace named `name`. The returned dict lives
+    only until the end of the current request.
+    """
+    return RequestCache.get_request_cache(name)
+
+
+def get_current_request():
+    """
+    Return the request being processed by this thread, or None outside of a
+    request (e.g. in management commands, celery tasks and unit tests).
+    """
+    return RequestCache.get_current_request()
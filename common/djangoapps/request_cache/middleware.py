@@ -5,16 +5,35 @@ _request_cache_threadlocal.data = {}
 
 class RequestCache(object):
     @classmethod
-    def get_request_cache(cls):
-        return _request_cache_threadlocal
-            
-    def clear_request_cache(self):
+    def get_request_cache(cls, name=None):
+        """
+        Return the threadlocal request cache. If `name` is given, return the
+        dict namespace stored under that name in the cache's data, creating it
+        if necessary.
+        """
+        if name is None:
+            return _request_cache_threadlocal
+        if not hasattr(_request_cache_threadlocal, 'data'):
+            _request_cache_threadlocal.data = {}
+        return _request_cache_threadlocal.data.setdefault(name, {})
+
+    @classmethod
+    def clear_request_cache(cls):
         _request_cache_threadlocal.data = {}
 
+    @classmethod
+    def get_current_request(cls):
+        """
+        Return the request this thread is processing, or None outside of a request.
+        """
+        return getattr(_request_cache_threadlocal, 'request', None)
+
     def process_request(self, request):
         self.clear_request_cache()
+        _request_cache_threadlocal.request = request
         return None
 
     def process_response(self, request, response):
         self.clear_request_cache()
-        return response
\ No newline at end of file
+        _request_cache_threadlocal.request = None
+        return response
@@ -53,3 +53,18 @@ class MidcourseReverificationWindow(ValidateOnSaveMixin, models.Model):
             return cls.objects.get(course_id=course_id, start_date__lte=date, end_date__gte=date)
         except cls.DoesNotExist:
             return None
+
+    @classmethod
+    def get_windows(cls, course_id_list, date):
+        """
+        Returns a dict mapping each course id in course_id_list to the window
+        that is open for it on the given date, using a single query. Courses
+        with no open window, or with more than one, are mapped to None.
+        """
+        windows = dict((course_id, []) for course_id in course_id_list)
+        for window in cls.objects.filter(course_id__in=course_id_list, start_date__lte=date, end_date__gte=date):
+            windows[window.course_id].append(window)
+        return dict(
+            (course_id, course_windows[0] if len(course_windows) == 1 else None)
+            for course_id, course_windows in windows.iteritems()
+        )
@@ -0,0 +1,49 @@
+"""
+Precompute the anonymous user ids for every learner enrolled in a course.
+
+Creates the per-course and per-student AnonymousUserId rows in bulk, so that
+module rendering, grading and reports find them already saved. To run, use
+the following:
+
+./manage.py lms backfill_anonymous_ids COURSE_ID
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from student.models import ANONYMOUS_ID_CHUNK_SIZE, anonymous_ids_for_users
+
+
+class Command(BaseCommand):
+    """Backfill the AnonymousUserId table for a course's enrollments."""
+
+    args = "<course_id>"
+
+    help = """Create the anonymous user ids of all learners enrolled in a course
+
+    Both the per-course and the per-student anonymous ids are created, in
+    batches of users.
+    """
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("Usage: backfill_anonymous_ids %s" % Command.args)
+
+        try:
+            course_key = CourseKey.from_string(args[0])
+        except InvalidKeyError:
+            course_key = SlashSeparatedCourseKey.from_deprecated_string(args[0])
+
+        user_ids = list(
+            User.objects.filter(courseenrollment__course_id=course_key).values_list('id', flat=True).distinct()
+        )
+        for start in xrange(0, len(user_ids), ANONYMOUS_ID_CHUNK_SIZE):
+            users = User.objects.filter(id__in=user_ids[start:start + ANONYMOUS_ID_CHUNK_SIZE])
+            anonymous_ids_for_users(users, course_key)
+            anonymous_ids_for_users(users, None)
+
+        self.stdout.write(
+            "Backfilled anonymous ids for %d users in %s\n" % (len(user_ids), course_key.to_deprecated_string())
+        )
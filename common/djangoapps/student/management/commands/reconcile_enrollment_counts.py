@@ -0,0 +1,47 @@
+"""
+Recompute the denormalized enrollment counters from the enrollment table.
+
+Enrollments update the counters as they are saved; run this periodically
+(e.g. from cron) to correct the counters for changes that bypassed the model,
+such as queryset updates.
+
+To run, use the following:
+
+./manage.py lms reconcile_enrollment_counts [COURSE_ID ...]
+
+With no course ids, the counters of every course are recomputed in bulk.
+"""
+from django.core.management.base import BaseCommand
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from student.models import CourseEnrollmentCount
+
+
+class Command(BaseCommand):
+    """Reconcile CourseEnrollmentCount with CourseEnrollment."""
+
+    args = "[<course_id> ...]"
+
+    help = """Recompute the per-course, per-mode enrollment counters
+
+    Counts the active enrollments of the given courses (or of all courses),
+    corrects any counter that disagrees and invalidates the cached counts.
+    """
+
+    def handle(self, *args, **options):
+        if not args:
+            counts = CourseEnrollmentCount.reconcile()
+            self.stdout.write("Reconciled {} enrollment counters\n".format(len(counts)))
+            return
+
+        for course_id in args:
+            try:
+                course_key = CourseKey.from_string(course_id)
+            except InvalidKeyError:
+                course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
+            counts = CourseEnrollmentCount.reconcile(course_key)
+            self.stdout.write("Reconciled {}: {} active enrollments\n".format(
+                course_key.to_deprecated_string(), sum(counts.values())
+            ))
@@ -1,11 +1,12 @@
 """
 Middleware that checks user standing for the purpose of keeping users with
-disabled accounts from accessing the site.
+disabled accounts from accessing the site, and middleware that keeps the
+cached enrollment counts consistent with the request's transaction.
 """
 from django.http import HttpResponseForbidden
 from django.utils.translation import ugettext as _
 from django.conf import settings
-from student.models import UserStanding
+from student.models import CourseEnrollmentCount, UserStanding
 
 class UserStandingMiddleware(object):
     """
@@ -35,3 +36,17 @@ class UserStandingMiddleware(object):
                             link_end=u'</a>'
                         )
                 return HttpResponseForbidden(msg)
+
+
+class EnrollmentCountsMiddleware(object):
+    """
+    Invalidates the cached enrollment counts of the courses whose counts changed while
+    handling the request, once its transaction has ended. Other processes may have
+    cached the counts as they were before the change was committed or rolled back.
+
+    This must be listed before TransactionMiddleware, so that it runs after the
+    request's transaction has ended.
+    """
+    def process_response(self, request, response):  # pylint: disable=unused-argument
+        CourseEnrollmentCount.invalidate_changed_counts()
+        return response
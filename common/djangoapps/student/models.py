@@ -24,9 +24,11 @@ from django.utils import timezone
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.signals import user_logged_in, user_logged_out
-from django.db import models, IntegrityError
-from django.db.models import Count
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, F
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver, Signal
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import ugettext_noop
 from django_countries import CountryField
@@ -37,7 +39,6 @@ from importlib import import_module
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 import lms.lib.comment_client as cc
-from util.query import use_read_replica_if_available
 from xmodule_django.models import CourseKeyField, NoneToEmptyManager
 from opaque_keys.edx.keys import CourseKey
 from functools import total_ordering
@@ -46,6 +47,7 @@ from certificates.models import GeneratedCertificate
 from course_modes.models import CourseMode
 
 from ratelimitbackend import admin
+from request_cache import get_cache, get_current_request
 
 unenroll_done = Signal(providing_args=["course_enrollment"])
 log = logging.getLogger(__name__)
@@ -71,6 +73,56 @@ class AnonymousUserId(models.Model):
     unique_together = (user, course_id)
 
 
+# Name of the request cache namespace holding known anonymous ids
+ANONYMOUS_ID_REQUEST_CACHE = 'student.anonymous_ids'
+
+# Maximum number of users whose anonymous ids are saved or looked up per query
+ANONYMOUS_ID_CHUNK_SIZE = 500
+
+# Name of the request cache namespace holding the courses whose enrollment counts changed
+ENROLLMENT_COUNTS_REQUEST_CACHE = 'student.enrollment_counts'
+
+
+def _compute_anonymous_id(user_id, course_id):
+    """
+    Return the anonymous id digest for the (user_id, course_id) pair.
+    """
+    # include the secret key as a salt, and to make the ids unique across different LMS installs.
+    hasher = hashlib.md5()
+    hasher.update(settings.SECRET_KEY)
+    hasher.update(unicode(user_id))
+    if course_id:
+        hasher.update(course_id.to_deprecated_string())
+    return hasher.hexdigest()
+
+
+def _anonymous_id_request_cache():
+    """
+    Return a dict mapping anonymous ids to their User. During a request it lives
+    in the request cache; outside of one nothing would clear it, so a new,
+    empty dict is returned instead.
+    """
+    if get_current_request() is None:
+        return {}
+    return get_cache(ANONYMOUS_ID_REQUEST_CACHE)
+
+
+def _remember_anonymous_id(user, course_id, digest, saved=False):
+    """
+    Cache `digest` on the user object and in the request cache, so that both
+    directions of the mapping can be served without queries. `saved` records
+    that the user is known to have an AnonymousUserId row for `course_id`.
+    """
+    # pylint: disable=protected-access
+    if not hasattr(user, '_anonymous_id'):
+        user._anonymous_id = {}
+        user._anonymous_id_saved = set()
+    user._anonymous_id[course_id] = digest
+    if saved:
+        user._anonymous_id_saved.add(course_id)
+    _anonymous_id_request_cache()[digest] = user
+
+
 def anonymous_id_for_user(user, course_id, save=True):
     """
     Return a unique id for a (user, course) pair, suitable for inserting
@@ -85,24 +137,14 @@ def anonymous_id_for_user(user, course_id, save=True):
     if user.is_anonymous():
         return None
 
-    cached_id = getattr(user, '_anonymous_id', {}).get(course_id)
-    if cached_id is not None:
-        return cached_id
-
-    # include the secret key as a salt, and to make the ids unique across different LMS installs.
-    hasher = hashlib.md5()
-    hasher.update(settings.SECRET_KEY)
-    hasher.update(unicode(user.id))
-    if course_id:
-        hasher.update(course_id.to_deprecated_string())
-    digest = hasher.hexdigest()
-
-    if not hasattr(user, '_anonymous_id'):
-        user._anonymous_id = {}  # pylint: disable=protected-access
-
-    user._anonymous_id[course_id] = digest  # pylint: disable=protected-access
+    digest = getattr(user, '_anonymous_id', {}).get(course_id)
+    if digest is not None and (save is False or course_id in user._anonymous_id_saved):  # pylint: disable=protected-access
+        return digest
 
+    if digest is None:
+        digest = _compute_anonymous_id(user.id, course_id)
     if save is False:
+        _remember_anonymous_id(user, course_id, digest)
         return digest
 
     try:
@@ -111,24 +153,107 @@ def anonymous_id_for_user(user, course_id, save=True):
             user=user,
             course_id=course_id
         )
-        if anonymous_user_id.anonymous_user_id != digest:
-            log.error(
-                "Stored anonymous user id {stored!r} for user {user!r} "
-                "in course {course!r} doesn't match computed id {digest!r}".format(
-                    user=user,
-                    course=course_id,
-                    stored=anonymous_user_id.anonymous_user_id,
-                    digest=digest
-                )
-            )
+        _check_stored_anonymous_id(user, course_id, anonymous_user_id.anonymous_user_id, digest)
     except IntegrityError:
         # Another thread has already created this entry, so
         # continue
         pass
+    _remember_anonymous_id(user, course_id, digest, saved=True)
 
     return digest
 
 
+def anonymous_ids_for_users(users, course_id, save=True):
+    """
+    Return a dict mapping user id to the anonymous id of each of `users` in
+    the course, computing the ids for all users at once.
+
+    If `save` is True, the AnonymousUserId rows are created in bulk, so the
+    number of queries depends on the number of users only through
+    ANONYMOUS_ID_CHUNK_SIZE. The ids are cached on each user object and, during
+    a request, in the request cache, so later calls to `anonymous_id_for_user` and
+    `user_by_anonymous_id` for these users don't query the database.
+    """
+    digests = {}
+    users_by_id = {}
+    for user in users:
+        if user.is_anonymous():
+            continue
+        digest = getattr(user, '_anonymous_id', {}).get(course_id)
+        if digest is None:
+            digest = _compute_anonymous_id(user.id, course_id)
+        _remember_anonymous_id(user, course_id, digest)
+        digests[user.id] = digest
+        users_by_id[user.id] = user
+
+    if save:
+        unsaved_ids = [
+            user_id for user_id, user in users_by_id.iteritems()
+            if course_id not in user._anonymous_id_saved  # pylint: disable=protected-access
+        ]
+        for chunk in _chunks(unsaved_ids, ANONYMOUS_ID_CHUNK_SIZE):
+            _save_anonymous_ids(course_id, chunk, digests, users_by_id)
+            for user_id in chunk:
+                _remember_anonymous_id(users_by_id[user_id], course_id, digests[user_id], saved=True)
+
+    return digests
+
+
+def _save_anonymous_ids(course_id, user_ids, digests, users_by_id):
+    """
+    Create the missing AnonymousUserId rows for `user_ids` in one query.
+    """
+    existing = AnonymousUserId.objects.filter(
+        course_id=course_id, user__in=user_ids
+    ).values_list('user', 'anonymous_user_id')
+    existing_ids = set()
+    for user_id, stored in existing:
+        existing_ids.add(user_id)
+        _check_stored_anonymous_id(users_by_id[user_id], course_id, stored, digests[user_id])
+
+    missing = [
+        AnonymousUserId(user_id=user_id, course_id=course_id, anonymous_user_id=digests[user_id])
+        for user_id in user_ids if user_id not in existing_ids
+    ]
+    try:
+        AnonymousUserId.objects.bulk_create(missing)
+    except IntegrityError:
+        # Another thread has created some of these entries, so fall
+        # back to creating the rows one at a time
+        for anonymous_user_id in missing:
+            try:
+                AnonymousUserId.objects.get_or_create(
+                    defaults={'anonymous_user_id': anonymous_user_id.anonymous_user_id},
+                    user_id=anonymous_user_id.user_id,
+                    course_id=course_id
+                )
+            except IntegrityError:
+                pass
+
+
+def _check_stored_anonymous_id(user, course_id, stored, digest):
+    """
+    Log an error if the stored anonymous id doesn't match the computed one.
+    """
+    if stored != digest:
+        log.error(
+            "Stored anonymous user id {stored!r} for user {user!r} "
+            "in course {course!r} doesn't match computed id {digest!r}".format(
+                user=user,
+                course=course_id,
+                stored=stored,
+                digest=digest
+            )
+        )
+
+
+def _chunks(items, chunk_size):
+    """
+    Yields the values from items in chunks of size chunk_size
+    """
+    return (items[i:i + chunk_size] for i in xrange(0, len(items), chunk_size))
+
+
 def user_by_anonymous_id(id):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -141,10 +266,16 @@ def user_by_anonymous_id(id):
     if id is None:
         return None
 
+    cached_users = _anonymous_id_request_cache()
+    if id in cached_users:
+        return cached_users[id]
+
     try:
-        return User.objects.get(anonymoususerid__anonymous_user_id=id)
+        user = User.objects.get(anonymoususerid__anonymous_user_id=id)
     except ObjectDoesNotExist:
         return None
+    cached_users[id] = user
+    return user
 
 
 class UserStanding(models.Model):
@@ -618,6 +749,26 @@ class CourseEnrollment(models.Model):
             "[CourseEnrollment] {}: {} ({}); active: ({})"
         ).format(self.user, self.course_id, self.created, self.is_active)
 
+    def save(self, *args, **kwargs):
+        if transaction.is_managed():
+            super(CourseEnrollment, self).save(*args, **kwargs)
+        else:
+            # Commit the enrollment together with the counter updates of the post_save handler
+            with transaction.commit_on_success():
+                super(CourseEnrollment, self).save(*args, **kwargs)
+            # Readers may have cached the counts from before the commit
+            CourseEnrollmentCount.invalidate_cached_counts([self.course_id])
+
+    def delete(self, *args, **kwargs):
+        if transaction.is_managed():
+            super(CourseEnrollment, self).delete(*args, **kwargs)
+        else:
+            # Commit the deletion together with the counter updates of the post_delete handler
+            with transaction.commit_on_success():
+                super(CourseEnrollment, self).delete(*args, **kwargs)
+            # Readers may have cached the counts from before the commit
+            CourseEnrollmentCount.invalidate_cached_counts([self.course_id])
+
     @classmethod
     def get_or_create_enrollment(cls, user, course_key):
         """
@@ -666,9 +817,8 @@ class CourseEnrollment(models.Model):
 
         'course_id' is the course_id to return enrollments
         """
-        enrollment_number = CourseEnrollment.objects.filter(course_id=course_id, is_active=1).count()
-
-        return enrollment_number
+        # This decides whether students may enroll, so don't trust the cached counts
+        return CourseEnrollmentCount.counts_for_course(course_id, use_cache=False)['total']
 
     @classmethod
     def is_course_full(cls, course):
@@ -935,15 +1085,27 @@ class CourseEnrollment(models.Model):
         Returns a dictionary that stores the total enrollment count for a course, as well as the
         enrollment count for each individual mode.
         """
+        return CourseEnrollmentCount.counts_for_course(course_id)
+
+    @classmethod
+    def count_enrollments(cls, course_id=None):
+        """
+        Counts the active enrollments directly from the enrollment table.
+
+        Returns a dict mapping (course_id, mode) to the number of active
+        enrollments, for `course_id` only if given, else for all courses.
+        """
+        query = cls.objects.filter(is_active=True)
+        if course_id is not None:
+            query = query.filter(course_id=course_id)
         # Unfortunately, Django's "group by"-style queries look super-awkward
-        query = use_read_replica_if_available(cls.objects.filter(course_id=course_id, is_active=True).values('mode').order_by().annotate(Count('mode')))
-        total = 0
-        d = defaultdict(int)
-        for item in query:
-            d[item['mode']] = item['mode__count']
-            total += item['mode__count']
-        d['total'] = total
-        return d
+        query = query.values('course_id', 'mode').order_by().annotate(Count('mode'))
+        # values() returns the raw course id strings
+        course_id_field = cls._meta.get_field('course_id')
+        return dict(
+            ((course_id_field.to_python(item['course_id']), item['mode']), item['mode__count'])
+            for item in query
+        )
 
     def activate(self):
         """Makes this `CourseEnrollment` record active. Saves immediately."""
@@ -964,6 +1126,17 @@ class CourseEnrollment(models.Model):
         For paid/verified certificates, students may receive a refund if they have
         a verified certificate and the deadline for refunds has not yet passed.
         """
+        return self.refundable_given(
+            GeneratedCertificate.certificate_for_student(self.user, self.course_id),
+            CourseMode.mode_for_course(self.course_id, 'verified'),
+        )
+
+    def refundable_given(self, certificate, verified_mode):
+        """
+        Applies the rules of `refundable` to the student's certificate for the course and
+        the course's non-expired verified mode (each None if there isn't one), for callers
+        that already fetched those for many enrollments at once.
+        """
         # In order to support manual refunds past the deadline, set can_refund on this object.
         # On unenrolling, the "unenroll_done" signal calls CertificateItem.refund_cert_callback(),
         # which calls this method to determine whether to refund the order.
@@ -973,14 +1146,270 @@ class CourseEnrollment(models.Model):
             return True
 
         # If the student has already been given a certificate they should not be refunded
-        if GeneratedCertificate.certificate_for_student(self.user, self.course_id) is not None:
+        if certificate is not None:
             return False
 
-        course_mode = CourseMode.mode_for_course(self.course_id, 'verified')
-        if course_mode is None:
-            return False
+        return verified_mode is not None
+
+
+@receiver(post_init, sender=CourseEnrollment)
+def track_enrollment_state(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Remember the persisted state of an enrollment, so that saving it can
+    update the enrollment counters by the difference.
+    """
+    # pylint: disable=protected-access
+    instance._counted_state = (instance.is_active, instance.mode) if instance.pk else None
+
+
+@receiver(post_save, sender=CourseEnrollment)
+def update_enrollment_counts_on_save(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Update the enrollment counters when an enrollment is created, activated,
+    deactivated or changes mode.
+    """
+    # pylint: disable=protected-access
+    new_state = (instance.is_active, instance.mode)
+    CourseEnrollmentCount.apply_change(instance.course_id, instance._counted_state, new_state)
+    instance._counted_state = new_state
+
+
+@receiver(post_delete, sender=CourseEnrollment)
+def update_enrollment_counts_on_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Update the enrollment counters when an enrollment is deleted.
+    """
+    # pylint: disable=protected-access
+    CourseEnrollmentCount.apply_change(instance.course_id, instance._counted_state, None)
+    instance._counted_state = None
+
+
+def enrollment_counts_cache_timeout():
+    """
+    The number of seconds the enrollment counts of a course are kept in the shared cache.
+    If 0, the counts are always read from the database.
+    """
+    return getattr(settings, 'ENROLLMENT_COUNTS_CACHE_TIMEOUT', 60 * 60)
+
+
+def _changed_enrollment_counts():
+    """
+    The set of courses whose enrollment counts the current request has changed. Their cached
+    counts are invalidated again once the request's transaction has ended. Empty outside a request.
+    """
+    if get_current_request() is None:
+        return set()
+    return get_cache(ENROLLMENT_COUNTS_REQUEST_CACHE).setdefault('changed', set())
+
+
+class CourseEnrollmentCount(models.Model):
+    """
+    Denormalized count of the active enrollments in each mode of a course,
+    so that capacity checks and listings don't count the enrollment table.
+
+    Each change to a CourseEnrollment updates these rows with an atomic F()
+    update in the same transaction, so a rolled back enrollment doesn't change
+    them. Capacity checks read the rows; listings read a copy kept in the shared
+    cache, which is invalidated whenever the counts change and again once the
+    transaction that changed them has ended (see `EnrollmentCountsMiddleware`).
+    Changes that bypass the model (such as queryset updates) are corrected with
+    the `reconcile_enrollment_counts` management command.
+    """
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    mode = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (('course_id', 'mode'),)
+
+    def __unicode__(self):
+        return "[CourseEnrollmentCount] {}: {} ({})".format(self.course_id, self.mode, self.count)
+
+    @staticmethod
+    def cache_key(course_id):
+        """
+        Returns the cache key of the counts of `course_id`, stored with the version they were read at.
+        """
+        return u"student.enrollment_counts.{}".format(course_id)
+
+    @staticmethod
+    def version_cache_key(course_id):
+        """
+        Returns the cache key of the current version of the counts of `course_id`.
+        Deleting it invalidates the cached counts.
+        """
+        return u"student.enrollment_counts.{}.version".format(course_id)
+
+    @classmethod
+    def counts_for_course(cls, course_id, use_cache=True):
+        """
+        Returns a dictionary with the active enrollment count for each mode of
+        the course, and the total under the key 'total'.
+
+        The counts are read from the database if `use_cache` is False, as they
+        should be when they decide whether a student may enroll.
+        """
+        if use_cache and enrollment_counts_cache_timeout() and course_id not in _changed_enrollment_counts():
+            counters = cls._cached_counts(course_id)
         else:
-            return True
+            counters = cls._counts_from_db(course_id)
+        counts = defaultdict(int)
+        for mode, count in counters.iteritems():
+            if count:
+                counts[mode] = count
+        counts['total'] = sum(counts.values())
+        return counts
+
+    @classmethod
+    def _counts_from_db(cls, course_id):
+        """
+        Returns a dict mapping mode to count for the course from its counters. Courses
+        that have no counters yet are counted from the enrollment table.
+        """
+        counters = dict(cls.objects.filter(course_id=course_id).values_list('mode', 'count'))
+        if not counters:
+            counters = dict((mode, count) for (__, mode), count in CourseEnrollment.count_enrollments(course_id).iteritems())
+        return counters
+
+    @classmethod
+    def _cached_counts(cls, course_id):
+        """
+        Returns a dict mapping mode to count for the course from the shared cache, reading
+        and caching them if the cache has no copy taken since they last changed.
+        """
+        timeout = enrollment_counts_cache_timeout()
+        version_key = cls.version_cache_key(course_id)
+        counts_key = cls.cache_key(course_id)
+        cached = cache.get_many([version_key, counts_key])
+        version = cached.get(version_key)
+        if version is not None and counts_key in cached and cached[counts_key][0] == version:
+            return cached[counts_key][1]
+        if version is None:
+            cache.add(version_key, uuid.uuid4().hex, timeout)
+            # Another process may have added its version first
+            version = cache.get(version_key)
+
+        # If the counts change while they are being read, the version changes too,
+        # so the copy cached here is never served
+        counts = cls._counts_from_db(course_id)
+        cache.set(cls.cache_key(course_id), (version, counts), timeout)
+        return counts
+
+    @classmethod
+    def invalidate_cached_counts(cls, course_ids):
+        """
+        Invalidates the cached counts of `course_ids`.
+        """
+        cache.delete_many([cls.version_cache_key(course_id) for course_id in course_ids])
+
+    @classmethod
+    def invalidate_changed_counts(cls):
+        """
+        Invalidates the cached counts of the courses whose counts the current request changed.
+        Call this once the request's transaction has been committed or rolled back, as other
+        processes may have cached the counts from before then.
+        """
+        changed = _changed_enrollment_counts()
+        cls.invalidate_cached_counts(changed)
+        changed.clear()
+
+    @classmethod
+    def apply_change(cls, course_id, old_state, new_state):
+        """
+        Adjust the counters of the course for an enrollment changing from
+        old_state to new_state, each of which is an (is_active, mode) tuple
+        or None for an enrollment that doesn't exist.
+
+        This must run in the transaction that saves the enrollment.
+        """
+        deltas = defaultdict(int)
+        if old_state is not None and old_state[0]:
+            deltas[old_state[1]] -= 1
+        if new_state is not None and new_state[0]:
+            deltas[new_state[1]] += 1
+        deltas = dict((mode, delta) for mode, delta in deltas.iteritems() if delta)
+        if not deltas:
+            return
+
+        for mode, delta in deltas.iteritems():
+            updated = cls.objects.filter(course_id=course_id, mode=mode).update(count=F('count') + delta)
+            if not updated:
+                # This mode (or the whole course) has not been counted yet
+                cls._create_counters(course_id, mode, delta)
+
+        cls.invalidate_cached_counts([course_id])
+        _changed_enrollment_counts().add(course_id)
+
+    @classmethod
+    def _create_counters(cls, course_id, mode, delta):
+        """
+        Create the missing counters of the course from the enrollment table, which already
+        reflects the change of `delta` enrollments in `mode` being applied.
+        """
+        existing = set(cls.objects.filter(course_id=course_id).values_list('mode', flat=True))
+        counts = CourseEnrollment.count_enrollments(course_id)
+        for (__, counted_mode), count in counts.iteritems():
+            if counted_mode in existing:
+                continue
+            savepoint = transaction.savepoint()
+            try:
+                cls.objects.create(course_id=course_id, mode=counted_mode, count=count)
+            except IntegrityError:
+                # Another transaction created this counter first, so it counted
+                # the enrollments without this change
+                transaction.savepoint_rollback(savepoint)
+                if counted_mode == mode:
+                    cls.objects.filter(course_id=course_id, mode=mode).update(count=F('count') + delta)
+            else:
+                transaction.savepoint_commit(savepoint)
+
+    @classmethod
+    def reconcile(cls, course_id=None):
+        """
+        Recompute the counters from the enrollment table, for `course_id` only
+        if given, else for all courses, and invalidate their cached counts.
+
+        Returns a dict mapping mode to count for the course if `course_id` is
+        given, else a dict mapping (course_id, mode) to count.
+        """
+        actual = CourseEnrollment.count_enrollments(course_id)
+        if course_id is not None:
+            result = dict((mode, count) for (__, mode), count in actual.iteritems())
+        else:
+            result = dict(actual)
+
+        course_ids = set(counted_course_id for counted_course_id, __ in actual)
+        if course_id is not None:
+            course_ids.add(course_id)
+
+        existing = cls.objects.all()
+        if course_id is not None:
+            existing = existing.filter(course_id=course_id)
+        stale = []
+        for counter in existing:
+            course_ids.add(counter.course_id)
+            count = actual.pop((counter.course_id, counter.mode), 0)
+            if counter.count != count:
+                stale.append((counter, count))
+        for counter, count in stale:
+            cls.objects.filter(pk=counter.pk).update(count=count)
+
+        missing = [
+            cls(course_id=key[0], mode=key[1], count=count)
+            for key, count in actual.iteritems()
+        ]
+        try:
+            cls.objects.bulk_create(missing)
+        except IntegrityError:
+            # Another process created some of these counters, so
+            # set them one at a time
+            for counter in missing:
+                updated = cls.objects.filter(course_id=counter.course_id, mode=counter.mode).update(count=counter.count)
+                if not updated:
+                    counter.save()
+
+        cls.invalidate_cached_counts(course_ids)
+        return result
 
 
 class CourseEnrollmentAllowed(models.Model):
@@ -1022,6 +1451,13 @@ class CourseAccessRole(models.Model):
     class Meta:
         unique_together = ('user', 'org', 'course_id', 'role')
 
+    @staticmethod
+    def roles_cache_key(user_id):
+        """
+        The key under which student.roles.RoleCache caches the roles of the user
+        """
+        return u'student.roles.{}'.format(user_id)
+
     @property
     def _key(self):
         """
@@ -1050,6 +1486,15 @@ class CourseAccessRole(models.Model):
         return "[CourseAccessRole] user: {}   role: {}   org: {}   course: {}".format(self.user.username, self.role, self.org, self.course_id)
 
 
+@receiver(post_save, sender=CourseAccessRole)
+@receiver(post_delete, sender=CourseAccessRole)
+def clear_cached_roles(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Clear the cached roles of the user when one of their CourseAccessRoles changes
+    """
+    cache.delete(CourseAccessRole.roles_cache_key(instance.user_id))
+
+
 class CourseAccessRoleAdmin(admin.ModelAdmin):
     raw_id_fields = ("user",)
 
@@ -5,30 +5,53 @@ adding users, removing users, and listing members
 
 from abc import ABCMeta, abstractmethod
 
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from student.models import CourseAccessRole
 from xmodule_django.models import CourseKeyField
 
 
+def role_cache_timeout():
+    """
+    The number of seconds the roles of a user are kept in the shared cache.
+    Saving or deleting a CourseAccessRole clears the user's cached roles.
+    If 0, the roles are always loaded from the database.
+    """
+    return getattr(settings, 'ROLE_CACHE_TIMEOUT', 60 * 60)
+
+
 class RoleCache(object):
     """
-    A cache of the CourseAccessRoles held by a particular user
+    A cache of the CourseAccessRoles held by a particular user, indexed by (role, course_id, org)
     """
     def __init__(self, user):
-        self._roles = set(
-            CourseAccessRole.objects.filter(user=user).all()
-        )
+        timeout = role_cache_timeout()
+        cache_key = CourseAccessRole.roles_cache_key(user.id)
+
+        roles = cache.get(cache_key) if timeout else None
+        if roles is None:
+            # Stored as the database values of the role, course_id and org, rather than django models,
+            # so they are cheap to cache and to look up
+            roles = frozenset(
+                CourseAccessRole.objects.filter(user=user).values_list('role', 'course_id', 'org')
+            )
+            if timeout:
+                cache.set(cache_key, roles, timeout)
+
+        self._roles = roles
 
     def has_role(self, role, course_id, org):
         """
         Return whether this RoleCache contains a role with the specified role, course_id, and org
         """
-        return any(
-            access_role.role == role and
-            access_role.course_id == course_id and
-            access_role.org == org
-            for access_role in self._roles
-        )
+        # Org wide roles are stored with an empty course_id
+        if course_id is None or course_id is CourseKeyField.Empty:
+            course_id = ''
+        else:
+            course_id = course_id.to_deprecated_string()
+
+        return (role, course_id, org) in self._roles
 
 
 class AccessRole(object):
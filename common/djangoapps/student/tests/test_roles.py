@@ -2,7 +2,9 @@
 Tests of student.roles
 """
 import ddt
+from django.core.cache import cache
 from django.test import TestCase
+from django.test.utils import override_settings
 
 from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory
 from student.tests.factories import AnonymousUserFactory
@@ -191,3 +193,23 @@ class RoleCacheTestCase(TestCase):
     def test_empty_cache(self, role, target):
         cache = RoleCache(self.user)
         self.assertFalse(cache.has_role(*target))
+
+    @override_settings(ROLE_CACHE_TIMEOUT=60)
+    def test_shared_cache(self):
+        cache.clear()
+        role = CourseStaffRole(self.IN_KEY)
+        target = ('staff', self.IN_KEY, 'edX')
+
+        with self.assertNumQueries(1):
+            self.assertFalse(RoleCache(self.user).has_role(*target))
+        with self.assertNumQueries(0):
+            self.assertFalse(RoleCache(self.user).has_role(*target))
+
+        # adding and removing users clears their cached roles
+        role.add_users(self.user)
+        self.assertTrue(RoleCache(self.user).has_role(*target))
+        with self.assertNumQueries(0):
+            self.assertTrue(RoleCache(self.user).has_role(*target))
+
+        role.remove_users(self.user)
+        self.assertFalse(RoleCache(self.user).has_role(*target))
@@ -10,7 +10,9 @@ from datetime import datetime, timedelta
 import pytz
 
 from django.conf import settings
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
 from django.test.utils import override_settings
 from django.test.client import RequestFactory, Client
 from django.contrib.auth.models import User, AnonymousUser
@@ -25,9 +27,14 @@ from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 from mock import Mock, patch
 
-from student.models import anonymous_id_for_user, user_by_anonymous_id, CourseEnrollment, unique_id_for_user
+from student.models import (
+    anonymous_id_for_user, anonymous_ids_for_users, user_by_anonymous_id, AnonymousUserId, CourseEnrollment,
+    CourseEnrollmentCount, unique_id_for_user
+)
+from student.middleware import EnrollmentCountsMiddleware
+from request_cache.middleware import RequestCache
 from student.views import (process_survey_link, _cert_info,
-                           change_enrollment, complete_course_mode_info)
+                           change_enrollment, complete_course_mode_info, get_dashboard_course_info)
 from student.tests.factories import UserFactory, CourseModeFactory
 
 from certificates.models import CertificateStatuses
@@ -251,6 +258,55 @@ class DashboardTest(TestCase):
 
         self.assertFalse(enrollment.refundable())
 
+    def _enroll_in_courses(self, num_courses):
+        """
+        Enroll the user as verified in `num_courses` new courses offering a verified mode,
+        and return the (course, enrollment) pairs.
+        """
+        pairs = []
+        for index in range(num_courses):
+            course = CourseFactory.create(org=self.COURSE_ORG, number="{}_{}".format(self.COURSE_SLUG, index))
+            CourseModeFactory.create(
+                course_id=course.id,
+                mode_slug='verified',
+                mode_display_name='Verified',
+                expiration_datetime=datetime.now(pytz.UTC) + timedelta(days=1)
+            )
+            pairs.append((course, CourseEnrollment.enroll(self.user, course.id, mode='verified')))
+        return pairs
+
+    @patch.dict("django.conf.settings.FEATURES", {'ENABLE_INSTRUCTOR_EMAIL': True, 'REQUIRE_COURSE_EMAIL_AUTH': True})
+    def test_dashboard_course_info_query_count(self):
+        pairs = self._enroll_in_courses(2)
+        # load the user's access roles, which are cached on the user
+        get_dashboard_course_info(self.user, pairs)
+        # one query each for modes, certificates and email authorizations
+        with self.assertNumQueries(3):
+            get_dashboard_course_info(self.user, pairs)
+
+        pairs += self._enroll_in_courses(8)
+        with self.assertNumQueries(3):
+            get_dashboard_course_info(self.user, pairs)
+
+    @unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+    def test_dashboard_course_info_matches_single_course_lookups(self):
+        pairs = self._enroll_in_courses(2)
+        GeneratedCertificateFactory.create(
+            user=self.user,
+            course_id=pairs[0][0].id,
+            status=CertificateStatuses.downloadable,
+            mode='verified'
+        )
+        course_info = get_dashboard_course_info(self.user, pairs)
+        for course, enrollment in pairs:
+            self.assertEqual(
+                course_info['all_course_modes'][course.id],
+                complete_course_mode_info(course.id, enrollment)
+            )
+            self.assertEqual(course.id in course_info['show_refund_option_for'], enrollment.refundable())
+        self.assertEqual(course_info['show_refund_option_for'], frozenset([pairs[1][0].id]))
+
+
 class EnrollInCourseTest(TestCase):
     """Tests enrolling and unenrolling in courses."""
 
@@ -477,6 +533,166 @@ class EnrollInCourseTest(TestCase):
         self.assert_enrollment_mode_change_event_was_emitted(user, course_id, "honor")
 
 
+class EnrollmentCountTest(TestCase):
+    """Tests the denormalized enrollment counters."""
+
+    def setUp(self):
+        patcher = patch('student.models.tracker')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.course_id = SlashSeparatedCourseKey("edX", "Test101", "2013")
+        self.users = [UserFactory.create() for __ in range(3)]
+
+    def assert_counts(self, expected):
+        """
+        Check the counters, and that they agree with the enrollment table.
+        """
+        counts = CourseEnrollment.enrollment_counts(self.course_id)
+        self.assertEqual(dict(counts), expected)
+        self.assertEqual(CourseEnrollment.num_enrolled_in(self.course_id), expected['total'])
+        actual = dict((mode, count) for (__, mode), count in CourseEnrollment.count_enrollments(self.course_id).items())
+        actual['total'] = sum(actual.values())
+        self.assertEqual(actual, expected)
+
+    def test_counts_follow_enrollment_changes(self):
+        self.assert_counts({'total': 0})
+
+        CourseEnrollment.enroll(self.users[0], self.course_id)
+        CourseEnrollment.enroll(self.users[1], self.course_id, mode='verified')
+        CourseEnrollment.enroll(self.users[2], self.course_id, mode='verified')
+        self.assert_counts({'honor': 1, 'verified': 2, 'total': 3})
+
+        CourseEnrollment.enroll(self.users[1], self.course_id, mode='audit')
+        self.assert_counts({'honor': 1, 'verified': 1, 'audit': 1, 'total': 3})
+
+        CourseEnrollment.unenroll(self.users[2], self.course_id)
+        self.assert_counts({'honor': 1, 'audit': 1, 'total': 2})
+
+        CourseEnrollment.objects.get(user=self.users[0], course_id=self.course_id).delete()
+        self.assert_counts({'audit': 1, 'total': 1})
+
+    @override_settings(ENROLLMENT_COUNTS_CACHE_TIMEOUT=60)
+    def test_counts_served_from_cache(self):
+        cache.clear()
+        for user in self.users[:2]:
+            CourseEnrollment.enroll(user, self.course_id)
+        with self.assertNumQueries(1):
+            self.assertEqual(dict(CourseEnrollment.enrollment_counts(self.course_id)), {'honor': 2, 'total': 2})
+        with self.assertNumQueries(0):
+            self.assertEqual(dict(CourseEnrollment.enrollment_counts(self.course_id)), {'honor': 2, 'total': 2})
+
+        # enrolling updates the counter rows and invalidates the cached counts
+        CourseEnrollment.enroll(self.users[2], self.course_id, mode='verified')
+        self.assertEqual(
+            sorted(CourseEnrollmentCount.objects.filter(course_id=self.course_id).values_list('mode', 'count')),
+            [('honor', 2), ('verified', 1)]
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(dict(CourseEnrollment.enrollment_counts(self.course_id)), {
+                'honor': 2, 'verified': 1, 'total': 3
+            })
+
+    @override_settings(ENROLLMENT_COUNTS_CACHE_TIMEOUT=60)
+    def test_cache_miss_racing_enrollment(self):
+        cache.clear()
+        CourseEnrollment.enroll(self.users[0], self.course_id)
+        counts_from_db = CourseEnrollmentCount._counts_from_db  # pylint: disable=protected-access
+
+        def racing_read(course_id):
+            """Reads the counts, then lets an enrollment change them before they are cached"""
+            counts = counts_from_db(course_id)
+            CourseEnrollment.enroll(self.users[1], self.course_id)
+            return counts
+
+        with patch.object(CourseEnrollmentCount, '_counts_from_db', side_effect=racing_read):
+            self.assertEqual(CourseEnrollment.enrollment_counts(self.course_id)['total'], 1)
+        # the counts cached by the racing read are never served
+        self.assertEqual(CourseEnrollment.enrollment_counts(self.course_id)['total'], 2)
+
+    @override_settings(ENROLLMENT_COUNTS_CACHE_TIMEOUT=60)
+    def test_course_full_at_capacity(self):
+        cache.clear()
+        course = Mock(id=self.course_id, max_student_enrollments_allowed=2)
+        CourseEnrollment.enroll(self.users[0], self.course_id)
+        self.assertEqual(CourseEnrollment.enrollment_counts(self.course_id)['total'], 1)
+
+        # capacity checks read the counter rows, never the cached counts
+        with patch.object(CourseEnrollmentCount, '_cached_counts', side_effect=AssertionError):
+            self.assertFalse(CourseEnrollment.is_course_full(course))
+            CourseEnrollment.enroll(self.users[1], self.course_id)
+            self.assertTrue(CourseEnrollment.is_course_full(course))
+            CourseEnrollment.unenroll(self.users[0], self.course_id)
+            self.assertFalse(CourseEnrollment.is_course_full(course))
+            CourseEnrollment.enroll(self.users[2], self.course_id)
+            self.assertTrue(CourseEnrollment.is_course_full(course))
+
+    @override_settings(ENROLLMENT_COUNTS_CACHE_TIMEOUT=60)
+    def test_reconcile(self):
+        cache.clear()
+        for user in self.users:
+            CourseEnrollment.enroll(user, self.course_id)
+        self.assertEqual(CourseEnrollment.num_enrolled_in(self.course_id), 3)
+        # queryset updates bypass the counters
+        CourseEnrollment.objects.filter(user=self.users[0]).update(is_active=False)
+        self.assertEqual(CourseEnrollment.num_enrolled_in(self.course_id), 3)
+
+        CourseEnrollmentCount.reconcile()
+        self.assert_counts({'honor': 2, 'total': 2})
+        self.assertEqual(
+            list(CourseEnrollmentCount.objects.filter(course_id=self.course_id).values_list('mode', 'count')),
+            [('honor', 2)]
+        )
+
+
+@override_settings(ENROLLMENT_COUNTS_CACHE_TIMEOUT=60)
+class EnrollmentCountTransactionTest(TransactionTestCase):
+    """Tests that the enrollment counters and their cached copy follow the request's transaction."""
+
+    def setUp(self):
+        patcher = patch('student.models.tracker')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.clear()
+        self.course_id = SlashSeparatedCourseKey("edX", "Test101", "2013")
+        self.user = UserFactory.create()
+        CourseEnrollment.enroll(UserFactory.create(), self.course_id)
+        self.assertEqual(CourseEnrollment.enrollment_counts(self.course_id)['total'], 1)
+
+    def enroll_in_request(self, end_transaction, concurrent_counts):
+        """
+        Enroll self.user in a request, as handled by TransactionMiddleware and
+        EnrollmentCountsMiddleware. Before the transaction ends with `end_transaction`,
+        another request caches `concurrent_counts` (a dict of mode to count) as the counts
+        it read from the counters.
+        """
+        RequestCache().process_request(Mock())
+        with transaction.commit_manually():
+            CourseEnrollment.enroll(self.user, self.course_id)
+            # the request sees its own enrollment, without caching it
+            self.assertEqual(CourseEnrollment.enrollment_counts(self.course_id)['total'], 2)
+            with patch('student.models.get_current_request', return_value=None):
+                with patch.object(CourseEnrollmentCount, '_counts_from_db', return_value=concurrent_counts):
+                    self.assertEqual(
+                        CourseEnrollment.enrollment_counts(self.course_id)['total'],
+                        sum(concurrent_counts.values())
+                    )
+            end_transaction()
+        EnrollmentCountsMiddleware().process_response(Mock(), Mock())
+        RequestCache().process_response(Mock(), Mock())
+
+    def test_rollback(self):
+        # a request that can see the uncommitted enrollment caches it
+        self.enroll_in_request(transaction.rollback, {'honor': 2})
+        self.assertEqual(CourseEnrollment.enrollment_counts(self.course_id)['total'], 1)
+        self.assertEqual(CourseEnrollment.num_enrolled_in(self.course_id), 1)
+
+    def test_commit(self):
+        # a request that can't see the uncommitted enrollment yet caches the old counts
+        self.enroll_in_request(transaction.commit, {'honor': 1})
+        self.assertEqual(CourseEnrollment.enrollment_counts(self.course_id)['total'], 2)
+        self.assertEqual(CourseEnrollment.num_enrolled_in(self.course_id), 2)
+
+
 @override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
 @unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
 class ChangeEnrollmentViewTest(ModuleStoreTestCase):
@@ -599,6 +815,10 @@ class AnonymousLookupTable(TestCase):
     COURSE_ORG = "EDX"
 
     def setUp(self):
+        # the ids are only cached across user objects during a request
+        middleware = RequestCache()
+        middleware.process_request(Mock())
+        self.addCleanup(middleware.process_response, Mock(), Mock())
         self.course = CourseFactory.create(org=self.COURSE_ORG, display_name=self.COURSE_NAME, number=self.COURSE_SLUG)
         self.assertIsNotNone(self.course)
         self.user = UserFactory()
@@ -621,3 +841,43 @@ class AnonymousLookupTable(TestCase):
         real_user = user_by_anonymous_id(anonymous_id)
         self.assertEqual(self.user, real_user)
         self.assertEqual(anonymous_id, anonymous_id_for_user(self.user, self.course.id, save=False))
+
+    def test_bulk_ids_match_single_ids(self):
+        users = [UserFactory() for __ in range(5)]
+        anonymous_ids = anonymous_ids_for_users(users, self.course.id, save=False)
+        for user in users:
+            RequestCache.clear_request_cache()
+            fresh_user = User.objects.get(id=user.id)
+            self.assertEqual(anonymous_ids[user.id], anonymous_id_for_user(fresh_user, self.course.id, save=False))
+
+    def test_bulk_save_query_count(self):
+        users = [UserFactory() for __ in range(10)]
+        anonymous_id_for_user(users[0], self.course.id)
+        # one query for the existing rows, one bulk insert for the missing ones
+        with self.assertNumQueries(2):
+            anonymous_ids = anonymous_ids_for_users(users, self.course.id)
+        self.assertEqual(AnonymousUserId.objects.filter(course_id=self.course.id).count(), 10)
+
+        # both directions are now served without queries
+        with self.assertNumQueries(0):
+            for user in users:
+                self.assertEqual(anonymous_ids[user.id], anonymous_id_for_user(user, self.course.id))
+                self.assertEqual(user, user_by_anonymous_id(anonymous_ids[user.id]))
+
+    def test_not_cached_outside_request(self):
+        RequestCache().process_response(Mock(), Mock())
+        anonymous_id = anonymous_id_for_user(self.user, self.course.id)
+        # the user object still remembers its saved id
+        with self.assertNumQueries(0):
+            self.assertEqual(anonymous_id, anonymous_id_for_user(self.user, self.course.id))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.user, user_by_anonymous_id(anonymous_id))
+
+    def test_unsaved_id_saved_later(self):
+        anonymous_id = anonymous_id_for_user(self.user, self.course.id, save=False)
+        self.assertFalse(AnonymousUserId.objects.filter(anonymous_user_id=anonymous_id).exists())
+        self.assertEqual(anonymous_id, anonymous_id_for_user(self.user, self.course.id))
+        self.assertTrue(AnonymousUserId.objects.filter(anonymous_user_id=anonymous_id).exists())
+
+    def test_bulk_save_skips_anonymous_users(self):
+        self.assertEqual(anonymous_ids_for_users([AnonymousUser()], self.course.id), {})
@@ -51,7 +51,9 @@ from student.models import (
 from student.forms import PasswordResetFormNoActive
 
 from verify_student.models import SoftwareSecurePhotoVerification, MidcourseReverificationWindow
-from certificates.models import CertificateStatuses, certificate_status_for_student
+from certificates.models import (
+    CertificateStatuses, GeneratedCertificate, certificate_status, certificate_status_for_student
+)
 from dark_lang.models import DarkLangConfig
 
 from xmodule.modulestore.exceptions import ItemNotFoundError
@@ -196,8 +198,13 @@ def reverification_info(course_enrollment_pairs, user, statuses):
             dict["must_reverify"] = [some information]
     """
     reverifications = defaultdict(list)
+    # Only verified enrollments can have reverification info, so only look up their windows
+    windows = MidcourseReverificationWindow.get_windows(
+        [course.id for course, enrollment in course_enrollment_pairs if enrollment.mode == "verified"],
+        datetime.datetime.now(UTC)
+    )
     for (course, enrollment) in course_enrollment_pairs:
-        info = single_course_reverification_info(user, course, enrollment)
+        info = _reverification_info_for_window(user, course, enrollment, windows.get(course.id))
         if info:
             reverifications[info.status].append(info)
 
@@ -224,7 +231,14 @@ def single_course_reverification_info(user, course, enrollment):  # pylint: disa
         OR, None: None if there is no re-verification info for this enrollment
     """
     window = MidcourseReverificationWindow.get_window(course.id, datetime.datetime.now(UTC))
+    return _reverification_info_for_window(user, course, enrollment, window)
+
 
+def _reverification_info_for_window(user, course, enrollment, window):
+    """
+    Implements the logic for single_course_reverification_info, given the
+    course's open reverification window (or None).
+    """
     # If there's no window OR the user is not verified, we don't get reverification info
     if (not window) or (enrollment.mode != "verified"):
         return None
@@ -398,7 +412,7 @@ def register_user(request, extra_context=None):
     return render_to_response('register.html', context)
 
 
-def complete_course_mode_info(course_id, enrollment):
+def complete_course_mode_info(course_id, enrollment, modes=None):
     """
     We would like to compute some more information from the given course modes
     and the user's current enrollment
@@ -406,8 +420,11 @@ def complete_course_mode_info(course_id, enrollment):
     Returns the given information:
         - whether to show the course upsell information
         - numbers of days until they can't upsell anymore
+
+    `modes` is the course's dict of modes, and is looked up if not given.
     """
-    modes = CourseMode.modes_for_course_dict(course_id)
+    if modes is None:
+        modes = CourseMode.modes_for_course_dict(course_id)
     mode_info = {'show_upsell': False, 'days_for_upsell': None}
     # we want to know if the user is already verified and if verified is an
     # option
@@ -421,6 +438,65 @@ def complete_course_mode_info(course_id, enrollment):
     return mode_info
 
 
+def get_dashboard_course_info(user, course_enrollment_pairs):
+    """
+    Gather the per-course information shown on the dashboard for all of the
+    given (course, enrollment) pairs of `user`.
+
+    Course modes, certificates and email authorizations are each fetched for
+    all courses in a single query, so the number of queries doesn't grow with
+    the number of enrollments. Returns a dict with the keys
+    'show_courseware_links_for', 'all_course_modes', 'cert_statuses',
+    'show_email_settings_for' and 'show_refund_option_for', holding the
+    values of the dashboard context entries of the same names.
+    """
+    course_ids = [course.id for course, _enrollment in course_enrollment_pairs]
+
+    modes = CourseMode.modes_for_courses_dict(course_ids)
+    certificates = dict(
+        (certificate.course_id, certificate)
+        for certificate in GeneratedCertificate.objects.filter(user=user, course_id__in=course_ids)
+    )
+    if settings.FEATURES['ENABLE_INSTRUCTOR_EMAIL']:
+        email_enabled_courses = CourseAuthorization.instructor_email_enabled_courses(course_ids)
+    else:
+        email_enabled_courses = set()
+
+    show_courseware_links_for = frozenset(course.id for course, _enrollment in course_enrollment_pairs
+                                          if has_access(user, 'load', course))
+
+    course_modes = {
+        course.id: complete_course_mode_info(course.id, enrollment, modes[course.id])
+        for course, enrollment in course_enrollment_pairs
+    }
+    cert_statuses = {
+        course.id: _cert_info(user, course, certificate_status(certificates.get(course.id)))
+        if course.may_certify() else {}
+        for course, _enrollment in course_enrollment_pairs
+    }
+
+    # only show email settings for Mongo course and when bulk email is turned on
+    show_email_settings_for = frozenset(
+        course.id for course, _enrollment in course_enrollment_pairs if (
+            course.id in email_enabled_courses and
+            modulestore().get_modulestore_type(course.id) != ModuleStoreEnum.Type.xml
+        )
+    )
+
+    show_refund_option_for = frozenset(
+        course.id for course, enrollment in course_enrollment_pairs
+        if enrollment.refundable_given(certificates.get(course.id), modes[course.id].get('verified'))
+    )
+
+    return {
+        'show_courseware_links_for': show_courseware_links_for,
+        'all_course_modes': course_modes,
+        'cert_statuses': cert_statuses,
+        'show_email_settings_for': show_email_settings_for,
+        'show_refund_option_for': show_refund_option_for,
+    }
+
+
 @login_required
 @ensure_csrf_cookie
 def dashboard(request):
@@ -457,20 +533,7 @@ def dashboard(request):
         staff_access = True
         errored_courses = modulestore().get_errored_courses()
 
-    show_courseware_links_for = frozenset(course.id for course, _enrollment in course_enrollment_pairs
-                                          if has_access(request.user, 'load', course))
-
-    course_modes = {course.id: complete_course_mode_info(course.id, enrollment) for course, enrollment in course_enrollment_pairs}
-    cert_statuses = {course.id: cert_info(request.user, course) for course, _enrollment in course_enrollment_pairs}
-
-    # only show email settings for Mongo course and when bulk email is turned on
-    show_email_settings_for = frozenset(
-        course.id for course, _enrollment in course_enrollment_pairs if (
-            settings.FEATURES['ENABLE_INSTRUCTOR_EMAIL'] and
-            modulestore().get_modulestore_type(course.id) != ModuleStoreEnum.Type.xml and
-            CourseAuthorization.instructor_email_enabled(course.id)
-        )
-    )
+    course_info = get_dashboard_course_info(user, course_enrollment_pairs)
 
     # Verification Attempts
     # Used to generate the "you must reverify for course x" banner
@@ -480,9 +543,6 @@ def dashboard(request):
     statuses = ["approved", "denied", "pending", "must_reverify"]
     reverifications = reverification_info(course_enrollment_pairs, user, statuses)
 
-    show_refund_option_for = frozenset(course.id for course, _enrollment in course_enrollment_pairs
-                                       if _enrollment.refundable())
-
     # get info w.r.t ExternalAuthMap
     external_auth_map = None
     try:
@@ -518,14 +578,9 @@ def dashboard(request):
         'external_auth_map': external_auth_map,
         'staff_access': staff_access,
         'errored_courses': errored_courses,
-        'show_courseware_links_for': show_courseware_links_for,
-        'all_course_modes': course_modes,
-        'cert_statuses': cert_statuses,
-        'show_email_settings_for': show_email_settings_for,
         'reverifications': reverifications,
         'verification_status': verification_status,
         'verification_msg': verification_msg,
-        'show_refund_option_for': show_refund_option_for,
         'denied_banner': denied_banner,
         'billing_email': settings.PAYMENT_SUPPORT_EMAIL,
         'language_options': language_options,
@@ -537,6 +592,7 @@ def dashboard(request):
         'platform_name': settings.PLATFORM_NAME,
         'provider_states': [],
     }
+    context.update(course_info)
 
     if settings.FEATURES.get('ENABLE_THIRD_PARTY_AUTH'):
         context['duplicate_provider'] = pipeline.get_duplicate_provider(messages.get_messages(request))
@@ -4,10 +4,15 @@ Unit tests for stub XQueue implementation.
 
 import mock
 import unittest
+import errno
+import httplib
 import json
 import requests
+import socket
 import time
 import copy
+from requests.packages.urllib3.exceptions import MaxRetryError
+from capa.xqueue_interface import XQueueInterface, make_xheader
 from ..xqueue import StubXQueueService, StubXQueueHandler
 
 
@@ -129,6 +134,73 @@ class StubXQueueServiceTest(unittest.TestCase):
         # Check that a notification was sent
         self.post.assert_any_call(register_url, data={'grader_payload': u'test payload'})
 
+    def test_batch_callbacks(self):
+        # Configure the XQueue stub to send grades to the batch callback
+        self.server.config['batch_callbacks'] = True
+
+        callback_url = 'http://127.0.0.1:8000/test_callback'
+        batch_url = 'http://127.0.0.1:8000/test_batch_callback'
+        header = make_xheader(callback_url, 'test_queuekey', 'test_queue', lms_batch_callback_url=batch_url)
+
+        # Submit through the LMS's xqueue client
+        xqueue = self._make_client()
+        self.assertEqual(xqueue.send_to_queue(header, json.dumps({'submission': 'test'})), (0, ''))
+
+        expected_results = json.dumps([{
+            'xqueue_header': header,
+            'xqueue_body': json.dumps({'correct': True, 'score': 1, 'msg': '<div></div>'}),
+        }])
+        self.post.assert_called_with(batch_url, data={'xqueue_results': expected_results})
+
+    def test_client_retries(self):
+        xqueue = self._make_client()
+        header = make_xheader('http://127.0.0.1:8000/test_callback', 'test_queuekey', 'test_queue')
+        original_post = xqueue.session.post
+        refused = requests.exceptions.ConnectionError(
+            MaxRetryError(None, xqueue.url, socket.error(errno.ECONNREFUSED, 'Connection refused'))
+        )
+
+        def flaky_post(*args, **kwargs):
+            """Fails to connect the first time only"""
+            if mock_post.call_count == 1:
+                raise refused
+            return original_post(*args, **kwargs)
+
+        with mock.patch.object(xqueue.session, 'post', side_effect=flaky_post) as mock_post:
+            self.assertEqual(xqueue.send_to_queue(header, json.dumps({'submission': 'test'})), (0, ''))
+        self.assertEqual(mock_post.call_count, 2)
+
+        # Give up after max_retries
+        with mock.patch.object(xqueue.session, 'post', side_effect=refused) as mock_post:
+            self.assertEqual(
+                xqueue.send_to_queue(header, json.dumps({'submission': 'test'})),
+                (1, 'cannot connect to server')
+            )
+        self.assertEqual(mock_post.call_count, xqueue.max_retries + 1)
+
+    def test_client_no_retry_after_send(self):
+        xqueue = self._make_client()
+        header = make_xheader('http://127.0.0.1:8000/test_callback', 'test_queuekey', 'test_queue')
+
+        # Connections lost once the submission was sent aren't retried, as xqueue may have queued it
+        for reason in (httplib.BadStatusLine("''"), socket.error(errno.ECONNRESET, 'Connection reset by peer')):
+            aborted = requests.exceptions.ConnectionError(MaxRetryError(None, xqueue.url, reason))
+            with mock.patch.object(xqueue.session, 'post', side_effect=aborted) as mock_post:
+                self.assertEqual(
+                    xqueue.send_to_queue(header, json.dumps({'submission': 'test'})),
+                    (1, 'cannot connect to server')
+                )
+            self.assertEqual(mock_post.call_count, 1)
+
+    def _make_client(self):
+        """
+        Returns the LMS's xqueue client, pointed at the stub XQueue.
+        """
+        return XQueueInterface(
+            "http://127.0.0.1:{0}".format(self.server.port),
+            {'username': 'test', 'password': 'test'}
+        )
+
     def _post_submission(self, callback_url, lms_key, queue_name, xqueue_body):
         """
         Post a submission to the stub XQueue implementation.
@@ -5,6 +5,7 @@ Configuration values:
     "default" (dict): Default response to be sent to LMS as a grade for a submission
     "<submission>" (dict): Grade response to return for submissions containing the text <submission>
     "register_submission_url" (str): URL to send grader payloads when we receive a submission
+    "batch_callbacks" (bool): Send grade responses to the LMS batch callback URL, when the submission has one
 
 If no grade response is configured, a default response will be returned.
 """
@@ -151,6 +152,12 @@ class StubXQueueHandler(StubHttpRequestHandler):
             'xqueue_body': json.dumps(grade_response)
         }
 
+        # Return the response as a batch of one if configured to
+        batch_url = xqueue_header.get('lms_batch_callback_url')
+        if self.server.config.get('batch_callbacks') and batch_url is not None:
+            postback_url = batch_url
+            data = {'xqueue_results': json.dumps([data])}
+
         post(postback_url, data=data)
         self.log_message("XQueue: sent grading response {0} to {1}".format(data, postback_url))
 
@@ -201,7 +208,7 @@ class StubXQueueService(StubHttpService):
     """
 
     HANDLER_CLASS = StubXQueueHandler
-    NON_QUEUE_CONFIG_KEYS = ['default', 'register_submission_url']
+    NON_QUEUE_CONFIG_KEYS = ['default', 'register_submission_url', 'batch_callbacks']
 
     @property
     def queue_responses(self):
@@ -211,7 +218,7 @@ class StubXQueueService(StubHttpService):
         as the response from the grader.
 
         Every configuration key is a queue name,
-        except for 'default' and 'register_submission_url' which have special meaning
+        except for 'default', 'register_submission_url' and 'batch_callbacks' which have special meaning
         """
         return {
             key:val for key, val in self.config.iteritems()
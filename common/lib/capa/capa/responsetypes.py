@@ -1819,6 +1819,8 @@ class CodeResponse(LoncapaResponse):
             'interface': XQueueInterface object.
             'construct_callback': Per-StudentModule callback URL constructor,
                 defaults to using 'score_update' as the correct dispatch (function).
+            'construct_batch_callback': Optional per-problem callback URL constructor, to which
+                xqueue may return the results of many students at once (function).
             'default_queuename': Default queue name to submit request (string).
         }
 
@@ -1919,10 +1921,12 @@ class CodeResponse(LoncapaResponse):
             str(self.capa_system.seed) + qtime + anonymous_student_id + self.answer_id
         )
         callback_url = self.capa_system.xqueue['construct_callback']()
+        construct_batch_callback = self.capa_system.xqueue.get('construct_batch_callback')
         xheader = xqueue_interface.make_xheader(
             lms_callback_url=callback_url,
             lms_key=queuekey,
-            queue_name=self.queue_name
+            queue_name=self.queue_name,
+            lms_batch_callback_url=construct_batch_callback() if construct_batch_callback else None
         )
 
         # Generate body
@@ -1,10 +1,13 @@
 #
 #  LMS Interface to external queueing system (xqueue)
 #
+import errno
 import hashlib
 import json
 import logging
+import socket
 import requests
+from requests.adapters import HTTPAdapter
 from dogapi import dog_stats_api
 
 
@@ -16,6 +19,29 @@ XQUEUE_METRIC_NAME = 'edxapp.xqueue'
 # Wait time for response from Xqueue.
 XQUEUE_TIMEOUT = 35 # seconds
 
+# Number of connections to xqueue kept alive for reuse
+XQUEUE_POOL_SIZE = 10
+
+# Number of times a request is resent when it couldn't be delivered to xqueue
+XQUEUE_MAX_RETRIES = 2
+
+# Socket errors raised before xqueue could have read a request: the connection was refused or
+# unreachable, or a pooled connection had already been closed by xqueue when the request was written
+UNSENT_ERRNOS = (errno.ECONNREFUSED, errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EPIPE)
+
+
+def request_unsent(err):
+    """
+    Return whether the requests ConnectionError `err` was raised before the request reached the
+    server. Errors raised once it was sent, like 'Connection aborted' or BadStatusLine, return False.
+    """
+    reason = err.args[0] if err.args else None
+    # urllib3 wraps the socket error in a MaxRetryError
+    reason = getattr(reason, 'reason', reason)
+    if isinstance(reason, socket.gaierror):
+        return True
+    return isinstance(reason, socket.error) and reason.errno in UNSENT_ERRNOS
+
 
 def make_hashkey(seed):
     """
@@ -26,21 +52,26 @@ def make_hashkey(seed):
     return h.hexdigest()
 
 
-def make_xheader(lms_callback_url, lms_key, queue_name):
+def make_xheader(lms_callback_url, lms_key, queue_name, lms_batch_callback_url=None):
     """
     Generate header for delivery and reply of queue request.
 
     Xqueue header is a JSON-serialized dict:
         { 'lms_callback_url': url to which xqueue will return the request (string),
           'lms_key': secret key used by LMS to protect its state (string),
-          'queue_name': designate a specific queue within xqueue server, e.g. 'MITx-6.00x' (string)
+          'queue_name': designate a specific queue within xqueue server, e.g. 'MITx-6.00x' (string),
+          'lms_batch_callback_url': optional url to which xqueue may instead return many requests
+                                    with the same 'lms_batch_callback_url' at once (string)
         }
     """
-    return json.dumps({
+    header = {
         'lms_callback_url': lms_callback_url,
         'lms_key': lms_key,
         'queue_name': queue_name
-    })
+    }
+    if lms_batch_callback_url is not None:
+        header['lms_batch_callback_url'] = lms_batch_callback_url
+    return json.dumps(header)
 
 
 def parse_xreply(xreply):
@@ -67,11 +98,19 @@ class XQueueInterface(object):
     Interface to the external grading system
     """
 
-    def __init__(self, url, django_auth, requests_auth=None):
+    def __init__(self, url, django_auth, requests_auth=None,
+                 pool_size=XQUEUE_POOL_SIZE, max_retries=XQUEUE_MAX_RETRIES, timeout=XQUEUE_TIMEOUT):
         self.url = unicode(url)
         self.auth = django_auth
+        self.max_retries = max_retries
+        self.timeout = timeout
         self.session = requests.Session()
         self.session.auth = requests_auth
+        # Keep the connections to xqueue alive between submissions, rather than
+        # opening a new one for each of them
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
     def send_to_queue(self, header, body, files_to_upload=None):
         """
@@ -133,10 +172,27 @@ class XQueueInterface(object):
         return self._http_post(self.url + '/xqueue/submit/', payload, files=files)
 
     def _http_post(self, url, data, files=None):
-        try:
-            r = self.session.post(url, data=data, files=files)
-        except requests.exceptions.ConnectionError, err:
-            log.error(err)
+        """
+        POST `data` and `files` to `url`, resending them up to `self.max_retries` times if
+        they couldn't be delivered. Timeouts and connections lost after the request was sent
+        aren't retried, as xqueue may have received the request.
+        """
+        for attempt in xrange(self.max_retries + 1):
+            if attempt and files:
+                # Need to rewind file pointers
+                for f in files.values():
+                    f.seek(0)
+            try:
+                r = self.session.post(url, data=data, files=files, timeout=self.timeout)
+                break
+            except requests.exceptions.Timeout, err:
+                log.error(err)
+                return (1, 'server timed out')
+            except requests.exceptions.ConnectionError, err:
+                log.error(err)
+                if not request_unsent(err):
+                    return (1, 'cannot connect to server')
+        else:
             return (1, 'cannot connect to server')
 
         if r.status_code not in [200]:
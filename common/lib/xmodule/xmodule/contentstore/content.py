@@ -162,6 +162,12 @@ class StaticContentStream(StaticContent):
                 break
             yield chunk
 
+    def read(self, size=-1):
+        """
+        Reads up to size bytes from the stream, so the content can be used as a file object
+        """
+        return self._stream.read(size)
+
     def close(self):
         self._stream.close()
 
@@ -143,7 +143,6 @@ class MongoContentStore(ContentStore):
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
         """
-        policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
         for asset in assets:
@@ -156,12 +155,22 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
+
+        with open(assets_policy_file, 'w') as f:
+            json.dump(self.get_assets_policy(assets), f)
+
+    @staticmethod
+    def get_assets_policy(assets):
+        """
+        Returns the contents of the assets policy file for the given asset data dictionaries (as returned
+        by get_all_content_for_course): each asset's exportable attributes keyed by its name.
+        """
+        policy = {}
+        for asset in assets:
             for attr, value in asset.iteritems():
                 if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
                     policy.setdefault(asset['asset_key'].name, {})[attr] = value
-
-        with open(assets_policy_file, 'w') as f:
-            json.dump(policy, f)
+        return policy
 
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
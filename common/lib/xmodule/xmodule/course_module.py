@@ -11,6 +11,7 @@ from lazy import lazy
 from opaque_keys.edx.locations import Location
 from opaque_keys.edx.locator import UsageKey
 from xmodule.seq_module import SequenceDescriptor, SequenceModule
+from xmodule.xml_module import thread_xml_parser
 from xmodule.graders import grader_from_conf
 from xmodule.tabs import CourseTabList
 import json
@@ -55,9 +56,6 @@ class StringOrDate(Date):
             return result
 
 
-edx_xml_parser = etree.XMLParser(dtd_validation=False, load_dtd=False,
-                                 remove_comments=True, remove_blank_text=True)
-
 _cached_toc = {}
 
 
@@ -638,7 +636,7 @@ class CourseDescriptor(CourseFields, SequenceDescriptor):
         # bleh, have to parse the XML here to just pull out the url_name attribute
         # I don't think it's stored anywhere in the instance.
         course_file = StringIO(xml_data.encode('ascii', 'ignore'))
-        xml_obj = etree.parse(course_file, parser=edx_xml_parser).getroot()
+        xml_obj = etree.parse(course_file, parser=thread_xml_parser()).getroot()
 
         policy_dir = None
         url_name = xml_obj.get('url_name', xml_obj.get('slug'))
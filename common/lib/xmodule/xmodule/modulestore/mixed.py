@@ -524,6 +524,14 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         with store.branch_setting(branch_setting, course_id):
             yield
 
+    def get_branch_setting(self, course_id=None):
+        """
+        Returns the current branch setting of the given course's store.
+        If course_id is None, the default store is used.
+        """
+        store = self._verify_modulestore_support(course_id, 'get_branch_setting')
+        return store.get_branch_setting(course_id)
+
     @contextmanager
     def bulk_write_operations(self, course_id):
         """
@@ -1,5 +1,17 @@
+import threading
+from collections import OrderedDict
+
+from . import ModuleStoreEnum
 from .exceptions import (ItemNotFoundError, NoPathToItem)
 
+# Number of (course, branch) path indexes kept by each process. See _get_path_index.
+PATH_INDEX_CACHE_SIZE = 50
+
+# (course_key, branch setting) -> (course version, path index) of the most recently indexed
+# version of each course, least recently used first
+_PATH_INDEXES = OrderedDict()
+_PATH_INDEXES_LOCK = threading.Lock()
+
 
 def path_to_location(modulestore, usage_key):
     '''
@@ -68,6 +80,12 @@ def path_to_location(modulestore, usage_key):
         # If we're here, there is no path
         return None
 
+    path_index = _get_path_index(modulestore, usage_key.course_key)
+    if path_index is not None:
+        path = path_index.get(_version_and_branch_agnostic(usage_key))
+        if path is not None:
+            return (usage_key.course_key,) + path
+
     if not modulestore.has_item(usage_key):
         raise ItemNotFoundError(usage_key)
 
@@ -102,3 +120,125 @@ def path_to_location(modulestore, usage_key):
         position = "_".join(position_list)
 
     return (course_id, chapter, section, position)
+
+
+def get_course_version(course):
+    """
+    Returns a value identifying the version of `course`, or None if its modulestore doesn't track one.
+    Split courses carry the structure's version guid; old mongo courses record when their subtree
+    was last edited, which every structure edit updates.
+    """
+    version = getattr(course.id, 'version_guid', None)
+    if version is None:
+        version = getattr(course, 'subtree_edited_on', None)
+    return version
+
+
+def _get_branch_setting(modulestore, course_key):
+    """
+    Returns the branch setting the modulestore reads course_key with, or None if it has no branches.
+    """
+    try:
+        return modulestore.get_branch_setting(course_key)
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def _get_modulestore_type(modulestore, course_key):
+    """
+    Returns the ModuleStoreEnum.Type of the store holding course_key, or None if it doesn't say.
+    """
+    try:
+        return modulestore.get_modulestore_type(course_key)
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def _version_and_branch_agnostic(key):
+    """
+    Returns `key` without the version and branch Split keys carry, so that keys of the same block
+    compare equal however they were obtained. Other keys are returned unchanged.
+    """
+    if hasattr(key, 'version_agnostic'):
+        key = key.version_agnostic()
+    if getattr(key, 'branch', None) is not None:
+        key = key.for_branch(None)
+    return key
+
+
+def _get_path_index(modulestore, course_key):
+    """
+    Returns a dict mapping the version and branch agnostic usage key of every block reachable from
+    the course root to the (chapter, section, position) of the path_to_location result for it.
+
+    The index is built from one load of the whole course and kept until the course's version
+    changes, so once a version is indexed resolving a location costs a single fetch of the course.
+    Only the PATH_INDEX_CACHE_SIZE most recently used indexes are kept.
+    Returns None if the course doesn't exist or its store doesn't version it.
+    """
+    if _get_modulestore_type(modulestore, course_key) == ModuleStoreEnum.Type.xml:
+        # xml courses have no version, so don't fetch the course just to find that out
+        return None
+
+    try:
+        course = modulestore.get_course(course_key)
+    except ItemNotFoundError:
+        return None
+    if course is None:
+        return None
+    version = get_course_version(course)
+    if version is None:
+        return None
+
+    # the index depends on the branch read, but not on the version the course was asked for at
+    key = (
+        course_key.version_agnostic() if hasattr(course_key, 'version_agnostic') else course_key,
+        _get_branch_setting(modulestore, course_key),
+    )
+    with _PATH_INDEXES_LOCK:
+        cached = _PATH_INDEXES.pop(key, None)
+        if cached is not None and cached[0] == version:
+            # mark as most recently used
+            _PATH_INDEXES[key] = cached
+            return cached[1]
+
+    path_index = _build_path_index(modulestore.get_course(course_key, depth=None))
+    with _PATH_INDEXES_LOCK:
+        _PATH_INDEXES.pop(key, None)
+        _PATH_INDEXES[key] = (version, path_index)
+        while len(_PATH_INDEXES) > PATH_INDEX_CACHE_SIZE:
+            _PATH_INDEXES.popitem(last=False)
+    return path_index
+
+
+def _build_path_index(course):
+    """
+    Computes the path_to_location result of every block in the tree under `course` in one traversal,
+    without the course id.
+    """
+    path_index = {}
+    # the work queue holds (block, names of the path's chapter and section, depth, positions so far)
+    queue = [(course, (), 0, ())]
+    while len(queue) > 0:
+        block, names, depth, positions = queue.pop()
+        key = _version_and_branch_agnostic(block.location)
+        if key in path_index:
+            # only keep the first path to blocks with several parents
+            continue
+
+        if depth in (1, 2):
+            names = names + (block.location.name,)
+        chapter = names[0] if len(names) > 0 else None
+        section = names[1] if len(names) > 1 else None
+        # see path_to_location: the position is only set below the section
+        position = "_".join(positions) if depth > 2 else None
+        path_index[key] = (chapter, section, position)
+
+        for index, child in enumerate(block.get_children()):
+            child_positions = positions
+            if depth >= 2 and block.location.block_type in ('sequential', 'videosequence'):
+                # positions are 1-indexed, and should be strings to be consistent with url parsing.
+                child_positions = positions + (str(index + 1),)
+            queue.append((child, names, depth + 1, child_positions))
+
+    return path_index
@@ -6,7 +6,7 @@ from uuid import uuid4
 from django.test import TestCase
 from django.contrib.auth.models import User
 from xmodule.contentstore.django import _CONTENTSTORE
-from xmodule.modulestore.django import modulestore, clear_existing_modulestores
+from xmodule.modulestore.django import modulestore, clear_existing_modulestores, HAS_REQUEST_CACHE
 from xmodule.modulestore import ModuleStoreEnum
 
 
@@ -231,6 +231,11 @@ class ModuleStoreTestCase(TestCase):
         # Flush the Mongo modulestore
         self.drop_mongo_collections()
 
+        # Forget anything cached for the previous test's "request"
+        if HAS_REQUEST_CACHE:
+            from request_cache.middleware import RequestCache
+            RequestCache.clear_request_cache()
+
         # Call superclass implementation
         super(ModuleStoreTestCase, self)._pre_setup()
 
@@ -13,6 +13,7 @@ from uuid import uuid4
 from datetime import datetime
 from pytz import UTC
 import unittest
+from mock import patch
 from xblock.core import XBlock
 
 from xblock.fields import Scope, Reference, ReferenceList, ReferenceValueDict
@@ -32,6 +33,8 @@ from xmodule.modulestore.xml_importer import import_from_xml, perform_xlint
 from xmodule.contentstore.mongo import MongoContentStore
 
 from xmodule.modulestore.tests.test_modulestore import check_path_to_location
+from xmodule.modulestore import search
+from xmodule.modulestore.search import path_to_location
 from nose.tools import assert_in
 from xmodule.exceptions import NotFoundError
 from git.test.lib.asserts import assert_not_none
@@ -247,9 +250,40 @@ class TestMongoModuleStore(unittest.TestCase):
 
     def test_path_to_location(self):
         '''Make sure that path_to_location works'''
-        with check_mongo_calls(self.draft_store, 9):
+        # the first lookup in a course version indexes the paths of all of its blocks
+        path_to_location(self.draft_store, Location('edX', 'toy', '2012_Fall', 'course', '2012_Fall'))
+        # after that, each lookup fetches the course, plus the location for ones which aren't in the course
+        with check_mongo_calls(self.draft_store, 6):
             check_path_to_location(self.draft_store)
 
+    def test_path_to_location_after_edit(self):
+        '''Make sure that path_to_location reflects structure edits made after a course was indexed'''
+        course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        jumpto = course_key.make_usage_key('html', 'toyjumpto')
+        original_path = path_to_location(self.draft_store, jumpto)
+        assert_equals(original_path[:3], (course_key, "Overview", "Toy_Videos"))
+        assert_not_equals(original_path[3], "1")
+
+        sequence = self.draft_store.get_item(course_key.make_usage_key('videosequence', 'Toy_Videos'))
+        original_children = list(sequence.children)
+        sequence.children = [jumpto] + [child for child in original_children if child != jumpto]
+        self.draft_store.update_item(sequence, self.dummy_user)
+        try:
+            assert_equals(path_to_location(self.draft_store, jumpto), (course_key, "Overview", "Toy_Videos", "1"))
+        finally:
+            sequence.children = original_children
+            self.draft_store.update_item(sequence, self.dummy_user)
+        assert_equals(path_to_location(self.draft_store, jumpto), original_path)
+
+    def test_path_indexes_bounded(self):
+        '''Make sure that only the most recently used path indexes are kept'''
+        toy = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        simple = SlashSeparatedCourseKey('edX', 'simple', '2012_Fall')
+        with patch('xmodule.modulestore.search.PATH_INDEX_CACHE_SIZE', 1):
+            path_to_location(self.draft_store, toy.make_usage_key('course', '2012_Fall'))
+            path_to_location(self.draft_store, simple.make_usage_key('course', '2012_Fall'))
+        assert_equals([key[0] for key in search._PATH_INDEXES], [simple])
+
     def test_xlinter(self):
         '''
         Run through the xlinter, we know the 'toy' course has violations, but the
@@ -8,6 +8,7 @@ from importlib import import_module
 from path import path
 import re
 import random
+from mock import patch
 
 from xblock.fields import Scope
 from xmodule.course_module import CourseDescriptor
@@ -23,6 +24,7 @@ from xmodule.x_module import XModuleMixin
 from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
+from xmodule.modulestore.search import path_to_location
 
 
 BRANCH_NAME_DRAFT = ModuleStoreEnum.BranchName.draft
@@ -930,6 +932,28 @@ class SplitModuleItemTests(SplitModuleTest):
         parent = modulestore().get_parent_location(locator)
         self.assertIsNone(parent)
 
+    def test_path_to_location(self):
+        """
+        Test that path_to_location serves split blocks from the course's path index whether or not
+        their keys carry a version
+        """
+        store = modulestore()
+        course_key = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        problem = course_key.make_usage_key('problem', 'problem1')
+        expected = (course_key, 'chapter3', 'problem1', None)
+        self.assertEqual(path_to_location(store, problem), expected)
+
+        versioned = store.get_item(problem).location
+        self.assertIsNotNone(versioned.version_guid)
+        # once indexed, no lookup walks up the tree
+        with patch.object(store, 'get_parent_location', side_effect=AssertionError):
+            self.assertEqual(path_to_location(store, problem), expected)
+            self.assertEqual(path_to_location(store, versioned), (versioned.course_key,) + expected[1:])
+            self.assertEqual(
+                path_to_location(store, course_key.make_usage_key('chapter', 'chapter1')),
+                (course_key, 'chapter1', None, None)
+            )
+
     def test_get_children(self):
         """
         Test the existing get_children method on xdescriptors
@@ -6,6 +6,7 @@ import os.path
 import unittest
 from glob import glob
 from mock import patch
+from xblock.fields import Scope
 
 from xmodule.modulestore.xml import XMLModuleStore
 from opaque_keys.edx.locations import Location
@@ -41,6 +42,25 @@ class TestXMLModuleStore(unittest.TestCase):
 
         check_path_to_location(modulestore)
 
+    def test_load_courses_on_threads(self):
+        """Make sure that loading course dirs concurrently loads the same courses as loading them serially"""
+        course_dirs = ['toy', 'simple', 'conditional']
+        serial_store = XMLModuleStore(DATA_DIR, course_dirs=course_dirs)
+        threaded_store = XMLModuleStore(DATA_DIR, course_dirs=course_dirs, load_workers=3)
+
+        self.assertItemsEqual(threaded_store.courses.keys(), serial_store.courses.keys())
+        self.assertItemsEqual(threaded_store.errored_courses.keys(), serial_store.errored_courses.keys())
+        for course_id, modules in serial_store.modules.iteritems():
+            self.assertItemsEqual(threaded_store.modules[course_id].keys(), modules.keys())
+            for location, module in modules.iteritems():
+                threaded_module = threaded_store.modules[course_id][location]
+                for scope in (Scope.content, Scope.settings, Scope.children):
+                    self.assertEqual(
+                        threaded_module.get_explicitly_set_fields_by_scope(scope),
+                        module.get_explicitly_set_fields_by_scope(scope),
+                    )
+        check_path_to_location(threaded_store)
+
     def test_xml_modulestore_type(self):
         store = XMLModuleStore(DATA_DIR, course_dirs=['toy', 'simple'])
         self.assertEqual(store.get_modulestore_type(), ModuleStoreEnum.Type.xml)
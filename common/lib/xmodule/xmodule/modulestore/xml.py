@@ -8,6 +8,7 @@ import sys
 import glob
 
 from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 from cStringIO import StringIO
 from fs.osfs import OSFS
 from importlib import import_module
@@ -19,6 +20,7 @@ from xmodule.error_module import ErrorDescriptor
 from xmodule.errortracker import make_error_tracker, exc_info_to_str
 from xmodule.mako_module import MakoDescriptorSystem
 from xmodule.x_module import XMLParsingSystem, policy_key
+from xmodule.xml_module import make_xml_parser, thread_xml_parser
 from xmodule.modulestore.xml_exporter import DEFAULT_CONTENT_FIELDS
 from xmodule.modulestore import ModuleStoreEnum, ModuleStoreReadBase
 from xmodule.tabs import CourseTabList
@@ -34,14 +36,21 @@ from .inheritance import compute_inherited_metadata, inheriting_field_data
 
 from xblock.fields import ScopeIds, Reference, ReferenceList, ReferenceValueDict
 
-edx_xml_parser = etree.XMLParser(dtd_validation=False, load_dtd=False,
-                                 remove_comments=True, remove_blank_text=True)
+edx_xml_parser = make_xml_parser()
 
 etree.set_default_parser(edx_xml_parser)
 
 log = logging.getLogger(__name__)
 
 
+def _init_load_worker():
+    """
+    Give a course loading thread its own default parser: `etree.set_default_parser`
+    only applies to the calling thread.
+    """
+    etree.set_default_parser(thread_xml_parser())
+
+
 # VS[compat]
 # TODO (cpennington): Remove this once all fall 2012 courses have been imported
 # into the cms from xml
@@ -167,7 +176,7 @@ class ImportSystem(XMLParsingSystem, MakoDescriptorSystem):
                 # TODO (cpennington): Remove this once all fall 2012 courses
                 # have been imported into the cms from xml
                 xml = clean_out_mako_templating(xml)
-                xml_data = etree.fromstring(xml)
+                xml_data = etree.fromstring(xml, parser=thread_xml_parser())
 
                 make_name_unique(xml_data)
 
@@ -308,7 +317,7 @@ def create_block_from_xml(xml_data, system, id_generator):
         XBlock: The fully instantiated :class:`~xblock.core.XBlock`.
 
     """
-    node = etree.fromstring(xml_data)
+    node = etree.fromstring(xml_data, parser=thread_xml_parser())
     raw_class = system.load_block_type(node.tag)
     xblock_class = system.mixologist.mix(raw_class)
 
@@ -369,7 +378,7 @@ class XMLModuleStore(ModuleStoreReadBase):
     """
     def __init__(
         self, data_dir, default_class=None, course_dirs=None, course_ids=None,
-        load_error_modules=True, i18n_service=None, **kwargs
+        load_error_modules=True, i18n_service=None, load_workers=1, **kwargs
     ):
         """
         Initialize an XMLModuleStore from data_dir
@@ -382,6 +391,10 @@ class XMLModuleStore(ModuleStoreReadBase):
 
             course_dirs or course_ids (list of str): If specified, the list of course_dirs or course_ids to load. Otherwise,
                 load all courses. Note, providing both
+
+            load_workers (int): the number of threads to load course directories on. Each course is
+                loaded by a single thread into its own modules, so courses are read and parsed
+                concurrently; they are registered with the store in course_dirs order regardless.
         """
         super(XMLModuleStore, self).__init__(**kwargs)
 
@@ -418,14 +431,34 @@ class XMLModuleStore(ModuleStoreReadBase):
         if course_dirs is None:
             course_dirs = sorted([d for d in os.listdir(self.data_dir) if
                                   os.path.exists(self.data_dir / d / "course.xml")])
-        for course_dir in course_dirs:
-            self.try_load_course(course_dir, course_ids)
+        load_workers = min(load_workers, len(course_dirs))
+        if load_workers > 1:
+            pool = ThreadPool(load_workers, _init_load_worker)
+            try:
+                loaded = pool.map(lambda course_dir: self._load_course_dir(course_dir, course_ids), course_dirs)
+            finally:
+                pool.close()
+                pool.join()
+            for course_dir, (course_descriptor, errorlog, failed) in zip(course_dirs, loaded):
+                self._add_loaded_course(course_dir, course_descriptor, errorlog, failed)
+        else:
+            for course_dir in course_dirs:
+                self.try_load_course(course_dir, course_ids)
 
     def try_load_course(self, course_dir, course_ids=None):
         '''
         Load a course, keeping track of errors as we go along. If course_ids is not None,
         then reject the course unless it's id is in course_ids.
         '''
+        self._add_loaded_course(course_dir, *self._load_course_dir(course_dir, course_ids))
+
+    def _load_course_dir(self, course_dir, course_ids):
+        '''
+        Load the course in course_dir without registering it with the store.
+
+        Returns a tuple of the course descriptor (None if it was rejected), the error log of
+        the load, and whether the load raised.
+        '''
         # Special-case code here, since we don't have a location for the
         # course before it loads.
         # So, make a tracker to track load-time errors, then put in the right
@@ -440,6 +473,14 @@ class XMLModuleStore(ModuleStoreReadBase):
             )
             log.exception(msg)
             errorlog.tracker(msg)
+            return course_descriptor, errorlog, True
+        return course_descriptor, errorlog, False
+
+    def _add_loaded_course(self, course_dir, course_descriptor, errorlog, failed):
+        '''
+        Register the result of :meth:`_load_course_dir` with the store.
+        '''
+        if failed:
             self.errored_courses[course_dir] = errorlog
 
         if course_descriptor is None:
@@ -494,7 +535,7 @@ class XMLModuleStore(ModuleStoreReadBase):
             # been imported into the cms from xml
             course_file = StringIO(clean_out_mako_templating(course_file.read()))
 
-            course_data = etree.parse(course_file, parser=edx_xml_parser).getroot()
+            course_data = etree.parse(course_file, parser=thread_xml_parser()).getroot()
 
             org = course_data.get('org')
 
@@ -10,11 +10,16 @@ from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import EdxJSONEncoder, ModuleStoreEnum
 from xmodule.modulestore.inheritance import own_metadata
 from fs.osfs import OSFS
+from fs.memoryfs import MemoryFS
 from json import dumps
 import json
 import os
+import posixpath
 from path import path
 import shutil
+from StringIO import StringIO
+import tarfile
+import time
 from xmodule.modulestore.mongo.base import DIRECT_ONLY_CATEGORIES
 
 DRAFT_DIR = "drafts"
@@ -35,11 +40,59 @@ def export_to_xml(modulestore, contentstore, course_key, root_dir, course_dir):
     `root_dir`: The directory to write the exported xml to
     `course_dir`: The name of the directory inside `root_dir` to write the course content to
     """
+    fsm = OSFS(root_dir)
+    export_fs = fsm.makeopendir(course_dir)
+
+    course = _export_course_to_fs(modulestore, course_key, export_fs)
+
+    # export the static assets
+    if contentstore:
+        contentstore.export_all_for_course(
+            course_key,
+            root_dir + '/' + course_dir + '/static/',
+            root_dir + '/' + course_dir + '/policies/assets.json',
+        )
+
+        # If we are using the default course image, export it to the
+        # legacy location to support backwards compatibility.
+        course_image = _find_default_course_image(contentstore, course)
+        if course_image is not None:
+            output_dir = root_dir + '/' + course_dir + '/static/images/'
+            if not os.path.isdir(output_dir):
+                os.makedirs(output_dir)
+            with OSFS(output_dir).open('course_image.jpg', 'wb') as course_image_file:
+                course_image_file.write(course_image.data)
+
+
+def export_to_tar(modulestore, contentstore, course_key, course_dir):
+    """
+    Export the course like `export_to_xml`, but as a gzipped tar whose top level directory is `course_dir`.
 
+    Returns an iterator over the chunks of the archive. The course xml and policies are serialized
+    in memory before this returns, so serialization errors are raised by this call. The assets are
+    then streamed from `contentstore` one at a time as the iterator is consumed, so neither they
+    nor the archive are ever written to disk.
+    """
+    export_fs = MemoryFS()
+    course = _export_course_to_fs(modulestore, course_key, export_fs)
+
+    assets = []
+    if contentstore:
+        assets, __ = contentstore.get_all_content_for_course(course_key)
+        with export_fs.open('policies/assets.json', 'w') as assets_policy:
+            assets_policy.write(dumps(contentstore.get_assets_policy(assets)))
+
+    return _stream_tar(export_fs, contentstore, course, assets, course_dir)
+
+
+def _export_course_to_fs(modulestore, course_key, export_fs):
+    """
+    Write the xml, extra content and policies of the course to the pyfilesystem `export_fs`.
+    Returns the course.
+    """
     course = modulestore.get_course(course_key)
 
-    fsm = OSFS(root_dir)
-    export_fs = course.runtime.export_fs = fsm.makeopendir(course_dir)
+    course.runtime.export_fs = export_fs
 
     root = lxml.etree.Element('unknown')
 
@@ -50,33 +103,7 @@ def export_to_xml(modulestore, contentstore, course_key, root_dir, course_dir):
     with export_fs.open('course.xml', 'w') as course_xml:
         lxml.etree.ElementTree(root).write(course_xml)
 
-    # export the static assets
     policies_dir = export_fs.makeopendir('policies')
-    if contentstore:
-        contentstore.export_all_for_course(
-            course_key,
-            root_dir + '/' + course_dir + '/static/',
-            root_dir + '/' + course_dir + '/policies/assets.json',
-        )
-
-        # If we are using the default course image, export it to the
-        # legacy location to support backwards compatibility.
-        if course.course_image == course.fields['course_image'].default:
-            try:
-                course_image = contentstore.find(
-                    StaticContent.compute_location(
-                        course.id,
-                        course.course_image
-                    ),
-                )
-            except NotFoundError:
-                pass
-            else:
-                output_dir = root_dir + '/' + course_dir + '/static/images/'
-                if not os.path.isdir(output_dir):
-                    os.makedirs(output_dir)
-                with OSFS(output_dir).open('course_image.jpg', 'wb') as course_image_file:
-                    course_image_file.write(course_image.data)
 
     # export the static tabs
     export_extra_content(export_fs, modulestore, course_key, 'static_tab', 'tabs', '.html')
@@ -128,6 +155,89 @@ def export_to_xml(modulestore, contentstore, course_key, root_dir, course_dir):
                 node = lxml.etree.Element('unknown')
                 draft_vertical.add_xml_to_node(node)
 
+    return course
+
+
+def _find_default_course_image(contentstore, course, as_stream=False):
+    """
+    Returns the course image content if the course uses the default course image and
+    it is in the contentstore, otherwise None.
+    """
+    if course.course_image != course.fields['course_image'].default:
+        return None
+    try:
+        return contentstore.find(
+            StaticContent.compute_location(course.id, course.course_image),
+            as_stream=as_stream
+        )
+    except NotFoundError:
+        return None
+
+
+class _ChunkBuffer(object):
+    """
+    A write-only file object which collects what is written to it until it's drained
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(data)
+
+    def drain(self):
+        data = ''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _add_to_tar(tar, name, fileobj, size):
+    """
+    Add `size` bytes read from `fileobj` to `tar` as a file called `name`
+    """
+    tarinfo = tarfile.TarInfo(name)
+    tarinfo.size = size
+    tarinfo.mtime = time.time()
+    tar.addfile(tarinfo, fileobj)
+
+
+def _stream_tar(export_fs, contentstore, course, assets, course_dir):
+    """
+    Yields the chunks of a gzipped tar of the files in `export_fs` and of `assets`, under `course_dir`.
+    Only one file is held in memory at a time.
+    """
+    buf = _ChunkBuffer()
+    tar = tarfile.open(fileobj=buf, mode='w|gz')
+
+    for file_path in export_fs.walkfiles():
+        with export_fs.open(file_path, 'rb') as exported_file:
+            data = exported_file.read()
+        _add_to_tar(tar, course_dir + file_path, StringIO(data), len(data))
+        yield buf.drain()
+
+    for asset in assets:
+        content = contentstore.find(asset['asset_key'], as_stream=True)
+        # the same layout as contentstore.export_all_for_course produces
+        asset_path = posixpath.join(course_dir, 'static', posixpath.dirname(content.import_path or ''), content.name)
+        try:
+            _add_to_tar(tar, asset_path, content, content.length)
+        finally:
+            content.close()
+        yield buf.drain()
+
+    if contentstore:
+        course_image = _find_default_course_image(contentstore, course, as_stream=True)
+        if course_image is not None:
+            try:
+                _add_to_tar(
+                    tar, posixpath.join(course_dir, 'static', 'images', 'course_image.jpg'),
+                    course_image, course_image.length
+                )
+            finally:
+                course_image.close()
+
+    tar.close()
+    yield buf.drain()
+
 
 def _export_field_content(xblock_item, item_dir):
     """
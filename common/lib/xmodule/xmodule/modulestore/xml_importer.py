@@ -1,9 +1,11 @@
+import hashlib
 import logging
 import os
 import mimetypes
 from path import path
 import json
 import re
+from multiprocessing.pool import ThreadPool
 
 from .xml import XMLModuleStore, ImportSystem, ParentTracker
 from xblock.runtime import KvsFieldData, DictKeyValueStore
@@ -17,17 +19,63 @@ from .store_utilities import rewrite_nonportable_content_links
 import xblock
 from xmodule.tabs import CourseTabList
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
-from xmodule.modulestore.exceptions import InvalidLocationError
+from xmodule.modulestore.exceptions import InvalidLocationError, ItemNotFoundError
 from xmodule.modulestore.mongo.base import MongoRevisionKey
 from xmodule.modulestore import ModuleStoreEnum
 
 log = logging.getLogger(__name__)
 
 
+# number of threads used to hash, thumbnail and save static assets during import
+STATIC_IMPORT_WORKERS = 4
+
+
+class ImportChanges(object):
+    """
+    The change set of an incremental import: the keys of the blocks and assets which were
+    created, updated, deleted or left unchanged.
+    """
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.deleted = []
+        self.unchanged = []
+
+    def record(self, key, existed, changed=True):
+        """
+        Records that key was imported; existed says whether it was in the store before the import
+        """
+        if not existed:
+            self.created.append(key)
+        elif changed:
+            self.updated.append(key)
+        else:
+            self.unchanged.append(key)
+
+    def __unicode__(self):
+        return u"{created} created, {updated} updated, {deleted} deleted, {unchanged} unchanged".format(
+            created=len(self.created),
+            updated=len(self.updated),
+            deleted=len(self.deleted),
+            unchanged=len(self.unchanged),
+        )
+
+
 def import_static_content(
         course_data_path, static_content_store,
-        target_course_id, subpath='static', verbose=False):
+        target_course_id, subpath='static', verbose=False,
+        workers=STATIC_IMPORT_WORKERS, changes=None):
+    """
+    Import all of the files under course_data_path/subpath into the static_content_store.
 
+    Assets are read, hashed, thumbnailed and saved by a pool of `workers` threads. Assets whose
+    content and attributes match what the contentstore already holds for the course (e.g. when
+    re-importing a course) are neither re-saved nor re-thumbnailed.
+
+    If changes is an :class:`ImportChanges`, the asset keys are recorded in it.
+
+    Returns a dict mapping each asset's path relative to subpath to its asset key.
+    """
     remap_dict = {}
 
     # now import all static assets
@@ -35,7 +83,7 @@ def import_static_content(
     try:
         with open(course_data_path / 'policies/assets.json') as f:
             policy = json.load(f)
-    except (IOError, ValueError) as err:
+    except (IOError, ValueError):
         # xml backed courses won't have this file, only exported courses;
         # so, its absence is not really an exception.
         policy = {}
@@ -46,76 +94,138 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
-    for dirname, _, filenames in os.walk(static_dir):
-        for filename in filenames:
+    existing_assets = _existing_asset_attrs(static_content_store, target_course_id)
 
-            content_path = os.path.join(dirname, filename)
+    def import_asset(content_path, filename):
+        """
+        Reads, hashes and (unless unchanged) saves a single asset. Runs on the worker threads.
+        """
+        if verbose:
+            log.debug('importing static content %s...', content_path)
+
+        try:
+            with open(content_path, 'rb') as f:
+                data = f.read()
+        except IOError:
+            if filename.startswith('._'):
+                # OS X "companion files". See
+                # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+                return None
+            # Not a 'hidden file', then re-raise exception
+            raise
+
+        # strip away leading path from the name
+        fullname_with_subpath = content_path.replace(static_dir, '')
+        if fullname_with_subpath.startswith('/'):
+            fullname_with_subpath = fullname_with_subpath[1:]
+        asset_key = StaticContent.compute_location(target_course_id, fullname_with_subpath)
+
+        policy_ele = policy.get(asset_key.path, {})
+        displayname = policy_ele.get('displayname', filename)
+        locked = policy_ele.get('locked', False)
+        mime_type = policy_ele.get('contentType')
+
+        # Check extracted contentType in list of all valid mimetypes
+        if not mime_type or mime_type not in mimetypes_list:
+            mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
+
+        existing = existing_assets.get(asset_key.name)
+        if existing is not None and existing == _asset_attrs(
+            hashlib.md5(data).hexdigest(), displayname, mime_type, fullname_with_subpath, locked
+        ):
+            if verbose:
+                log.debug('static content %s is unchanged, skipping', content_path)
+            if changes is not None:
+                changes.record(asset_key, existed=True, changed=False)
+            return fullname_with_subpath, asset_key
+
+        content = StaticContent(
+            asset_key, displayname, mime_type, data,
+            import_path=fullname_with_subpath, locked=locked
+        )
 
-            if re.match(ASSET_IGNORE_REGEX, filename):
-                if verbose:
-                    log.debug('skipping static content %s...', content_path)
-                continue
+        # first let's save a thumbnail so we can get back a thumbnail location
+        thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
 
-            if verbose:
-                log.debug('importing static content %s...', content_path)
+        if thumbnail_content is not None:
+            content.thumbnail_location = thumbnail_location
 
-            try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
-                raise
-
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            asset_key = StaticContent.compute_location(target_course_id, fullname_with_subpath)
-
-            policy_ele = policy.get(asset_key.path, {})
-            displayname = policy_ele.get('displayname', filename)
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+        # then commit the content
+        try:
+            static_content_store.save(content)
+        except Exception as err:
+            log.exception(u'Error importing {0}, error={1}'.format(
+                fullname_with_subpath, err
+            ))
+        else:
+            if changes is not None:
+                changes.record(asset_key, existed=existing is not None)
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+        return fullname_with_subpath, asset_key
+
+    def asset_paths():
+        """
+        Yields (content_path, filename) for every file under static_dir which should be imported.
+        """
+        for dirname, _, filenames in os.walk(static_dir):
+            for filename in filenames:
+                content_path = os.path.join(dirname, filename)
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+                if re.match(ASSET_IGNORE_REGEX, filename):
+                    if verbose:
+                        log.debug('skipping static content %s...', content_path)
+                    continue
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+                yield content_path, filename
 
-            # store the remapping information which will be needed
-            # to subsitute in the module data
-            remap_dict[fullname_with_subpath] = asset_key
+    pool = ThreadPool(max(workers, 1))
+    try:
+        # imap_unordered keeps at most a handful of files in memory at any time
+        for result in pool.imap_unordered(lambda args: import_asset(*args), asset_paths()):
+            if result is not None:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                fullname_with_subpath, asset_key = result
+                remap_dict[fullname_with_subpath] = asset_key
+    finally:
+        pool.close()
+        pool.join()
 
     return remap_dict
 
 
+def _asset_attrs(md5, displayname, content_type, import_path, locked):
+    """
+    The asset attributes compared to decide whether an imported asset differs from the stored one.
+    """
+    return (md5, displayname, content_type, import_path, bool(locked))
+
+
+def _existing_asset_attrs(static_content_store, course_key):
+    """
+    Returns a dict mapping asset name to the :func:`_asset_attrs` of the assets the
+    static_content_store already holds for course_key, fetched with a single query.
+    """
+    assets, __ = static_content_store.get_all_content_for_course(course_key)
+    return {
+        asset['asset_key'].name: _asset_attrs(
+            asset.get('md5'),
+            asset.get('displayname'),
+            asset.get('contentType'),
+            asset.get('import_path'),
+            asset.get('locked', False),
+        )
+        for asset in assets
+    }
+
+
 def import_from_xml(
         store, user_id, data_dir, course_dirs=None,
         default_class='xmodule.raw_module.RawDescriptor',
         load_error_modules=True, static_content_store=None,
         target_course_id=None, verbose=False,
-        do_import_static=True, create_new_course_if_not_present=False):
+        do_import_static=True, create_new_course_if_not_present=False,
+        incremental=False, import_changes=None):
     """
     Import the specified xml data_dir into the "store" modulestore,
     using org and course as the location org and course.
@@ -140,6 +250,15 @@ def import_from_xml(
     : create_new_course_if_not_present:
         If True, then a new course is created if it doesn't already exist.
         The check for existing courses is case-insensitive.
+
+    :param incremental:
+        If True, the content hash of each block and asset is compared to the
+        copy already in the store; unchanged ones are not rewritten, and blocks
+        and assets which are no longer in the xml are deleted.
+
+    :param import_changes:
+        If a dict is given and incremental is True, the :class:`ImportChanges`
+        of each imported course are stored in it keyed by destination course id.
     """
 
     xml_module_store = XMLModuleStore(
@@ -184,6 +303,32 @@ def import_from_xml(
 
             with store.bulk_write_operations(dest_course_id):
                 course_data_path = None
+                for module in xml_module_store.modules[course_key].itervalues():
+                    if module.scope_ids.block_type == 'course':
+                        course_data_path = path(data_dir) / module.data_dir
+                        break
+
+                drafts = _load_course_drafts(xml_module_store, course_data_path, course_key)
+
+                changes = None
+                draft_hashes = None
+                if incremental:
+                    changes = ImportChanges()
+                    existing_hashes = _existing_block_hashes(store, dest_course_id)
+                    new_locations = set(
+                        _map_usage_key_into_course(module.scope_ids.usage_id, dest_course_id)
+                        for module in xml_module_store.modules[course_key].itervalues()
+                    )
+                    # blocks which only exist as drafts aren't rewritten by the published import below,
+                    # so they are compared against the store when the drafts are imported
+                    draft_hashes = {
+                        location: existing_hashes.get(location)
+                        for location in _draft_locations(drafts, dest_course_id) - new_locations
+                    }
+                    # delete first, so that the parents which lose these children are rewritten afterwards
+                    _delete_removed_blocks(
+                        store, user_id, set(existing_hashes) - new_locations - set(draft_hashes), changes
+                    )
 
                 if verbose:
                     log.debug("Scanning {0} for course module...".format(course_key))
@@ -193,8 +338,6 @@ def import_from_xml(
                 # first into the store
                 for module in xml_module_store.modules[course_key].itervalues():
                     if module.scope_ids.block_type == 'course':
-                        course_data_path = path(data_dir) / module.data_dir
-
                         log.debug(u'======> IMPORTING course {course_key}'.format(
                             course_key=course_key,
                         ))
@@ -250,6 +393,8 @@ def import_from_xml(
                             CourseTabList.initialize_default(course)
 
                         store.update_item(course, user_id)
+                        if incremental:
+                            changes.record(course.location, existed=course.location in existing_hashes)
 
                         course_items.append(course)
                         break
@@ -257,12 +402,13 @@ def import_from_xml(
                 # TODO: shouldn't this raise an exception if course wasn't found?
 
                 # then import all the static content
+                imported_assets = []
                 if static_content_store is not None and do_import_static:
                     # first pass to find everything in /static/
-                    import_static_content(
+                    imported_assets = import_static_content(
                         course_data_path, static_content_store,
-                        dest_course_id, subpath='static', verbose=verbose
-                    )
+                        dest_course_id, subpath='static', verbose=verbose, changes=changes
+                    ).values()
 
                 elif verbose and not do_import_static:
                     log.debug(
@@ -282,10 +428,13 @@ def import_from_xml(
 
                 simport = 'static_import'
                 if os.path.exists(course_data_path / simport):
-                    import_static_content(
+                    imported_assets.extend(import_static_content(
                         course_data_path, static_content_store,
-                        dest_course_id, subpath=simport, verbose=verbose
-                    )
+                        dest_course_id, subpath=simport, verbose=verbose, changes=changes
+                    ).values())
+
+                if incremental and static_content_store is not None and do_import_static:
+                    _delete_removed_assets(static_content_store, dest_course_id, imported_assets, changes)
 
                 # now loop through all the modules
                 for module in xml_module_store.modules[course_key].itervalues():
@@ -299,6 +448,21 @@ def import_from_xml(
                             loc=module.location
                         ))
 
+                    if incremental:
+                        new_module = _map_module_into_course(
+                            module, store,
+                            course_key,
+                            dest_course_id,
+                            do_import_static=do_import_static,
+                            runtime=course.runtime
+                        )
+                        existing_hash = existing_hashes.get(new_module.location)
+                        changed = existing_hash != _block_content_hash(new_module)
+                        if changed:
+                            store.update_item(new_module, user_id, allow_not_found=True)
+                        changes.record(new_module.location, existed=existing_hash is not None, changed=changed)
+                        continue
+
                     _import_module_and_update_references(
                         module, store,
                         user_id,
@@ -313,23 +477,104 @@ def import_from_xml(
 
                 # now import any DRAFT items
                 _import_course_draft(
-                    xml_module_store,
+                    drafts,
                     store,
                     user_id,
-                    course_data_path,
                     course_key,
                     dest_course_id,
-                    course.runtime
+                    course.runtime,
+                    existing_hashes=draft_hashes,
+                    changes=changes
                 )
 
+                if incremental:
+                    log.info(u'Incremental import of %s: %s', dest_course_id, unicode(changes))
+                    if import_changes is not None:
+                        import_changes[dest_course_id] = changes
+
     return xml_module_store, course_items
 
 
+def _map_usage_key_into_course(usage_key, dest_course_id):
+    """
+    Returns the key which the block imported as usage_key gets in dest_course_id
+    """
+    new_usage_key = usage_key.map_into_course(dest_course_id)
+    if new_usage_key.category == 'course':
+        new_usage_key = new_usage_key.replace(name=dest_course_id.run)
+    return new_usage_key
+
+
+def _block_content_hash(block):
+    """
+    Returns a hash of the explicitly set content, settings and children of block
+    """
+    field_values = {}
+    for field_name, field in block.fields.iteritems():
+        if field.scope in (Scope.content, Scope.settings, Scope.children) and field.is_set_on(block):
+            field_values[field_name] = field.to_json(getattr(block, field_name))
+    return hashlib.md5(json.dumps(field_values, sort_keys=True, default=unicode)).hexdigest()
+
+
+def _existing_block_hashes(store, course_key):
+    """
+    Returns a dict mapping the location of every block the store holds for course_key to its
+    :func:`_block_content_hash`
+    """
+    if not store.has_course(course_key):
+        return {}
+    return {block.location: _block_content_hash(block) for block in store.get_items(course_key)}
+
+
+def _delete_removed_blocks(store, user_id, locations, changes):
+    """
+    Deletes the blocks at locations, which are no longer part of the imported course
+    """
+    for location in locations:
+        if location.category == 'course':
+            continue
+        try:
+            # delete the published version too, or blocks that aren't direct only would be left behind
+            store.delete_item(location, user_id, revision=ModuleStoreEnum.RevisionOption.all)
+        except ItemNotFoundError:
+            # already deleted along with a removed ancestor
+            pass
+        changes.deleted.append(location)
+
+
+def _delete_removed_assets(static_content_store, course_key, imported_assets, changes):
+    """
+    Deletes the assets of course_key which were not among the imported_assets
+    """
+    imported_assets = set(imported_assets)
+    assets, __ = static_content_store.get_all_content_for_course(course_key)
+    for asset in assets:
+        if asset['asset_key'] not in imported_assets:
+            static_content_store.delete(asset['asset_key'])
+            changes.deleted.append(asset['asset_key'])
+
+
 def _import_module_and_update_references(
         module, store, user_id,
         source_course_id, dest_course_id,
         do_import_static=True, runtime=None):
 
+    new_module = _map_module_into_course(
+        module, store, source_course_id, dest_course_id,
+        do_import_static=do_import_static, runtime=runtime
+    )
+    store.update_item(new_module, user_id, allow_not_found=True)
+    return new_module
+
+
+def _map_module_into_course(
+        module, store,
+        source_course_id, dest_course_id,
+        do_import_static=True, runtime=None):
+    """
+    Returns a copy of module, created by store, with its location and references moved from
+    source_course_id to dest_course_id. The copy is not saved.
+    """
     logging.debug(u'processing import of module {}...'.format(module.location.to_deprecated_string()))
 
     if do_import_static and 'data' in module.fields and isinstance(module.fields['data'], xblock.fields.String):
@@ -342,9 +587,7 @@ def _import_module_and_update_references(
         )
 
     # Move the module to a new course
-    new_usage_key = module.scope_ids.usage_id.map_into_course(dest_course_id)
-    if new_usage_key.category == 'course':
-        new_usage_key = new_usage_key.replace(name=dest_course_id.run)
+    new_usage_key = _map_usage_key_into_course(module.scope_ids.usage_id, dest_course_id)
     new_module = store.create_xmodule(new_usage_key, runtime=runtime)
 
     def _convert_reference_fields_to_new_namespace(reference):
@@ -389,30 +632,24 @@ def _import_module_and_update_references(
                 setattr(new_module, field_name, value)
             else:
                 setattr(new_module, field_name, getattr(module, field_name))
-    store.update_item(new_module, user_id, allow_not_found=True)
     return new_module
 
 
-def _import_course_draft(
-        xml_module_store,
-        store,
-        user_id,
-        course_data_path,
-        source_course_id,
-        target_course_id,
-        mongo_runtime
-):
+def _load_course_drafts(xml_module_store, course_data_path, source_course_id):
     '''
-    This will import all the content inside of the 'drafts' folder, if it exists
+    Returns the unit level descriptors in the 'drafts' folder of the course at course_data_path,
+    ordered by their index in their parent's list of children.
     NOTE: This is not a full course import, basically in our current
     application only verticals (and downwards) can be in draft.
     Therefore, we need to use slightly different call points into
     the import process_xml as we can't simply call XMLModuleStore() constructor
     (like we do for importing public content)
     '''
+    if course_data_path is None:
+        return []
     draft_dir = course_data_path + "/drafts"
     if not os.path.exists(draft_dir):
-        return
+        return []
 
     # create a new 'System' object which will manage the importing
     errorlog = make_error_tracker()
@@ -505,53 +742,99 @@ def _import_course_draft(
                 except Exception:
                     logging.exception('Error while parsing course xml.')
 
-        # For each index_in_children_list key, there is a list of vertical descriptors.
-        for key in sorted(drafts.iterkeys()):
-            for descriptor in drafts[key]:
-                course_key = descriptor.location.course_key
-                try:
-                    def _import_module(module):
-                        # IMPORTANT: Be sure to update the module location in the NEW namespace
-                        module_location = module.location.map_into_course(target_course_id)
-                        # Update the module's location to DRAFT revision
-                        # We need to call this method (instead of updating the location directly)
-                        # to ensure that pure XBlock field data is updated correctly.
-                        _update_module_location(module, module_location.replace(revision=MongoRevisionKey.draft))
-
-                        # make sure our parent has us in its list of children
-                        # this is to make sure private only verticals show up
-                        # in the list of children since they would have been
-                        # filtered out from the non-draft store export.
-                        # Note though that verticals nested below the unit level will not have
-                        # a parent_sequential_url and do not need special handling.
-                        if module.location.category == 'vertical' and 'parent_sequential_url' in module.xml_attributes:
-                            non_draft_location = module.location.replace(revision=MongoRevisionKey.published)
-                            sequential_url = module.xml_attributes['parent_sequential_url']
-                            index = int(module.xml_attributes['index_in_children_list'])
-
-                            seq_location = course_key.make_usage_key_from_deprecated_string(sequential_url)
-
-                            # IMPORTANT: Be sure to update the sequential in the NEW namespace
-                            seq_location = seq_location.map_into_course(target_course_id)
-                            sequential = store.get_item(seq_location, depth=0)
-
-                            if non_draft_location not in sequential.children:
-                                sequential.children.insert(index, non_draft_location)
-                                store.update_item(sequential, user_id)
-
-                        _import_module_and_update_references(
-                            module, store, user_id,
-                            source_course_id,
-                            target_course_id,
-                            runtime=mongo_runtime,
-                        )
-                        for child in module.get_children():
-                            _import_module(child)
+    # For each index_in_children_list key, there is a list of vertical descriptors.
+    return [descriptor for key in sorted(drafts.iterkeys()) for descriptor in drafts[key]]
 
-                    _import_module(descriptor)
 
-                except Exception:
-                    logging.exception('There while importing draft descriptor %s', descriptor)
+def _draft_locations(drafts, dest_course_id):
+    """
+    Returns the locations in dest_course_id of the draft descriptors and all of their descendants
+    """
+    locations = set()
+
+    def _add_locations(module):
+        locations.add(_map_usage_key_into_course(module.location.replace(revision=None), dest_course_id))
+        for child in module.get_children():
+            _add_locations(child)
+
+    for descriptor in drafts:
+        _add_locations(descriptor)
+    return locations
+
+
+def _import_course_draft(
+        drafts,
+        store,
+        user_id,
+        source_course_id,
+        target_course_id,
+        mongo_runtime,
+        existing_hashes=None,
+        changes=None
+):
+    '''
+    This will import the draft descriptors loaded by :func:`_load_course_drafts`.
+    The blocks whose locations are keys of existing_hashes only exist as drafts; they are only
+    written if their :func:`_block_content_hash` differs, and are recorded in changes.
+    '''
+    for descriptor in drafts:
+        course_key = descriptor.location.course_key
+        try:
+            def _import_module(module):
+                # IMPORTANT: Be sure to update the module location in the NEW namespace
+                module_location = module.location.map_into_course(target_course_id)
+                # Update the module's location to DRAFT revision
+                # We need to call this method (instead of updating the location directly)
+                # to ensure that pure XBlock field data is updated correctly.
+                _update_module_location(module, module_location.replace(revision=MongoRevisionKey.draft))
+
+                # make sure our parent has us in its list of children
+                # this is to make sure private only verticals show up
+                # in the list of children since they would have been
+                # filtered out from the non-draft store export.
+                # Note though that verticals nested below the unit level will not have
+                # a parent_sequential_url and do not need special handling.
+                if module.location.category == 'vertical' and 'parent_sequential_url' in module.xml_attributes:
+                    non_draft_location = module.location.replace(revision=MongoRevisionKey.published)
+                    sequential_url = module.xml_attributes['parent_sequential_url']
+                    index = int(module.xml_attributes['index_in_children_list'])
+
+                    seq_location = course_key.make_usage_key_from_deprecated_string(sequential_url)
+
+                    # IMPORTANT: Be sure to update the sequential in the NEW namespace
+                    seq_location = seq_location.map_into_course(target_course_id)
+                    sequential = store.get_item(seq_location, depth=0)
+
+                    if non_draft_location not in sequential.children:
+                        sequential.children.insert(index, non_draft_location)
+                        store.update_item(sequential, user_id)
+
+                if existing_hashes is not None and module_location in existing_hashes:
+                    new_module = _map_module_into_course(
+                        module, store,
+                        source_course_id,
+                        target_course_id,
+                        runtime=mongo_runtime,
+                    )
+                    existing_hash = existing_hashes[module_location]
+                    changed = existing_hash != _block_content_hash(new_module)
+                    if changed:
+                        store.update_item(new_module, user_id, allow_not_found=True)
+                    changes.record(module_location, existed=existing_hash is not None, changed=changed)
+                else:
+                    _import_module_and_update_references(
+                        module, store, user_id,
+                        source_course_id,
+                        target_course_id,
+                        runtime=mongo_runtime,
+                    )
+                for child in module.get_children():
+                    _import_module(child)
+
+            _import_module(descriptor)
+
+        except Exception:
+            logging.exception('There while importing draft descriptor %s', descriptor)
 
 
 def allowed_metadata_by_category(category):
@@ -1,6 +1,7 @@
 """
 Tests that check that we ignore the appropriate files when importing courses.
 """
+import hashlib
 import unittest
 from mock import Mock
 from xmodule.modulestore.xml_importer import import_static_content
@@ -15,6 +16,7 @@ class IgnoredFilesTestCase(unittest.TestCase):
         course_id = SlashSeparatedCourseKey("edX", "tilde", "Fall_2012")
         content_store = Mock()
         content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = ([], 0)
         import_static_content(course_dir, content_store, course_id)
         saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
         name_val = {sc.name: sc.data for sc in saved_static_content}
@@ -30,6 +32,7 @@ class IgnoredFilesTestCase(unittest.TestCase):
         course_id = SlashSeparatedCourseKey("edX", "dot-underscore", "2014_Fall")
         content_store = Mock()
         content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = ([], 0)
         import_static_content(course_dir, content_store, course_id)
         saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
         name_val = {sc.name: sc.data for sc in saved_static_content}
@@ -39,3 +42,48 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+
+class UnchangedFilesTestCase(unittest.TestCase):
+    "Tests for re-importing static files which are already in the contentstore"
+    def setUp(self):
+        self.course_dir = DATA_DIR / "tilde"
+        self.course_id = SlashSeparatedCourseKey("edX", "tilde", "Fall_2012")
+        self.asset_key = self.course_id.make_asset_key('asset', 'example.txt')
+        with open(self.course_dir / "static" / "example.txt", 'rb') as f:
+            self.md5 = hashlib.md5(f.read()).hexdigest()
+        self.content_store = Mock()
+        self.content_store.generate_thumbnail.return_value = (None, None)
+
+    def _stored_asset(self, **kwargs):
+        "Returns the contentstore listing entry for example.txt, overridden by kwargs"
+        asset = {
+            'asset_key': self.asset_key,
+            'md5': self.md5,
+            'displayname': 'example.txt',
+            'contentType': 'text/plain',
+            'import_path': 'example.txt',
+            'locked': False,
+        }
+        asset.update(kwargs)
+        return asset
+
+    def _import(self):
+        "Imports the static content and returns the names of the saved assets"
+        remap = import_static_content(self.course_dir, self.content_store, self.course_id)
+        self.assertEqual(remap['example.txt'], self.asset_key)
+        return [call[0][0].name for call in self.content_store.save.call_args_list]
+
+    def test_unchanged_asset_skipped(self):
+        self.content_store.get_all_content_for_course.return_value = ([self._stored_asset()], 1)
+        self.assertNotIn("example.txt", self._import())
+        thumbnailed = [call[0][0].name for call in self.content_store.generate_thumbnail.call_args_list]
+        self.assertNotIn("example.txt", thumbnailed)
+
+    def test_changed_asset_saved(self):
+        self.content_store.get_all_content_for_course.return_value = ([self._stored_asset(md5='0' * 32)], 1)
+        self.assertIn("example.txt", self._import())
+
+    def test_changed_attributes_saved(self):
+        self.content_store.get_all_content_for_course.return_value = ([self._stored_asset(locked=True)], 1)
+        self.assertIn("example.txt", self._import())
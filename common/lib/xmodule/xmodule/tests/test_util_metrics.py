@@ -0,0 +1,75 @@
+"""
+Tests for the in-process XBlock metrics aggregator.
+"""
+import unittest
+
+from mock import patch
+
+from ..util.metrics import BlockMetrics
+
+
+@patch('xmodule.util.metrics.dog_stats_api')
+class TestBlockMetrics(unittest.TestCase):
+    """
+    Test `BlockMetrics`.
+    """
+    def setUp(self):
+        self.metrics = BlockMetrics('test.metric', flush_interval=60, max_samples=2)
+
+    def test_aggregated_until_flush(self, mock_dog_stats_api):
+        for _ in range(3):
+            self.metrics.record('render', 'student_view', 'success', 'org/course/run', 'problem', 0.5)
+        self.metrics.record('handle', 'xmodule_handler', 'failure', 'org/course/run', 'problem')
+        self.assertFalse(mock_dog_stats_api.increment.called)
+
+        self.metrics.flush()
+        mock_dog_stats_api.increment.assert_any_call('test.metric', value=3, tags=[
+            u'view_name:student_view',
+            u'action:render',
+            u'action_status:success',
+            u'block_type:problem',
+            u'course_id:org/course/run',
+        ])
+        mock_dog_stats_api.increment.assert_any_call('test.metric', value=1, tags=[
+            u'handler_name:xmodule_handler',
+            u'action:handle',
+            u'action_status:failure',
+            u'block_type:problem',
+            u'course_id:org/course/run',
+        ])
+        self.assertEqual(mock_dog_stats_api.increment.call_count, 2)
+
+        # Only max_samples durations are kept, and calls that weren't timed have none
+        self.assertEqual(mock_dog_stats_api.histogram.call_count, 2)
+        mock_dog_stats_api.histogram.assert_called_with('test.metric.duration', 0.5, tags=[
+            u'view_name:student_view',
+            u'action:render',
+            u'action_status:success',
+            u'block_type:problem',
+        ])
+
+        # Flushing again sends nothing new
+        mock_dog_stats_api.reset_mock()
+        self.metrics.flush()
+        self.assertFalse(mock_dog_stats_api.increment.called)
+
+    def test_flush_interval(self, mock_dog_stats_api):
+        with patch('xmodule.util.metrics.time.time') as mock_time:
+            mock_time.return_value = 1000
+            self.metrics = BlockMetrics('test.metric', flush_interval=60)
+            self.metrics.record('render', 'student_view', 'success', 'org/course/run', 'html')
+            self.assertFalse(mock_dog_stats_api.increment.called)
+
+            mock_time.return_value = 1060
+            self.metrics.record('render', 'student_view', 'success', 'org/course/run', 'html')
+            self.assertEqual(mock_dog_stats_api.increment.call_count, 1)
+            self.assertEqual(mock_dog_stats_api.increment.call_args[1]['value'], 2)
+
+    def test_sample(self, mock_dog_stats_api):  # pylint: disable=unused-argument
+        self.assertTrue(self.metrics.sample())
+
+        self.metrics.configure(sample_rate=0.25)
+        with patch('xmodule.util.metrics.random.random', return_value=0.5):
+            self.assertFalse(self.metrics.sample())
+        with patch('xmodule.util.metrics.random.random', return_value=0.1):
+            self.assertTrue(self.metrics.sample())
@@ -0,0 +1,109 @@
+"""
+In-process aggregation of XBlock render and handler metrics.
+
+Counting and timing every block render with a datadog call is a noticeable
+part of rendering a page, since a vertical renders each of its children. The
+runtimes instead record their calls in `BLOCK_METRICS`, which adds them up in
+memory and sends the totals to datadog every `flush_interval` seconds.
+"""
+import atexit
+import random
+import threading
+import time
+from collections import defaultdict
+
+from dogapi import dog_stats_api
+
+XMODULE_METRIC_NAME = 'edxapp.xmodule'
+
+
+class BlockMetrics(object):
+    """
+    Aggregates the number of calls per (action, view or handler name, status,
+    course_id, block_type), and a sample of their durations per (action, view or
+    handler name, status, block_type), and periodically flushes them to datadog.
+
+    Every call is counted. Only a `sample_rate` fraction of calls is timed, and at
+    most `max_samples` durations are kept per key between flushes.
+    """
+    def __init__(self, metric_name, sample_rate=1.0, flush_interval=10, max_samples=100):
+        self.metric_name = metric_name
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.max_samples = max_samples
+
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+        self._durations = defaultdict(list)
+        self._last_flush = time.time()
+
+    def configure(self, sample_rate=None, flush_interval=None, max_samples=None):
+        """
+        Change any of the settings given at creation.
+        """
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+        if max_samples is not None:
+            self.max_samples = max_samples
+
+    def sample(self):
+        """
+        Returns whether the duration of the next call should be measured.
+        """
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def record(self, action, name, status, course_id, block_type, duration=None):
+        """
+        Record a call, with its duration in seconds if it was measured. Flushes the
+        aggregated metrics if the last flush is more than `flush_interval` seconds ago.
+        """
+        now = time.time()
+        with self._lock:
+            self._counts[(action, name, status, course_id, block_type)] += 1
+            if duration is not None:
+                durations = self._durations[(action, name, status, block_type)]
+                if len(durations) < self.max_samples:
+                    durations.append(duration)
+            flush_due = now - self._last_flush >= self.flush_interval
+
+        if flush_due:
+            self.flush()
+
+    def flush(self):
+        """
+        Send the metrics aggregated since the last flush to datadog.
+        """
+        with self._lock:
+            counts, self._counts = self._counts, defaultdict(int)
+            durations, self._durations = self._durations, defaultdict(list)
+            self._last_flush = time.time()
+
+        for (action, name, status, course_id, block_type), count in counts.iteritems():
+            tags = self._tags(action, name, status, block_type)
+            tags.append(u'course_id:{}'.format(course_id))
+            dog_stats_api.increment(self.metric_name, value=count, tags=tags)
+
+        for (action, name, status, block_type), values in durations.iteritems():
+            tags = self._tags(action, name, status, block_type)
+            for value in values:
+                dog_stats_api.histogram(self.metric_name + '.duration', value, tags=tags)
+
+    @staticmethod
+    def _tags(action, name, status, block_type):
+        """
+        Returns the datadog tags shared by the count and duration metrics.
+        """
+        return [
+            u'{}:{}'.format('view_name' if action == 'render' else 'handler_name', name),
+            u'action:{}'.format(action),
+            u'action_status:{}'.format(status),
+            u'block_type:{}'.format(block_type),
+        ]
+
+
+BLOCK_METRICS = BlockMetrics(XMODULE_METRIC_NAME)
+
+# Don't lose the calls recorded since the last flush when the process exits
+atexit.register(BLOCK_METRICS.flush)
@@ -4,6 +4,7 @@ Utility functions for transcripts.
 """
 import os
 import copy
+import hashlib
 import json
 import requests
 import logging
@@ -18,6 +19,10 @@ from xmodule.contentstore.django import contentstore
 
 log = logging.getLogger(__name__)
 
+# Converted transcripts are cached under the digest of their source, so a cached
+# variant never goes stale; this only bounds how long unused variants are kept.
+TRANSCRIPT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
 
 class TranscriptException(Exception):  # pylint disable=C0111
     pass
@@ -88,6 +93,7 @@ def save_subs_to_store(subs, subs_id, item, language='en'):
     """
     filedata = json.dumps(subs, indent=2)
     filename = subs_filename(subs_id, language)
+    Transcript.precompute(filedata, 'sjson')
     return save_to_store(filedata, filename, 'application/json', item.location)
 
 def get_transcripts_from_youtube(youtube_id, settings, i18n):
@@ -223,14 +229,13 @@ def generate_srt_from_sjson(sjson_subs, speed):
     :returns: "srt" subs.
     """
 
-    output = ''
-
     equal_len = len(sjson_subs['start']) == len(sjson_subs['end']) == len(sjson_subs['text'])
     if not equal_len:
-        return output
+        return ''
 
     sjson_speed_1 = generate_subs(speed, 1, sjson_subs)
 
+    output = []
     for i in range(len(sjson_speed_1['start'])):
         item = SubRipItem(
             index=i,
@@ -238,9 +243,9 @@ def generate_srt_from_sjson(sjson_subs, speed):
             end=SubRipTime(milliseconds=sjson_speed_1['end'][i]),
             text=sjson_speed_1['text'][i]
         )
-        output += (unicode(item))
-        output += '\n'
-    return output
+        output.append(unicode(item))
+        output.append('\n')
+    return ''.join(output)
 
 
 def copy_or_rename_transcript(new_name, old_name, item, delete_old=False, user=None):
@@ -470,6 +475,48 @@ class Transcript(object):
             elif output_format == 'srt':
                 return generate_srt_from_sjson(json.loads(content), speed=1.0)
 
+    @staticmethod
+    def digest(content):
+        """
+        Return a digest of transcript `content`, used to key its converted variants
+        and as its ETag.
+        """
+        if isinstance(content, unicode):
+            content = content.encode('utf8')
+        return hashlib.md5(content).hexdigest()
+
+    @staticmethod
+    def convert_cached(content, input_format, output_format):
+        """
+        Like `convert`, but keeps the converted transcript in the cache, keyed by
+        the digest of `content` and both formats.
+        """
+        if input_format == output_format:
+            return content
+
+        # Imported here, so that the xmodule library can be imported without Django settings
+        from django.core.cache import cache
+
+        key = u'transcripts.{}.{}.{}'.format(Transcript.digest(content), input_format, output_format)
+        converted = cache.get(key)
+        if converted is None:
+            converted = Transcript.convert(content, input_format, output_format)
+            cache.set(key, converted, TRANSCRIPT_CACHE_TIMEOUT)
+        return converted
+
+    @staticmethod
+    def precompute(content, input_format):
+        """
+        Fill the cache with the downloadable (srt and txt) variants of transcript
+        `content`, so that they are ready when it's saved. Transcripts that can't
+        be converted are left for the download handler to report.
+        """
+        for output_format in ('srt', 'txt'):
+            try:
+                Transcript.convert_cached(content, input_format, output_format)
+            except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+                log.info("Could not convert %s transcript to %s.", input_format, output_format)
+
     @staticmethod
     def asset(location, subs_id, lang='en', filename=None):
         """
@@ -161,11 +161,11 @@ class VideoStudentViewHandlers(object):
 
             data = Transcript.asset(self.location, transcript_name, lang).data
             filename = u'{}.{}'.format(transcript_name, transcript_format)
-            content = Transcript.convert(data, 'sjson', transcript_format)
+            content = Transcript.convert_cached(data, 'sjson', transcript_format)
         else:
             data = Transcript.asset(self.location, None, None, self.transcripts[lang]).data
             filename = u'{}.{}'.format(os.path.splitext(self.transcripts[lang])[0], transcript_format)
-            content = Transcript.convert(data, 'srt', transcript_format)
+            content = Transcript.convert_cached(data, 'srt', transcript_format)
 
         if not content:
             log.debug('no subtitles produced in get_transcript')
@@ -213,6 +213,20 @@ class VideoStudentViewHandlers(object):
                 )
         return response
 
+    @staticmethod
+    def _transcript_response(request, content, headerlist):
+        """
+        Return a response serving transcript `content`, tagged with an ETag, or a
+        304 if the browser already has this version of the transcript.
+        """
+        etag = Transcript.digest(content)
+        if etag in request.if_none_match:
+            response = Response(status=304, headerlist=headerlist)
+        else:
+            response = Response(content, headerlist=headerlist)
+        response.etag = etag
+        return response
+
     @XBlock.handler
     def transcript(self, request, dispatch):
         """
@@ -264,7 +278,7 @@ class VideoStudentViewHandlers(object):
                 log.info(ex.message)
                 response = Response(status=404)
             else:
-                response = Response(transcript, headerlist=[('Content-Language', language)])
+                response = self._transcript_response(request, transcript, [('Content-Language', language)])
                 response.content_type = Transcript.mime_types['sjson']
 
         elif dispatch == 'download':
@@ -274,9 +288,10 @@ class VideoStudentViewHandlers(object):
                 log.debug("Video@download exception")
                 return Response(status=404)
             else:
-                response = Response(
+                response = self._transcript_response(
+                    request,
                     transcript_content,
-                    headerlist=[
+                    [
                         ('Content-Disposition', 'attachment; filename="{}"'.format(transcript_filename.encode('utf8'))),
                         ('Content-Language', self.transcript_language),
                     ]
@@ -353,7 +368,9 @@ class VideoStudioViewHandlers(object):
 
             if request.method == 'POST':
                 subtitles = request.POST['file']
-                save_to_store(subtitles.file.read(), unicode(subtitles.filename), 'application/x-subrip', self.location)
+                content = subtitles.file.read()
+                save_to_store(content, unicode(subtitles.filename), 'application/x-subrip', self.location)
+                Transcript.precompute(content, 'srt')
                 generate_sjson_for_all_speeds(self, unicode(subtitles.filename), {}, language)
                 response = {'filename': unicode(subtitles.filename), 'status': 'Success'}
                 return Response(json.dumps(response), status=201)
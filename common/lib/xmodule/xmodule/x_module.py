@@ -1,6 +1,7 @@
 import logging
 import os
 import sys
+import time
 import yaml
 
 from functools import partial
@@ -25,13 +26,11 @@ from xmodule.errortracker import exc_info_to_str
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from opaque_keys.edx.keys import UsageKey
 from xmodule.exceptions import UndefinedContext
-from dogapi import dog_stats_api
+from xmodule.util.metrics import BLOCK_METRICS
 
 
 log = logging.getLogger(__name__)
 
-XMODULE_METRIC_NAME = 'edxapp.xmodule'
-
 # xblock view names
 
 # This is the view that will be rendered to display the XBlock in the LMS.
@@ -1021,9 +1020,12 @@ def descriptor_global_local_resource_url(block, uri):  # pylint: disable=invalid
 class MetricsMixin(object):
     """
     Mixin for adding metric logging for render and handle methods in the DescriptorSystem and ModuleSystem.
+
+    Calls are aggregated in-process by BLOCK_METRICS, which flushes them to datadog periodically.
     """
 
     def render(self, block, view_name, context=None):
+        start = time.time() if BLOCK_METRICS.sample() else None
         try:
             status = "success"
             return super(MetricsMixin, self).render(block, view_name, context=context)
@@ -1033,17 +1035,13 @@ class MetricsMixin(object):
             raise
 
         finally:
-            course_id = getattr(self, 'course_id', '')
-            dog_stats_api.increment(XMODULE_METRIC_NAME, tags=[
-                u'view_name:{}'.format(view_name),
-                u'action:render',
-                u'action_status:{}'.format(status),
-                u'course_id:{}'.format(course_id),
-                u'block_type:{}'.format(block.scope_ids.block_type)
-            ])
+            BLOCK_METRICS.record(
+                'render', view_name, status, getattr(self, 'course_id', ''), block.scope_ids.block_type,
+                None if start is None else time.time() - start
+            )
 
     def handle(self, block, handler_name, request, suffix=''):
-        handle = None
+        start = time.time() if BLOCK_METRICS.sample() else None
         try:
             status = "success"
             return super(MetricsMixin, self).handle(block, handler_name, request, suffix=suffix)
@@ -1053,14 +1051,10 @@ class MetricsMixin(object):
             raise
 
         finally:
-            course_id = getattr(self, 'course_id', '')
-            dog_stats_api.increment(XMODULE_METRIC_NAME, tags=[
-                u'handler_name:{}'.format(handler_name),
-                u'action:handle',
-                u'action_status:{}'.format(status),
-                u'course_id:{}'.format(course_id),
-                u'block_type:{}'.format(block.scope_ids.block_type)
-            ])
+            BLOCK_METRICS.record(
+                'handle', handler_name, status, getattr(self, 'course_id', ''), block.scope_ids.block_type,
+                None if start is None else time.time() - start
+            )
 
 
 class DescriptorSystem(MetricsMixin, ConfigurableFragmentWrapper, Runtime):  # pylint: disable=abstract-method
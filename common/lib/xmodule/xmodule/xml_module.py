@@ -3,6 +3,7 @@ import copy
 import logging
 import os
 import sys
+import threading
 from lxml import etree
 
 from xblock.fields import Dict, Scope, ScopeIds
@@ -13,10 +14,29 @@ from xblock.runtime import KvsFieldData
 
 log = logging.getLogger(__name__)
 
-# assume all XML files are persisted as utf-8.
-edx_xml_parser = etree.XMLParser(dtd_validation=False, load_dtd=False,
-                                 remove_comments=True, remove_blank_text=True,
-                                 encoding='utf-8')
+# lxml parsers can't be shared between threads, so each thread builds its own.
+_THREAD_XML_PARSERS = threading.local()
+
+
+def make_xml_parser(encoding=None):
+    """
+    Return a new parser that drops comments and blank text and doesn't load dtds.
+    """
+    return etree.XMLParser(dtd_validation=False, load_dtd=False,
+                           remove_comments=True, remove_blank_text=True,
+                           encoding=encoding)
+
+
+def thread_xml_parser(encoding=None):
+    """
+    Return the parser built by `make_xml_parser` for the current thread.
+    """
+    parsers = getattr(_THREAD_XML_PARSERS, 'parsers', None)
+    if parsers is None:
+        parsers = _THREAD_XML_PARSERS.parsers = {}
+    if encoding not in parsers:
+        parsers[encoding] = make_xml_parser(encoding)
+    return parsers[encoding]
 
 
 def name_to_pathname(name):
@@ -161,7 +181,8 @@ class XmlDescriptor(XModuleDescriptor):
 
         Returns an lxml Element
         """
-        return etree.parse(file_object, parser=edx_xml_parser).getroot()
+        # assume all XML files are persisted as utf-8.
+        return etree.parse(file_object, parser=thread_xml_parser(encoding='utf-8')).getroot()
 
     @classmethod
     def load_file(cls, filepath, fs, def_id):  # pylint: disable=invalid-name
@@ -269,7 +290,7 @@ class XmlDescriptor(XModuleDescriptor):
         system: A DescriptorSystem for interacting with external resources
         """
 
-        xml_object = etree.fromstring(xml_data)
+        xml_object = etree.fromstring(xml_data, parser=thread_xml_parser())
         # VS[compat] -- just have the url_name lookup, once translation is done
         url_name = xml_object.get('url_name', xml_object.get('slug'))
         def_id = id_generator.create_definition(xml_object.tag, url_name)
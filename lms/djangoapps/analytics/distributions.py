@@ -21,6 +21,9 @@ The distribution in a course for gender might look like:
 }
 """
 
+from collections import defaultdict
+
+from django.core.cache import cache
 from django.db.models import Count
 from student.models import CourseEnrollment, UserProfile
 
@@ -30,6 +33,9 @@ _EASY_CHOICE_FEATURES = ('gender', 'level_of_education')
 _OPEN_CHOICE_FEATURES = ('year_of_birth',)
 
 AVAILABLE_PROFILE_FEATURES = _EASY_CHOICE_FEATURES + _OPEN_CHOICE_FEATURES
+
+# How long (in seconds) the distributions of a course are cached
+DISTRIBUTION_CACHE_TIMEOUT = 60
 DISPLAY_NAMES = {
     'gender': 'Gender',
     'level_of_education': 'Level of Education',
@@ -91,80 +97,92 @@ def profile_distribution(course_id, feature):
     NOTE: no_data will appear as a key instead of None/null to adhere to the json spec.
     data types are EASY_CHOICE or OPEN_CHOICE
     """
+    return profile_distributions(course_id, [feature])[feature]
+
+
+def profile_distributions(course_id, features=AVAILABLE_PROFILE_FEATURES):
+    """
+    Retrieve distributions of students over each of the given features.
+    features is a list of AVAILABLE_PROFILE_FEATURES.
 
-    if not feature in AVAILABLE_PROFILE_FEATURES:
-        raise ValueError(
-            "unsupported feature requested for distribution '{}'".format(
-                feature)
-        )
-
-    prd = ProfileDistribution(feature)
-
-    if feature in _EASY_CHOICE_FEATURES:
-        prd.type = 'EASY_CHOICE'
-
-        if feature == 'gender':
-            raw_choices = UserProfile.GENDER_CHOICES
-        elif feature == 'level_of_education':
-            raw_choices = UserProfile.LEVEL_OF_EDUCATION_CHOICES
-
-        # short name and display name (full) of the choices.
-        choices = [(short, full)
-                   for (short, full) in raw_choices] + [('no_data', 'No Data')]
-
-        def get_filter(feature, value):
-            """ Get the orm filter parameters for a feature. """
-            return {
-                'gender': {'user__profile__gender': value},
-                'level_of_education': {'user__profile__level_of_education': value},
-            }[feature]
-
-        def get_count(feature, value):
-            """ Get the count of enrolled students matching the feature value. """
-            return CourseEnrollment.objects.filter(
-                course_id=course_id,
-                **get_filter(feature, value)
-            ).count()
-
-        distribution = {}
-        for (short, full) in choices:
+    Returns a dict of feature to ProfileDistribution instance.
+
+    The counts for all available features are computed together in a single
+    grouped query and cached per course for DISTRIBUTION_CACHE_TIMEOUT seconds.
+    """
+    for feature in features:
+        if not feature in AVAILABLE_PROFILE_FEATURES:
+            raise ValueError(
+                "unsupported feature requested for distribution '{}'".format(
+                    feature)
+            )
+
+    cache_key = u'analytics.profile_distributions.{}'.format(course_id.to_deprecated_string())
+    counts = cache.get(cache_key)
+    if counts is None:
+        counts = _count_profile_features(course_id)
+        cache.set(cache_key, counts, DISTRIBUTION_CACHE_TIMEOUT)
+
+    distributions = {}
+    for feature in features:
+        prd = ProfileDistribution(feature)
+        feature_counts = counts[feature]
+
+        if feature in _EASY_CHOICE_FEATURES:
+            prd.type = 'EASY_CHOICE'
+
+            if feature == 'gender':
+                raw_choices = UserProfile.GENDER_CHOICES
+            elif feature == 'level_of_education':
+                raw_choices = UserProfile.LEVEL_OF_EDUCATION_CHOICES
+
+            # short name and display name (full) of the choices.
+            choices = [(short, full)
+                       for (short, full) in raw_choices] + [('no_data', 'No Data')]
+
+            distribution = dict((short, feature_counts.get(short, 0))
+                                for (short, full) in choices)
             # handle no data case
-            if short == 'no_data':
-                distribution['no_data'] = 0
-                distribution['no_data'] += get_count(feature, None)
-                distribution['no_data'] += get_count(feature, '')
-            else:
-                distribution[short] = get_count(feature, short)
-
-        prd.data = distribution
-        prd.choices_display_names = dict(choices)
-    elif feature in _OPEN_CHOICE_FEATURES:
-        prd.type = 'OPEN_CHOICE'
-        profiles = UserProfile.objects.filter(
-            user__courseenrollment__course_id=course_id
-        )
-        query_distribution = profiles.values(
-            feature).annotate(Count(feature)).order_by()
-        # query_distribution is of the form [{'featureval': 'value1', 'featureval__count': 4},
-        #    {'featureval': 'value2', 'featureval__count': 2}, ...]
-
-        distribution = dict((vald[feature], vald[feature + '__count'])
-                            for vald in query_distribution)
-        # distribution is of the form {'value1': 4, 'value2': 2, ...}
-
-        # change none to no_data for valid json key
-        if None in distribution:
-            # django does not properly count NULL values when using annotate Count
-            # so
-            #     distribution['no_data'] = distribution.pop(None)
-            # would always be 0.
-
-            # Correctly count null values
-            distribution['no_data'] = profiles.filter(
-                **{feature: None}
-            ).count()
-
-        prd.data = distribution
-
-    prd.validate()
-    return prd
+            distribution['no_data'] = feature_counts.get(None, 0) + feature_counts.get('', 0)
+
+            prd.data = distribution
+            prd.choices_display_names = dict(choices)
+        elif feature in _OPEN_CHOICE_FEATURES:
+            prd.type = 'OPEN_CHOICE'
+
+            # distribution is of the form {'value1': 4, 'value2': 2, ...}
+            distribution = dict(feature_counts)
+
+            # change none to no_data for valid json key
+            if None in distribution:
+                distribution['no_data'] = distribution.pop(None)
+
+            prd.data = distribution
+
+        prd.validate()
+        distributions[feature] = prd
+
+    return distributions
+
+
+def _count_profile_features(course_id):
+    """
+    Count the students enrolled in the course by the value of each of the
+    AVAILABLE_PROFILE_FEATURES, in one query grouped by all of the features.
+
+    Returns a dict of feature to a dict of {value: count}, where students
+    without a value are counted under None (or '').
+    """
+    profile_fields = ['user__profile__' + feature for feature in AVAILABLE_PROFILE_FEATURES]
+    # query_distribution is of the form [{'user__profile__gender': 'm', ..., 'count': 4}, ...]
+    # Counting the enrollment ids rather than the feature counts NULL values correctly.
+    query_distribution = CourseEnrollment.objects.filter(
+        course_id=course_id
+    ).values(*profile_fields).annotate(count=Count('id')).order_by()
+
+    counts = dict((feature, defaultdict(int)) for feature in AVAILABLE_PROFILE_FEATURES)
+    for row in query_distribution:
+        for feature, field in zip(AVAILABLE_PROFILE_FEATURES, profile_fields):
+            counts[feature][row[field]] += row['count']
+
+    return dict((feature, dict(feature_counts)) for feature, feature_counts in counts.iteritems())
@@ -1,18 +1,20 @@
 """ Tests for analytics.distributions """
 
+from django.core.cache import cache
 from django.test import TestCase
 from nose.tools import raises
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
-from analytics.distributions import profile_distribution, AVAILABLE_PROFILE_FEATURES
+from analytics.distributions import profile_distribution, profile_distributions, AVAILABLE_PROFILE_FEATURES
 
 
 class TestAnalyticsDistributions(TestCase):
     '''Test analytics distribution gathering.'''
 
     def setUp(self):
+        cache.clear()
         self.course_id = SlashSeparatedCourseKey('robot', 'course', 'id')
 
         self.users = [UserFactory(
@@ -49,11 +51,25 @@ class TestAnalyticsDistributions(TestCase):
         self.assertNotIn('no_data', distribution.data)
         self.assertEqual(distribution.data[1930], 1)
 
+    def test_profile_distributions_single_query(self):
+        with self.assertNumQueries(1):
+            distributions = profile_distributions(self.course_id)
+        self.assertEqual(set(distributions.keys()), set(AVAILABLE_PROFILE_FEATURES))
+        self.assertEqual(distributions['gender'].data['f'], len(self.users) / 3)
+        self.assertEqual(distributions['year_of_birth'].data[1959], 1)
+        self.assertEqual(sum(distributions['level_of_education'].data.values()), len(self.users))
+
+        # further requests for the course are served from the cache
+        with self.assertNumQueries(0):
+            for feature in AVAILABLE_PROFILE_FEATURES:
+                profile_distribution(self.course_id, feature)
+
 
 class TestAnalyticsDistributionsNoData(TestCase):
     '''Test analytics distribution gathering.'''
 
     def setUp(self):
+        cache.clear()
         self.course_id = SlashSeparatedCourseKey('robot', 'course', 'id')
 
         self.users = [UserFactory(
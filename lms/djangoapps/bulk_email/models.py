@@ -245,6 +245,19 @@ class CourseAuthorization(models.Model):
         except cls.DoesNotExist:
             return False
 
+    @classmethod
+    def instructor_email_enabled_courses(cls, course_id_list):
+        """
+        Returns the set of course ids from course_id_list for which email is
+        enabled, using at most one query.
+        """
+        if not settings.FEATURES['REQUIRE_COURSE_EMAIL_AUTH']:
+            return set(course_id_list)
+
+        return set(
+            record.course_id for record in cls.objects.filter(course_id__in=course_id_list, email_enabled=True)
+        )
+
     def __unicode__(self):
         not_en = "Not "
         if self.email_enabled:
@@ -146,3 +146,23 @@ class CourseAuthorizationTest(TestCase):
 
         # Now, course should STILL be authorized!
         self.assertTrue(CourseAuthorization.instructor_email_enabled(course_id))
+
+    @patch.dict(settings.FEATURES, {'REQUIRE_COURSE_EMAIL_AUTH': True})
+    def test_enabled_courses(self):
+        enabled = SlashSeparatedCourseKey('abc', '123', 'enabled')
+        disabled = SlashSeparatedCourseKey('abc', '123', 'disabled')
+        unknown = SlashSeparatedCourseKey('abc', '123', 'unknown')
+        CourseAuthorization(course_id=enabled, email_enabled=True).save()
+        CourseAuthorization(course_id=disabled, email_enabled=False).save()
+
+        with self.assertNumQueries(1):
+            enabled_courses = CourseAuthorization.instructor_email_enabled_courses([enabled, disabled, unknown])
+        # the course keys themselves are returned, so they can be checked against other keys
+        self.assertEqual(enabled_courses, set([enabled]))
+        self.assertIn(enabled, enabled_courses)
+
+    @patch.dict(settings.FEATURES, {'REQUIRE_COURSE_EMAIL_AUTH': False})
+    def test_enabled_courses_auth_off(self):
+        course_ids = [SlashSeparatedCourseKey('abc', '123', 'doremi')]
+        with self.assertNumQueries(0):
+            self.assertEqual(CourseAuthorization.instructor_email_enabled_courses(course_ids), set(course_ids))
@@ -4,7 +4,11 @@ Computes the data to display on the Instructor Dashboard
 from util.json_request import JsonResponse
 import json
 
+from datetime import datetime
+from pytz import UTC
+
 from courseware import models
+from django.db import transaction
 from django.db.models import Count
 from django.utils.translation import ugettext as _
 
@@ -13,10 +17,157 @@ from xmodule.modulestore.inheritance import own_metadata
 from analytics.csvs import create_csv_response
 
 from opaque_keys.edx.locations import Location
+from class_dashboard.models import CourseMetricsRollup, ProblemGradeRollup, SequentialOpenRollup
 
 # Used to limit the length of list displayed to the screen.
 MAX_SCREEN_LIST_LENGTH = 250
 
+
+def has_metrics_rollup(course_id):
+    """
+    Returns True if the metrics for `course_id` have been rolled up by `update_course_metrics`.
+    """
+    return CourseMetricsRollup.objects.filter(course_id=course_id).exists()
+
+
+def _aggregate_problem_grades(course_id, problem_set=None):
+    """
+    Aggregates the StudentModule table into a count of students for each problem, grade and max_grade.
+    """
+    db_query = models.StudentModule.objects.filter(
+        course_id__exact=course_id,
+        grade__isnull=False,
+        module_type__exact="problem",
+    )
+    if problem_set is not None:
+        db_query = db_query.filter(module_state_key__in=problem_set)
+
+    return db_query.values('module_state_key', 'grade', 'max_grade').annotate(count_grade=Count('grade'))
+
+
+def _aggregate_sequential_opens(course_id, sequential_set=None):
+    """
+    Aggregates the StudentModule table into a count of students that opened each subsection/sequential.
+    """
+    db_query = models.StudentModule.objects.filter(
+        course_id__exact=course_id,
+        module_type__exact="sequential",
+    )
+    if sequential_set is not None:
+        db_query = db_query.filter(module_state_key__in=sequential_set)
+
+    return db_query.values('module_state_key').annotate(count_sequential=Count('module_state_key'))
+
+
+def _problem_grade_rows(course_id, problem_set=None):
+    """
+    Returns a list of (`module_state_key`, `grade`, `max_grade`, `count`) tuples ordered by problem and grade.
+
+    Reads the metrics rollup if the course has one, otherwise aggregates the StudentModule table.
+
+    `problem_set` optionally restricts the rows to an array of UsageKeys.
+    """
+    if has_metrics_rollup(course_id):
+        db_query = ProblemGradeRollup.objects.filter(course_id=course_id)
+        if problem_set is not None:
+            db_query = db_query.filter(module_state_key__in=problem_set)
+        return list(db_query.order_by('module_state_key', 'grade').values_list(
+            'module_state_key', 'grade', 'max_grade', 'count',
+        ))
+
+    db_query = _aggregate_problem_grades(course_id, problem_set).order_by('module_state_key', 'grade')
+    return [
+        (row['module_state_key'], row['grade'], row['max_grade'], row['count_grade'])
+        for row in db_query
+    ]
+
+
+def _sequential_open_rows(course_id):
+    """
+    Returns a list of (`module_state_key`, `count`) tuples for the subsections/sequentials of the course.
+
+    Reads the metrics rollup if the course has one, otherwise aggregates the StudentModule table.
+    """
+    if has_metrics_rollup(course_id):
+        return list(SequentialOpenRollup.objects.filter(course_id=course_id).values_list('module_state_key', 'count'))
+
+    return [(row['module_state_key'], row['count_sequential']) for row in _aggregate_sequential_opens(course_id)]
+
+
+@transaction.commit_on_success
+def update_course_metrics(course_id, incremental=False):
+    """
+    Recomputes the metrics rollup that the dashboard reads for `course_id`.
+
+    If `incremental` is True and the course has already been rolled up, only the problems and
+    subsections with StudentModule rows modified since the last update are recomputed. Deleted
+    StudentModule rows are only accounted for by a full update.
+
+    Returns the number of problems and subsections that were recomputed.
+    """
+    started = datetime.now(UTC)
+    problem_set = sequential_set = None
+
+    try:
+        rollup = CourseMetricsRollup.objects.get(course_id=course_id)
+    except CourseMetricsRollup.DoesNotExist:
+        rollup = None
+
+    if incremental and rollup is not None:
+        modified = models.StudentModule.objects.filter(
+            course_id__exact=course_id,
+            module_type__in=("problem", "sequential"),
+            modified__gte=rollup.updated,
+        ).values_list('module_type', 'module_state_key').distinct()
+
+        problem_set = []
+        sequential_set = []
+        for module_type, module_state_key in modified:
+            usage_key = course_id.make_usage_key_from_deprecated_string(module_state_key)
+            if module_type == "problem":
+                problem_set.append(usage_key)
+            else:
+                sequential_set.append(usage_key)
+
+    grade_rollups = ProblemGradeRollup.objects.filter(course_id=course_id)
+    open_rollups = SequentialOpenRollup.objects.filter(course_id=course_id)
+    if problem_set is not None:
+        grade_rollups = grade_rollups.filter(module_state_key__in=problem_set)
+        open_rollups = open_rollups.filter(module_state_key__in=sequential_set)
+
+    grade_rollups.delete()
+    open_rollups.delete()
+
+    grade_rows = _aggregate_problem_grades(course_id, problem_set)
+    ProblemGradeRollup.objects.bulk_create([
+        ProblemGradeRollup(
+            course_id=course_id,
+            module_state_key=row['module_state_key'],
+            grade=row['grade'],
+            max_grade=row['max_grade'],
+            count=row['count_grade'],
+        )
+        for row in grade_rows
+    ])
+
+    open_rows = _aggregate_sequential_opens(course_id, sequential_set)
+    SequentialOpenRollup.objects.bulk_create([
+        SequentialOpenRollup(
+            course_id=course_id,
+            module_state_key=row['module_state_key'],
+            count=row['count_sequential'],
+        )
+        for row in open_rows
+    ])
+
+    if rollup is None:
+        rollup = CourseMetricsRollup(course_id=course_id)
+    rollup.updated = started
+    rollup.save()
+
+    return len(set(row['module_state_key'] for row in grade_rows)) + len(open_rows)
+
+
 def get_problem_grade_distribution(course_id):
     """
     Returns the grade distribution per problem for the course
@@ -31,36 +182,29 @@ def get_problem_grade_distribution(course_id):
         attempting the problem
     """
 
-    # Aggregate query on studentmodule table for grade data for all problems in course
-    db_query = models.StudentModule.objects.filter(
-        course_id__exact=course_id,
-        grade__isnull=False,
-        module_type__exact="problem",
-    ).values('module_state_key', 'grade', 'max_grade').annotate(count_grade=Count('grade'))
-
     prob_grade_distrib = {}
     total_student_count = {}
 
     # Loop through resultset building data for each problem
-    for row in db_query:
-        curr_problem = course_id.make_usage_key_from_deprecated_string(row['module_state_key'])
+    for module_state_key, grade, max_grade, count_grade in _problem_grade_rows(course_id):
+        curr_problem = course_id.make_usage_key_from_deprecated_string(module_state_key)
 
         # Build set of grade distributions for each problem that has student responses
         if curr_problem in prob_grade_distrib:
-            prob_grade_distrib[curr_problem]['grade_distrib'].append((row['grade'], row['count_grade']))
+            prob_grade_distrib[curr_problem]['grade_distrib'].append((grade, count_grade))
 
-            if (prob_grade_distrib[curr_problem]['max_grade'] != row['max_grade']) and \
-                    (prob_grade_distrib[curr_problem]['max_grade'] < row['max_grade']):
-                prob_grade_distrib[curr_problem]['max_grade'] = row['max_grade']
+            if (prob_grade_distrib[curr_problem]['max_grade'] != max_grade) and \
+                    (prob_grade_distrib[curr_problem]['max_grade'] < max_grade):
+                prob_grade_distrib[curr_problem]['max_grade'] = max_grade
 
         else:
             prob_grade_distrib[curr_problem] = {
-                'max_grade': row['max_grade'],
-                'grade_distrib': [(row['grade'], row['count_grade'])]
+                'max_grade': max_grade,
+                'grade_distrib': [(grade, count_grade)]
             }
 
         # Build set of total students attempting each problem
-        total_student_count[curr_problem] = total_student_count.get(curr_problem, 0) + row['count_grade']
+        total_student_count[curr_problem] = total_student_count.get(curr_problem, 0) + count_grade
 
     return prob_grade_distrib, total_student_count
 
@@ -74,17 +218,11 @@ def get_sequential_open_distrib(course_id):
     Outputs a dict mapping the 'module_id' to the number of students that have opened that subsection/sequential.
     """
 
-    # Aggregate query on studentmodule table for "opening a subsection" data
-    db_query = models.StudentModule.objects.filter(
-        course_id__exact=course_id,
-        module_type__exact="sequential",
-    ).values('module_state_key').annotate(count_sequential=Count('module_state_key'))
-
     # Build set of "opened" data for each subsection that has "opened" data
     sequential_open_distrib = {}
-    for row in db_query:
-        row_loc = course_id.make_usage_key_from_deprecated_string(row['module_state_key'])
-        sequential_open_distrib[row_loc] = row['count_sequential']
+    for module_state_key, count_sequential in _sequential_open_rows(course_id):
+        row_loc = course_id.make_usage_key_from_deprecated_string(module_state_key)
+        sequential_open_distrib[row_loc] = count_sequential
 
     return sequential_open_distrib
 
@@ -104,23 +242,11 @@ def get_problem_set_grade_distrib(course_id, problem_set):
       'grade_distrib' - array of tuples (`grade`,`count`) ordered by `grade`
     """
 
-    # Aggregate query on studentmodule table for grade data for set of problems in course
-    db_query = models.StudentModule.objects.filter(
-        course_id__exact=course_id,
-        grade__isnull=False,
-        module_type__exact="problem",
-        module_state_key__in=problem_set,
-    ).values(
-        'module_state_key',
-        'grade',
-        'max_grade',
-    ).annotate(count_grade=Count('grade')).order_by('module_state_key', 'grade')
-
     prob_grade_distrib = {}
 
     # Loop through resultset building data for each problem
-    for row in db_query:
-        row_loc = course_id.make_usage_key_from_deprecated_string(row['module_state_key'])
+    for module_state_key, grade, max_grade, count_grade in _problem_grade_rows(course_id, problem_set):
+        row_loc = course_id.make_usage_key_from_deprecated_string(module_state_key)
         if row_loc not in prob_grade_distrib:
             prob_grade_distrib[row_loc] = {
                 'max_grade': 0,
@@ -128,10 +254,10 @@ def get_problem_set_grade_distrib(course_id, problem_set):
             }
 
         curr_grade_distrib = prob_grade_distrib[row_loc]
-        curr_grade_distrib['grade_distrib'].append((row['grade'], row['count_grade']))
+        curr_grade_distrib['grade_distrib'].append((grade, count_grade))
 
-        if curr_grade_distrib['max_grade'] < row['max_grade']:
-            curr_grade_distrib['max_grade'] = row['max_grade']
+        if curr_grade_distrib['max_grade'] < max_grade:
+            curr_grade_distrib['max_grade'] = max_grade
 
     return prob_grade_distrib
 
@@ -0,0 +1,49 @@
+"""
+Management command to roll up the metrics shown on the class dashboard (Metrics tab in the instructor dashboard).
+
+Meant to be run periodically, e.g. from cron:
+
+    ./manage.py lms update_class_dashboard_metrics --incremental --settings=aws
+"""
+from optparse import make_option
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from xmodule.modulestore.django import modulestore
+
+from class_dashboard.dashboard_data import update_course_metrics
+
+
+class Command(BaseCommand):
+    """
+    Recompute the grade distributions and subsection open counts read by the
+    class dashboard for the given courses, or for all courses if none are given.
+
+    With --incremental, only the problems and subsections that students have
+    touched since the last run are recomputed.
+    """
+    args = "<course_id course_id ...>"
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--incremental',
+                    action='store_true',
+                    dest='incremental',
+                    default=False,
+                    help='Only recompute problems and subsections modified since the last run'),
+    )
+
+    def handle(self, *args, **options):
+        if args:
+            try:
+                course_keys = [SlashSeparatedCourseKey.from_deprecated_string(arg) for arg in args]
+            except InvalidKeyError:
+                raise CommandError("Invalid course_id")
+        else:
+            course_keys = [course.id for course in modulestore().get_courses()]
+
+        for course_key in course_keys:
+            updated = update_course_metrics(course_key, incremental=options['incremental'])
+            self.stdout.write(u"{}: updated metrics for {} modules\n".format(course_key.to_deprecated_string(), updated))
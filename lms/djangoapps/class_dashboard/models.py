@@ -0,0 +1,56 @@
+"""
+Pre-aggregated course metrics for the class dashboard (Metrics tab in the instructor dashboard).
+
+The rollup tables are filled in by the `update_class_dashboard_metrics` management command, so that
+the dashboard does not have to aggregate the whole StudentModule table for a course on every page view.
+
+WE'RE USING MIGRATIONS!
+
+If you make changes to this model, be sure to create an appropriate migration
+file and check it in at the same time as your model changes. To do that,
+
+1. Go to the edx-platform dir
+2. ./manage.py lms schemamigration class_dashboard --auto description_of_your_change
+3. Add the migration file created in edx-platform/lms/djangoapps/class_dashboard/migrations/
+"""
+from django.db import models
+
+from xmodule_django.models import CourseKeyField, LocationKeyField
+
+
+class CourseMetricsRollup(models.Model):
+    """
+    Records that the metrics of a course have been rolled up, and as of when.
+
+    The dashboard only reads from the rollup tables for courses that have a row here.
+    """
+    course_id = CourseKeyField(max_length=255, unique=True)
+
+    # StudentModule rows modified after this time are not yet reflected in the rollup
+    updated = models.DateTimeField()
+
+
+class ProblemGradeRollup(models.Model):
+    """
+    The number of students with a given grade (out of a given max_grade) on a problem.
+    """
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_state_key = LocationKeyField(max_length=255, db_column='module_id')
+    grade = models.FloatField()
+    max_grade = models.FloatField(null=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (('course_id', 'module_state_key', 'grade', 'max_grade'),)
+
+
+class SequentialOpenRollup(models.Model):
+    """
+    The number of students that have opened a subsection/sequential.
+    """
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_state_key = LocationKeyField(max_length=255, db_column='module_id')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (('course_id', 'module_state_key'),)
@@ -3,7 +3,9 @@ Tests for class dashboard (Metrics tab in instructor dashboard)
 """
 
 import json
+from datetime import datetime
 from mock import patch
+from pytz import UTC
 
 from django.test.utils import override_settings
 from django.core.urlresolvers import reverse
@@ -11,6 +13,7 @@ from django.test.client import RequestFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from courseware.tests.tests import TEST_DATA_MONGO_MODULESTORE
+from courseware.models import StudentModule
 from courseware.tests.factories import StudentModuleFactory
 from student.tests.factories import UserFactory, CourseEnrollmentFactory, AdminFactory
 from capa.tests.response_xml_factory import StringResponseXMLFactory
@@ -20,6 +23,7 @@ from class_dashboard.dashboard_data import (get_problem_grade_distribution, get_
                                             get_d3_sequential_open_distrib, get_d3_section_grade_distrib,
                                             get_section_display_name, get_array_section_has_problem,
                                             get_students_opened_subsection, get_students_problem_grades,
+                                            update_course_metrics, has_metrics_rollup,
                                             )
 from class_dashboard.views import has_instructor_access_for_class
 
@@ -156,6 +160,44 @@ class TestGetProblemGradeDistribution(ModuleStoreTestCase):
                 sum_values += problem['value']
             self.assertEquals(USER_COUNT, sum_values)
 
+    def test_metrics_rollup(self):
+
+        live_grade_distrib = get_problem_grade_distribution(self.course.id)
+        live_open_distrib = get_sequential_open_distrib(self.course.id)
+        self.assertFalse(has_metrics_rollup(self.course.id))
+
+        self.assertEquals(2 * (USER_COUNT - 1), update_course_metrics(self.course.id))
+        self.assertTrue(has_metrics_rollup(self.course.id))
+
+        # The rollup is read without aggregating the StudentModule table
+        with self.assertNumQueries(2):
+            self.assertEquals(live_grade_distrib, get_problem_grade_distribution(self.course.id))
+        with self.assertNumQueries(2):
+            self.assertEquals(live_open_distrib, get_sequential_open_distrib(self.course.id))
+
+    def test_metrics_rollup_incremental(self):
+
+        update_course_metrics(self.course.id)
+        before = get_problem_grade_distribution(self.course.id)
+
+        StudentModule.objects.filter(
+            course_id=self.course.id,
+            module_state_key=self.item.location,
+            grade=0,
+        ).update(grade=1, max_grade=1, modified=datetime.now(UTC))
+
+        # The dashboard keeps showing the rolled up metrics until the next update
+        self.assertEquals(before, get_problem_grade_distribution(self.course.id))
+
+        # Only the modified problem is recomputed
+        self.assertEquals(1, update_course_metrics(self.course.id, incremental=True))
+        prob_grade_distrib, total_student_count = get_problem_grade_distribution(self.course.id)
+        self.assertEquals([(1, USER_COUNT)], prob_grade_distrib[self.item.location]['grade_distrib'])
+        self.assertEquals(USER_COUNT, total_student_count[self.item.location])
+
+        # Nothing has changed since
+        self.assertEquals(0, update_course_metrics(self.course.id, incremental=True))
+
     def test_get_students_problem_grades(self):
 
         attributes = '?module_id=' + self.item.location.to_deprecated_string()
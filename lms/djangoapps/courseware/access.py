@@ -6,7 +6,9 @@ from datetime import datetime, timedelta
 import pytz
 
 from django.conf import settings
-from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import AnonymousUser, User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 
 from xmodule.course_module import CourseDescriptor
 from xmodule.error_module import ErrorDescriptor
@@ -18,7 +20,8 @@ from student.models import CourseEnrollmentAllowed
 from external_auth.models import ExternalAuthMap
 from courseware.masquerade import is_masquerading_as_student
 from django.utils.timezone import UTC
-from student.models import CourseEnrollment
+from request_cache import get_cache, get_current_request
+from student.models import CourseEnrollment, CourseAccessRole
 from student.roles import (
     GlobalStaff, CourseStaffRole, CourseInstructorRole,
     OrgStaffRole, OrgInstructorRole, CourseBetaTesterRole
@@ -28,6 +31,11 @@ DEBUG_ACCESS = False
 
 log = logging.getLogger(__name__)
 
+# Name of the request cache namespace holding the has_access decisions made during a request
+ACCESS_REQUEST_CACHE = 'courseware.access'
+# Name of the request cache namespace counting has_access cache hits and misses
+ACCESS_STATS_REQUEST_CACHE = 'courseware.access.stats'
+
 
 def debug(*args, **kwargs):
     # to avoid overly verbose output, this is off by default
@@ -63,11 +71,100 @@ def has_access(user, action, obj, course_key=None):
 
     Returns a bool.  It is up to the caller to actually deny access in a way
     that makes sense in context.
+
+    During a request, each distinct decision is only computed once; see
+    access_cache_stats.
     """
     # Just in case user is passed in as None, make them anonymous
     if not user:
         user = AnonymousUser()
 
+    cache_key = _access_cache_key(user, action, obj, course_key)
+    if cache_key is None:
+        return _has_access(user, action, obj, course_key)
+
+    decisions = get_cache(ACCESS_REQUEST_CACHE)
+    stats = get_cache(ACCESS_STATS_REQUEST_CACHE)
+    if cache_key in decisions:
+        stats['hits'] = stats.get('hits', 0) + 1
+    else:
+        stats['misses'] = stats.get('misses', 0) + 1
+        decisions[cache_key] = _has_access(user, action, obj, course_key)
+    return decisions[cache_key]
+
+
+def access_cache_stats():
+    """
+    Return a dict with the number of has_access decisions served from the
+    request cache ('hits') and computed ('misses') so far in this request.
+    """
+    stats = get_cache(ACCESS_STATS_REQUEST_CACHE)
+    return {'hits': stats.get('hits', 0), 'misses': stats.get('misses', 0)}
+
+
+def _access_cache_key(user, action, obj, course_key):
+    """
+    Return the key of the has_access decision in the request cache, or None if
+    the decision shouldn't be cached.
+
+    Decisions are only cached while a request is being processed, as the
+    objects they depend on (roles, enrollments, start dates) can otherwise
+    change between calls.
+    """
+    if get_current_request() is None:
+        return None
+
+    if action == 'staff' and not isinstance(obj, basestring):
+        # Staff access to anything in a course is staff access to the course
+        if isinstance(obj, CourseKey):
+            obj_course_key = obj
+        elif isinstance(obj, CourseDescriptor):
+            obj_course_key = obj.id
+        elif course_key is not None:
+            obj_course_key = course_key
+        elif isinstance(obj, UsageKey):
+            obj_course_key = obj.course_key
+        elif isinstance(obj, (XModule, XBlock)):
+            obj_course_key = obj.location.course_key
+        else:
+            return None
+        return (user.id, is_masquerading_as_student(user), action, ('course', obj_course_key))
+
+    if isinstance(obj, XModule):
+        # delegates to the decision for its descriptor
+        return None
+    elif isinstance(obj, CourseDescriptor):
+        obj_key = ('course', obj.id)
+    elif isinstance(obj, ErrorDescriptor):
+        obj_key = ('error', obj.location)
+    elif isinstance(obj, XBlock):
+        obj_key = ('descriptor', obj.location)
+    elif isinstance(obj, (CourseKey, UsageKey, basestring)):
+        obj_key = (type(obj).__name__, obj)
+    else:
+        # has_access will complain about the unknown type
+        return None
+
+    return (user.id, is_masquerading_as_student(user), action, obj_key, course_key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=CourseAccessRole)
+@receiver(post_delete, sender=CourseAccessRole)
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_save, sender=CourseEnrollmentAllowed)
+def clear_access_cache(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Forget the has_access decisions of the request when the users, roles or
+    enrollments they depend on change.
+    """
+    get_cache(ACCESS_REQUEST_CACHE).clear()
+
+
+def _has_access(user, action, obj, course_key):
+    """
+    Compute the has_access decision, without the request cache.
+    """
     # delegate the work to type-specific functions.
     # (start with more specific types, then get more general)
     if isinstance(obj, CourseDescriptor):
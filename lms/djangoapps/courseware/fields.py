@@ -0,0 +1,39 @@
+"""
+Custom model fields used by courseware models.
+"""
+import base64
+import zlib
+
+from django.db import models
+from south.modelsinspector import add_introspection_rules
+add_introspection_rules([], [r"^courseware\.fields\.CompressedTextField"])
+
+
+class CompressedTextField(models.TextField):
+    """
+    A TextField that is stored zlib-compressed and base64 encoded, so the
+    column can stay a plain text column. Values are only stored compressed
+    when that makes them shorter, and values without the compression prefix
+    (including every row written before this field was introduced) are read
+    back unchanged.
+    """
+    description = "Text stored zlib-compressed in the database"
+
+    __metaclass__ = models.SubfieldBase
+
+    PREFIX = 'zlib:'
+
+    def to_python(self, value):
+        if isinstance(value, basestring) and value.startswith(self.PREFIX):
+            return zlib.decompress(base64.b64decode(value[len(self.PREFIX):])).decode('utf-8')
+        return value
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+
+        raw = value.encode('utf-8') if isinstance(value, unicode) else value
+        compressed = self.PREFIX + base64.b64encode(zlib.compress(raw))
+        if len(compressed) < len(raw):
+            return compressed
+        return value
@@ -1,6 +1,7 @@
 # Compute grades using real division, with no integer truncation
 from __future__ import division
 from collections import defaultdict
+from itertools import islice
 import json
 import random
 import logging
@@ -14,7 +15,9 @@ from dogapi import dog_stats_api
 
 from courseware import courses
 from courseware.model_data import FieldDataCache
-from student.models import anonymous_id_for_user
+from student.models import (
+    ANONYMOUS_ID_CHUNK_SIZE, anonymous_id_for_user, anonymous_ids_for_users
+)
 from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
@@ -521,25 +524,51 @@ def iterate_grades_for(course_id, students):
     # grading that student.
     request = RequestFactory().get('/')
 
-    for student in students:
-        with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=['action:{}'.format(course_id)]):
-            try:
-                request.user = student
-                # Grading calls problem rendering, which calls masquerading,
-                # which checks session vars -- thus the empty session dict below.
-                # It's not pretty, but untangling that is currently beyond the
-                # scope of this feature.
-                request.session = {}
-                gradeset = grade(student, request, course)
-                yield student, gradeset, ""
-            except Exception as exc:  # pylint: disable=broad-except
-                # Keep marching on even if this student couldn't be graded for
-                # some reason, but log it for future reference.
-                log.exception(
-                    'Cannot grade student %s (%s) in course %s because of exception: %s',
-                    student.username,
-                    student.id,
-                    course_id,
-                    exc.message
-                )
-                yield student, {}, exc.message
+    for student_chunk in _chunked(students, ANONYMOUS_ID_CHUNK_SIZE):
+        # Compute and save the anonymous ids of the whole chunk up front, so
+        # grading each student doesn't query for them.
+        anonymous_ids_for_users(student_chunk, course_id)
+        anonymous_ids_for_users(student_chunk, None)
+
+        for student in student_chunk:
+            for result in _grade_for_iteration(course, course_id, request, student):
+                yield result
+
+
+def _chunked(items, chunk_size):
+    """
+    Yields lists of up to chunk_size consecutive values from the iterable items
+    """
+    iterator = iter(items)
+    chunk = list(islice(iterator, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, chunk_size))
+
+
+def _grade_for_iteration(course, course_id, request, student):
+    """
+    Yield the (student, gradeset, err_msg) tuple for `student` described in
+    `iterate_grades_for`.
+    """
+    with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=['action:{}'.format(course_id)]):
+        try:
+            request.user = student
+            # Grading calls problem rendering, which calls masquerading,
+            # which checks session vars -- thus the empty session dict below.
+            # It's not pretty, but untangling that is currently beyond the
+            # scope of this feature.
+            request.session = {}
+            gradeset = grade(student, request, course)
+            yield student, gradeset, ""
+        except Exception as exc:  # pylint: disable=broad-except
+            # Keep marching on even if this student couldn't be graded for
+            # some reason, but log it for future reference.
+            log.exception(
+                'Cannot grade student %s (%s) in course %s because of exception: %s',
+                student.username,
+                student.id,
+                course_id,
+                exc.message
+            )
+            yield student, {}, exc.message
@@ -0,0 +1,34 @@
+"""
+Middleware for the courseware app.
+"""
+from django.conf import settings
+
+from courseware.models import StudentModuleHistory
+from courseware.tasks import save_student_module_history
+
+
+class StudentModuleHistoryMiddleware(object):
+    """
+    Buffers the StudentModuleHistory rows created while handling a request and
+    writes them in one batch once the response is ready. When
+    FEATURES['ENABLE_ASYNC_STUDENT_MODULE_HISTORY'] is set, the batch is handed
+    to a celery task instead of being written by the web process.
+
+    This must be listed before TransactionMiddleware, so that the batch is
+    written after the request's transaction has committed. If the view raises,
+    the buffered rows are dropped along with the rolled back changes.
+    """
+    def process_request(self, request):  # pylint: disable=unused-argument
+        StudentModuleHistory.start_buffering()
+
+    def process_exception(self, request, exception):  # pylint: disable=unused-argument
+        StudentModuleHistory.pop_pending()
+
+    def process_response(self, request, response):  # pylint: disable=unused-argument
+        pending = StudentModuleHistory.pop_pending()
+        if pending:
+            if settings.FEATURES.get('ENABLE_ASYNC_STUDENT_MODULE_HISTORY'):
+                save_student_module_history.delay([entry.to_dict() for entry in pending])
+            else:
+                StudentModuleHistory.objects.bulk_create(pending)
+        return response
@@ -40,12 +40,26 @@ def chunks(items, chunk_size):
     return (items[i:i + chunk_size] for i in xrange(0, len(items), chunk_size))
 
 
+def _update_field_object(field_object):
+    """
+    Save a field object whose row was already created by `FieldDataCache.find_or_create`
+    as a single UPDATE. If the row has since been deleted, save it again as a new row.
+    """
+    try:
+        field_object.save(force_update=True)
+    except DatabaseError:
+        # Django raises this when the forced UPDATE matched no rows
+        if type(field_object).objects.filter(pk=field_object.pk).exists():
+            raise
+        field_object.save()
+
+
 class FieldDataCache(object):
     """
     A cache of django model objects needed to supply the data
     for a module and its decendants
     """
-    def __init__(self, descriptors, course_id, user, select_for_update=False):
+    def __init__(self, descriptors, course_id, user, select_for_update=False, student_modules=None):
         '''
         Find any courseware.models objects that are needed by any descriptor
         in descriptors. Attempts to minimize the number of queries to the database.
@@ -57,10 +71,12 @@ class FieldDataCache(object):
         course_id: The id of the current course
         user: The user for which to cache data
         select_for_update: True if rows should be locked until end of transaction
+        student_modules: The StudentModules of user for descriptors, if they were already loaded
         '''
         self.cache = {}
         self.descriptors = descriptors
         self.select_for_update = select_for_update
+        self._student_modules = student_modules
 
         assert isinstance(course_id, CourseKey)
         self.course_id = course_id
@@ -86,6 +102,22 @@ class FieldDataCache(object):
         select_for_update: Flag indicating whether the rows should be locked until end of transaction
         """
 
+        return cls.cache_for_descriptor_trees(
+            course_id, user, [(descriptor, depth)], descriptor_filter, select_for_update
+        )
+
+    @classmethod
+    def cache_for_descriptor_trees(cls, course_id, user, trees,
+                                   descriptor_filter=lambda descriptor: True,
+                                   select_for_update=False):
+        """
+        Like cache_for_descriptor_descendents, but for several subtrees at once, so that
+        the data for all of them is loaded with a single set of queries.
+
+        trees: a list of (descriptor, depth) pairs. Descriptors that are part of more
+            than one of the subtrees are only cached once.
+        """
+
         def get_child_descriptors(descriptor, depth, descriptor_filter):
             """
             Return a list of all child descriptors down to the specified depth
@@ -109,10 +141,40 @@ class FieldDataCache(object):
 
             return descriptors
 
-        descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
+        descriptors = []
+        usage_ids = set()
+        for descriptor, depth in trees:
+            for child in get_child_descriptors(descriptor, depth, descriptor_filter):
+                if child.scope_ids.usage_id not in usage_ids:
+                    usage_ids.add(child.scope_ids.usage_id)
+                    descriptors.append(child)
 
         return FieldDataCache(descriptors, course_id, user, select_for_update)
 
+    @classmethod
+    def cache_for_descriptor_users(cls, course_id, users, descriptor, select_for_update=False):
+        """
+        Returns a dict mapping the id of each of `users` to a FieldDataCache for `descriptor`
+        (but not its descendents) and that user. The StudentModules of all of the users are
+        loaded with a single query, rather than one per user.
+        """
+        student_modules = defaultdict(list)
+        query = StudentModule.objects
+        if select_for_update:
+            query = query.select_for_update()
+        for users_chunk in chunks(users, 500):
+            for student_module in query.filter(
+                course_id=course_id,
+                module_state_key=descriptor.scope_ids.usage_id,
+                student__in=[user.pk for user in users_chunk],
+            ):
+                student_modules[student_module.student_id].append(student_module)
+
+        return dict(
+            (user.id, cls([descriptor], course_id, user, select_for_update, student_modules[user.id]))
+            for user in users
+        )
+
     def _query(self, model_class, **kwargs):
         """
         Queries model_class with **kwargs, optionally adding select_for_update if
@@ -143,6 +205,8 @@ class FieldDataCache(object):
         Queries the database for all of the fields in the specified scope
         """
         if scope == Scope.user_state:
+            if self._student_modules is not None:
+                return self._student_modules
             return self._chunked_query(
                 StudentModule,
                 'module_state_key__in',
@@ -329,6 +393,9 @@ class DjangoKeyValueStore(KeyValueStore):
         saved_fields = []
         # field_objects maps a field_object to a list of associated fields
         field_objects = dict()
+        # user_states maps a StudentModule to its decoded state, so that the state
+        # is decoded and encoded once no matter how many of its fields are dirty
+        user_states = dict()
         for field in kv_dict:
             # Check field for validity
             if field.scope not in self._allowed_scopes:
@@ -336,25 +403,29 @@ class DjangoKeyValueStore(KeyValueStore):
 
             # If the field is valid and isn't already in the dictionary, add it.
             field_object = self._field_data_cache.find_or_create(field)
-            if field_object not in field_objects.keys():
+            if field_object not in field_objects:
                 field_objects[field_object] = []
             # Update the list of associated fields
             field_objects[field_object].append(field)
 
             # Special case when scope is for the user state, because this scope saves fields in a single row
             if field.scope == Scope.user_state:
-                state = json.loads(field_object.state)
-                state[field.field_name] = kv_dict[field]
-                field_object.state = json.dumps(state)
+                if field_object not in user_states:
+                    user_states[field_object] = json.loads(field_object.state)
+                user_states[field_object][field.field_name] = kv_dict[field]
             else:
             # The remaining scopes save fields on different rows, so
             # we don't have to worry about conflicts
                 field_object.value = json.dumps(kv_dict[field])
 
+        for field_object, state in user_states.iteritems():
+            field_object.state = json.dumps(state)
+
         for field_object in field_objects:
             try:
-                # Save the field object that we made above
-                field_object.save()
+                # Save the field object that we made above. find_or_create has already
+                # created its row, so this is a single UPDATE.
+                _update_field_object(field_object)
                 # If save is successful on this scope, add the saved fields to
                 # the list of successful saves
                 saved_fields.extend([field.field_name for field in field_objects[field_object]])
@@ -374,7 +445,7 @@ class DjangoKeyValueStore(KeyValueStore):
             state = json.loads(field_object.state)
             del state[key.field_name]
             field_object.state = json.dumps(state)
-            field_object.save()
+            _update_field_object(field_object)
         else:
             field_object.delete()
 
@@ -18,8 +18,14 @@ from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from request_cache import get_cache
+from courseware.fields import CompressedTextField
 from xmodule_django.models import CourseKeyField, LocationKeyField
 
+# Name of the request cache namespace that buffers StudentModuleHistory rows
+# until the end of the request (see courseware.middleware)
+HISTORY_REQUEST_CACHE = 'courseware.student_module_history'
+
 
 class StudentModule(models.Model):
     """
@@ -96,7 +102,12 @@ class StudentModule(models.Model):
 class StudentModuleHistory(models.Model):
     """Keeps a complete history of state changes for a given XModule for a given
     Student. Right now, we restrict this to problems so that the table doesn't
-    explode in size."""
+    explode in size.
+
+    State is stored compressed, and rows carry the course_id of their
+    StudentModule so the table can be partitioned by (course_id, created).
+    Inside a request, rows are buffered and written in one batch when the
+    request ends (see courseware.middleware.StudentModuleHistoryMiddleware)."""
 
     HISTORY_SAVING_TYPES = {'problem'}
 
@@ -106,9 +117,12 @@ class StudentModuleHistory(models.Model):
     student_module = models.ForeignKey(StudentModule, db_index=True)
     version = models.CharField(max_length=255, null=True, blank=True, db_index=True)
 
+    # Copied from the StudentModule; null for rows written before it was added
+    course_id = CourseKeyField(max_length=255, null=True, blank=True)
+
     # This should be populated from the modified field in StudentModule
     created = models.DateTimeField(db_index=True)
-    state = models.TextField(null=True, blank=True)
+    state = CompressedTextField(null=True, blank=True)
     grade = models.FloatField(null=True, blank=True)
     max_grade = models.FloatField(null=True, blank=True)
 
@@ -117,16 +131,63 @@ class StudentModuleHistory(models.Model):
         """
         Checks the instance's module_type, and creates & saves a
         StudentModuleHistory entry if the module_type is one that
-        we save.
+        we save. If the current request is buffering history, the
+        entry is queued rather than saved.
         """
         if instance.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES:
             history_entry = StudentModuleHistory(student_module=instance,
+                                                 course_id=instance.course_id,
                                                  version=None,
                                                  created=instance.modified,
                                                  state=instance.state,
                                                  grade=instance.grade,
                                                  max_grade=instance.max_grade)
-            history_entry.save()
+            pending = get_cache(HISTORY_REQUEST_CACHE).get('pending')
+            if pending is None:
+                history_entry.save()
+            else:
+                pending.append(history_entry)
+
+    @classmethod
+    def start_buffering(cls):
+        """
+        Queue history entries created by this thread until `pop_pending` is called.
+        """
+        get_cache(HISTORY_REQUEST_CACHE)['pending'] = []
+
+    @classmethod
+    def pop_pending(cls):
+        """
+        Stop buffering and return the list of queued (unsaved) history entries.
+        """
+        return get_cache(HISTORY_REQUEST_CACHE).pop('pending', None) or []
+
+    @classmethod
+    def flush_pending(cls):
+        """
+        Write any history entries queued so far in one query, and keep buffering.
+        Use this when a request needs to read back history it has just created.
+        """
+        namespace = get_cache(HISTORY_REQUEST_CACHE)
+        pending = namespace.get('pending')
+        if pending:
+            namespace['pending'] = []
+            cls.objects.bulk_create(pending)
+
+    def to_dict(self):
+        """
+        Return the fields of this entry as a JSON-serializable dict, suitable for
+        passing to `courseware.tasks.save_student_module_history`.
+        """
+        return {
+            'student_module_id': self.student_module_id,
+            'course_id': self.course_id.to_deprecated_string() if self.course_id else None,
+            'version': self.version,
+            'created': self.created.isoformat(),
+            'state': self.state,
+            'grade': self.grade,
+            'max_grade': self.max_grade,
+        }
 
 
 class XModuleUserStateSummaryField(models.Model):
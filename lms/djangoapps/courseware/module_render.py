@@ -1,10 +1,15 @@
 import json
 import logging
 import mimetypes
+import urllib
+
+from datetime import datetime, timedelta
 
 import static_replace
 
 from functools import partial
+from urlparse import urlparse
+from pytz import UTC
 from requests.auth import HTTPBasicAuth
 from dogapi import dog_stats_api
 from opaque_keys import InvalidKeyError
@@ -12,20 +17,22 @@ from opaque_keys import InvalidKeyError
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.cache import cache
-from django.core.urlresolvers import reverse
-from django.http import Http404, HttpResponse
+from django.core.urlresolvers import resolve, reverse
+from django.http import Http404, HttpResponse, QueryDict
 from django.views.decorators.csrf import csrf_exempt
 
 from capa.xqueue_interface import XQueueInterface
 from courseware.access import has_access, get_user_role
-from courseware.masquerade import setup_masquerade
+from courseware.masquerade import setup_masquerade, is_masquerading_as_student
 from courseware.model_data import FieldDataCache, DjangoKeyValueStore
 from lms.lib.xblock.field_data import LmsFieldData
 from lms.lib.xblock.runtime import LmsModuleSystem, unquote_slashes, quote_slashes
 from edxmako.shortcuts import render_to_string
 from eventtracking import tracker
 from psychometrics.psychoanalyze import make_psychometrics_data_update_handler
+from request_cache import get_cache, get_current_request
 from student.models import anonymous_id_for_user, user_by_anonymous_id
+from student.roles import CourseBetaTesterRole
 from xblock.core import XBlock
 from xblock.fields import Scope
 from xblock.runtime import KvsFieldData, KeyValueStore
@@ -36,6 +43,7 @@ from xmodule.exceptions import NotFoundError, ProcessingError
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.modulestore.django import modulestore, ModuleI18nService
 from xmodule.modulestore.exceptions import ItemNotFoundError
+from xmodule.modulestore.search import get_course_version
 from xmodule.util.duedate import get_extended_due_date
 from xmodule_modifiers import replace_course_urls, replace_jump_to_id_urls, replace_static_urls, add_staff_markup, wrap_xblock
 from xmodule.lti_module import LTIModule
@@ -59,6 +67,10 @@ XQUEUE_INTERFACE = XQueueInterface(
     REQUESTS_AUTH,
 )
 
+# Name of the request cache holding the parts of LmsModuleSystem that are shared by every block
+# bound to the same user and course during a request (see _get_shared_module_system_parts)
+MODULE_SYSTEM_REQUEST_CACHE = 'courseware.module_render.module_system'
+
 # TODO: course_id and course_key are used interchangeably in this file, which is wrong.
 # Some brave person should make the variable names consistently someday, but the code's
 # coupled enough that it's kind of tricky--you've been warned!
@@ -82,6 +94,20 @@ def make_track_function(request):
     return function
 
 
+def toc_cache_key(user_id, course_key):
+    """
+    Returns the cache key of the table of contents of the course `course_key` for user `user_id`.
+    """
+    return u"courseware.toc.{}.{}".format(user_id, course_key)
+
+
+def toc_cache_timeout():
+    """
+    Returns the longest time, in seconds, a table of contents is kept in the shared cache.
+    """
+    return getattr(settings, 'TOC_CACHE_TIMEOUT', 60 * 60)
+
+
 def toc_for_course(user, request, course, active_chapter, active_section, field_data_cache):
     '''
     Create a table of contents from the module store
@@ -104,8 +130,84 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
     None if this is not the case.
 
     field_data_cache must include data from the course module and 2 levels of its descendents
+
+    The table of contents is cached per user and course, along with the course
+    version and the user's staff, beta tester and masquerade state it was built
+    for, so that only the active flags are computed on every call.
     '''
+    toc_state = _toc_state(user, course)
+    key = toc_cache_key(user.id, course.id)
+    cached = cache.get(key) if toc_state is not None else None
+    if cached is not None and cached['state'] == toc_state:
+        chapters = cached['chapters']
+    else:
+        chapters = _build_toc(user, request, course, field_data_cache)
+        if chapters is None:
+            return None
+        if toc_state is not None:
+            timeout = _toc_timeout(course, toc_state[2])
+            if timeout > 0:
+                cache.set(key, {'state': toc_state, 'chapters': chapters}, timeout)
+
+    return [
+        dict(
+            chapter,
+            active=chapter['url_name'] == active_chapter,
+            sections=[
+                dict(
+                    section,
+                    active=(chapter['url_name'] == active_chapter and
+                            section['url_name'] == active_section)
+                )
+                for section in chapter['sections']
+            ]
+        )
+        for chapter in chapters
+    ]
+
 
+def _toc_state(user, course):
+    """
+    Returns what, besides the user and the course, decides which chapters and sections
+    `user` sees in `course`, or None if the table of contents shouldn't be cached (the
+    course's modulestore doesn't version it, or caching is turned off).
+    """
+    version = get_course_version(course)
+    if version is None or toc_cache_timeout() <= 0:
+        return None
+    return (
+        version,
+        has_access(user, 'staff', course),
+        CourseBetaTesterRole(course.id).has_user(user),
+        is_masquerading_as_student(user),
+    )
+
+
+def _toc_timeout(course, is_beta_tester):
+    """
+    Returns how long a table of contents of `course` may be cached: at most
+    toc_cache_timeout(), and not past the next start date of a chapter or section,
+    when it may become visible.
+    """
+    now = datetime.now(UTC)
+    timeout = toc_cache_timeout()
+    for chapter in course.get_children():
+        for descriptor in [chapter] + chapter.get_children():
+            start = descriptor.start
+            if start is None:
+                continue
+            if is_beta_tester and descriptor.days_early_for_beta is not None:
+                start -= timedelta(descriptor.days_early_for_beta)
+            if start > now:
+                timeout = min(timeout, int((start - now).total_seconds()) + 1)
+    return timeout
+
+
+def _build_toc(user, request, course, field_data_cache):
+    """
+    Returns the table of contents of `course` for `user`, without active flags, or
+    None if the user can't load the course. See toc_for_course.
+    """
     course_module = get_module_for_descriptor(user, request, course, field_data_cache, course.id)
     if course_module is None:
         return None
@@ -117,23 +219,17 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
 
         sections = list()
         for section in chapter.get_display_items():
-
-            active = (chapter.url_name == active_chapter and
-                      section.url_name == active_section)
-
             if not section.hide_from_toc:
                 sections.append({'display_name': section.display_name_with_default,
                                  'url_name': section.url_name,
                                  'format': section.format if section.format is not None else '',
                                  'due': get_extended_due_date(section),
-                                 'active': active,
                                  'graded': section.graded,
                                  })
 
         chapters.append({'display_name': chapter.display_name_with_default,
                          'url_name': chapter.url_name,
-                         'sections': sections,
-                         'active': chapter.url_name == active_chapter})
+                         'sections': sections})
     return chapters
 
 
@@ -224,6 +320,107 @@ def get_module_for_descriptor(user, request, descriptor, field_data_cache, cours
                                               static_asset_path, user_location)
 
 
+def _get_shared_module_system_parts(user, descriptor, course_id, wrap_xmodule_display, static_asset_path):
+    """
+    Returns a dict of the parts of an LmsModuleSystem that don't depend on the block being bound:
+    the url rewriters, the block wrappers, the staff flags and the i18n service.
+
+    A vertical binds each of its children to the same user and course, so during a request these
+    parts are built once per (user, course, static assets) and shared by every block. Outside of a
+    request (e.g. in celery tasks) they are rebuilt on every call, since nothing would clear them.
+    """
+    data_dir = getattr(descriptor, 'data_dir', None)
+    static_asset_path = static_asset_path or descriptor.static_asset_path
+    key = (
+        user.id, is_masquerading_as_student(user), course_id, data_dir, static_asset_path, wrap_xmodule_display,
+    )
+    shared = get_cache(MODULE_SYSTEM_REQUEST_CACHE) if get_current_request() is not None else {}
+    if key not in shared:
+        shared[key] = _build_shared_module_system_parts(
+            user, course_id, data_dir, static_asset_path, wrap_xmodule_display
+        )
+    return shared[key]
+
+
+def _build_shared_module_system_parts(user, course_id, data_dir, static_asset_path, wrap_xmodule_display):
+    """
+    Builds the dict returned by _get_shared_module_system_parts.
+    """
+    # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
+    # function, we just need to specify something to get the reverse() to work.
+    jump_to_id_base_url = reverse(
+        'jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}
+    )
+    # Staff access to anything in a course is decided at the course level
+    user_is_staff = has_access(user, u'staff', course_id)
+
+    # Build a list of wrapping functions that will be applied in order
+    # to the Fragment content coming out of the xblocks that are about to be rendered.
+    block_wrappers = []
+
+    # Wrap the output display in a single div to allow for the XModule
+    # javascript to be bound correctly
+    if wrap_xmodule_display is True:
+        block_wrappers.append(partial(
+            wrap_xblock, 'LmsRuntime',
+            extra_data={'course-id': course_id.to_deprecated_string()},
+            usage_id_serializer=lambda usage_id: quote_slashes(usage_id.to_deprecated_string())
+        ))
+
+    # TODO (cpennington): When modules are shared between courses, the static
+    # prefix is going to have to be specific to the module, not the directory
+    # that the xml was loaded from
+
+    # Rewrite urls beginning in /static to point to course-specific content
+    block_wrappers.append(partial(
+        replace_static_urls,
+        data_dir,
+        course_id=course_id,
+        static_asset_path=static_asset_path
+    ))
+
+    # Allow URLs of the form '/course/' refer to the root of multicourse directory
+    #   hierarchy of this course
+    block_wrappers.append(partial(replace_course_urls, course_id))
+
+    # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
+    # is an improvement over the /course/... format for studio authored courses,
+    # because it is agnostic to course-hierarchy.
+    block_wrappers.append(partial(replace_jump_to_id_urls, course_id, jump_to_id_base_url))
+
+    if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
+        if user_is_staff:
+            has_instructor_access = has_access(user, 'instructor', course_id)
+            block_wrappers.append(partial(add_staff_markup, user, has_instructor_access))
+
+    return {
+        'block_wrappers': block_wrappers,
+        # TODO (cpennington): This should be removed when all html from
+        # a module is coming through get_html and is therefore covered
+        # by the replace_static_urls code below
+        'replace_urls': partial(
+            static_replace.replace_static_urls,
+            data_directory=data_dir,
+            course_id=course_id,
+            static_asset_path=static_asset_path,
+        ),
+        'replace_course_urls': partial(
+            static_replace.replace_course_urls,
+            course_key=course_id
+        ),
+        'replace_jump_to_id_urls': partial(
+            static_replace.replace_jump_to_id_urls,
+            course_id=course_id,
+            jump_to_id_base_url=jump_to_id_base_url
+        ),
+        'user_is_staff': user_is_staff,
+        'user_is_admin': has_access(user, u'staff', 'global'),
+        'i18n_service': ModuleI18nService(),
+        # anonymous ids by the course they're specific to, filled in as blocks ask for them
+        'anonymous_student_ids': {},
+    }
+
+
 def get_module_system_for_user(user, field_data_cache,
                                # Arguments preceding this comment have user binding, those following don't
                                descriptor, course_id, track_function, xqueue_callback_url_prefix,
@@ -262,6 +459,18 @@ def get_module_system_for_user(user, field_data_cache,
         )
         return xqueue_callback_url_prefix + relative_xqueue_callback_url
 
+    def make_xqueue_batch_callback(dispatch='score_update'):
+        # Fully qualified callback URL for the results of all of the students of this module
+        relative_xqueue_batch_callback_url = reverse(
+            'xqueue_batch_callback',
+            kwargs=dict(
+                course_id=course_id.to_deprecated_string(),
+                mod_id=descriptor.location.to_deprecated_string(),
+                dispatch=dispatch
+            ),
+        )
+        return xqueue_callback_url_prefix + relative_xqueue_batch_callback_url
+
     # Default queuename is course-specific and is derived from the course that
     #   contains the current module.
     # TODO: Queuename should be derived from 'course_settings.json' of each course
@@ -270,6 +479,7 @@ def get_module_system_for_user(user, field_data_cache,
     xqueue = {
         'interface': XQUEUE_INTERFACE,
         'construct_callback': make_xqueue_callback,
+        'construct_batch_callback': make_xqueue_batch_callback,
         'default_queuename': xqueue_default_queuename.replace(' ', '_'),
         'waittime': settings.XQUEUE_WAITTIME_BETWEEN_REQUESTS
     }
@@ -394,50 +604,7 @@ def get_module_system_for_user(user, field_data_cache,
         module.runtime = inner_system
         inner_system.xmodule_instance = module
 
-    # Build a list of wrapping functions that will be applied in order
-    # to the Fragment content coming out of the xblocks that are about to be rendered.
-    block_wrappers = []
-
-    # Wrap the output display in a single div to allow for the XModule
-    # javascript to be bound correctly
-    if wrap_xmodule_display is True:
-        block_wrappers.append(partial(
-            wrap_xblock, 'LmsRuntime',
-            extra_data={'course-id': course_id.to_deprecated_string()},
-            usage_id_serializer=lambda usage_id: quote_slashes(usage_id.to_deprecated_string())
-        ))
-
-    # TODO (cpennington): When modules are shared between courses, the static
-    # prefix is going to have to be specific to the module, not the directory
-    # that the xml was loaded from
-
-    # Rewrite urls beginning in /static to point to course-specific content
-    block_wrappers.append(partial(
-        replace_static_urls,
-        getattr(descriptor, 'data_dir', None),
-        course_id=course_id,
-        static_asset_path=static_asset_path or descriptor.static_asset_path
-    ))
-
-    # Allow URLs of the form '/course/' refer to the root of multicourse directory
-    #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
-
-    # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
-    # is an improvement over the /course/... format for studio authored courses,
-    # because it is agnostic to course-hierarchy.
-    # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
-    # function, we just need to specify something to get the reverse() to work.
-    block_wrappers.append(partial(
-        replace_jump_to_id_urls,
-        course_id,
-        reverse('jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}),
-    ))
-
-    if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
-        if has_access(user, 'staff', descriptor, course_id):
-            has_instructor_access = has_access(user, 'instructor', descriptor, course_id)
-            block_wrappers.append(partial(add_staff_markup, user, has_instructor_access))
+    shared = _get_shared_module_system_parts(user, descriptor, course_id, wrap_xmodule_display, static_asset_path)
 
     # These modules store data using the anonymous_student_id as a key.
     # To prevent loss of data, we will continue to provide old modules with
@@ -448,10 +615,11 @@ def get_module_system_for_user(user, field_data_cache,
     is_pure_xblock = isinstance(descriptor, XBlock) and not isinstance(descriptor, XModuleDescriptor)
     module_class = getattr(descriptor, 'module_class', None)
     is_lti_module = not is_pure_xblock and issubclass(module_class, LTIModule)
-    if is_pure_xblock or is_lti_module:
-        anonymous_student_id = anonymous_id_for_user(user, course_id)
-    else:
-        anonymous_student_id = anonymous_id_for_user(user, None)
+    anonymous_id_course = course_id if is_pure_xblock or is_lti_module else None
+    anonymous_student_ids = shared['anonymous_student_ids']
+    if anonymous_id_course not in anonymous_student_ids:
+        anonymous_student_ids[anonymous_id_course] = anonymous_id_for_user(user, anonymous_id_course)
+    anonymous_student_id = anonymous_student_ids[anonymous_id_course]
 
     system = LmsModuleSystem(
         track_function=track_function,
@@ -464,24 +632,9 @@ def get_module_system_for_user(user, field_data_cache,
         user=user,
         debug=settings.DEBUG,
         hostname=settings.SITE_NAME,
-        # TODO (cpennington): This should be removed when all html from
-        # a module is coming through get_html and is therefore covered
-        # by the replace_static_urls code below
-        replace_urls=partial(
-            static_replace.replace_static_urls,
-            data_directory=getattr(descriptor, 'data_dir', None),
-            course_id=course_id,
-            static_asset_path=static_asset_path or descriptor.static_asset_path,
-        ),
-        replace_course_urls=partial(
-            static_replace.replace_course_urls,
-            course_key=course_id
-        ),
-        replace_jump_to_id_urls=partial(
-            static_replace.replace_jump_to_id_urls,
-            course_id=course_id,
-            jump_to_id_base_url=reverse('jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''})
-        ),
+        replace_urls=shared['replace_urls'],
+        replace_course_urls=shared['replace_course_urls'],
+        replace_jump_to_id_urls=shared['replace_jump_to_id_urls'],
         node_path=settings.NODE_PATH,
         publish=publish,
         anonymous_student_id=anonymous_student_id,
@@ -492,10 +645,10 @@ def get_module_system_for_user(user, field_data_cache,
         can_execute_unsafe_code=(lambda: can_execute_unsafe_code(course_id)),
         # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist (cpennington)
         mixins=descriptor.runtime.mixologist._mixins,  # pylint: disable=protected-access
-        wrappers=block_wrappers,
+        wrappers=list(shared['block_wrappers']),
         get_real_user=user_by_anonymous_id,
         services={
-            'i18n': ModuleI18nService(),
+            'i18n': shared['i18n_service'],
         },
         get_user_role=lambda: get_user_role(user, course_id),
         descriptor_runtime=descriptor.runtime,
@@ -519,11 +672,11 @@ def get_module_system_for_user(user, field_data_cache,
             make_psychometrics_data_update_handler(course_id, user, descriptor.location)
         )
 
-    system.set(u'user_is_staff', has_access(user, u'staff', descriptor.location, course_id))
-    system.set(u'user_is_admin', has_access(user, u'staff', 'global'))
+    system.set(u'user_is_staff', shared['user_is_staff'])
+    system.set(u'user_is_admin', shared['user_is_admin'])
 
     # make an ErrorDescriptor -- assuming that the descriptor's system is ok
-    if has_access(user, u'staff', descriptor.location, course_id):
+    if shared['user_is_staff']:
         system.error_descriptor_class = ErrorDescriptor
     else:
         system.error_descriptor_class = NonStaffErrorDescriptor
@@ -618,6 +771,97 @@ def xqueue_callback(request, course_id, userid, mod_id, dispatch):
     return HttpResponse("")
 
 
+@csrf_exempt
+def xqueue_batch_callback(request, course_id, mod_id, dispatch):
+    '''
+    Entry point for the graded results of many students for the same problem from the queueing system.
+
+    The results are POSTed as 'xqueue_results', a JSON-serialized list of the packages that
+    xqueue_callback expects, i.e. dicts with an 'xqueue_header' and an 'xqueue_body'. Each result
+    is for the student of the 'lms_callback_url' in its header.
+
+    The problem is loaded once for all of the results, and the state of all of the students with a
+    single query. Returns the 'lms_key's of the results that couldn't be applied, so that the
+    queueing system can send them again.
+    '''
+    try:
+        results = json.loads(request.POST['xqueue_results'])
+    except (KeyError, ValueError):
+        raise Http404
+    if not isinstance(results, list):
+        raise Http404
+
+    packages = []
+    for result in results:
+        package = _parse_batched_xqueue_result(result, course_id, mod_id, dispatch)
+        if package is None:
+            raise Http404
+        packages.append(package)
+
+    course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
+    usage_key = course_key.make_usage_key_from_deprecated_string(mod_id)
+    descriptor = modulestore().get_item(usage_key)
+    users = User.objects.in_bulk(set(user_id for user_id, __, __ in packages))
+    field_data_caches = FieldDataCache.cache_for_descriptor_users(
+        course_key, users.values(), descriptor, select_for_update=True
+    )
+
+    failed = []
+    for user_id, header, result in packages:
+        user = users.get(user_id)
+        instance = None
+        if user is not None:
+            instance = get_module_for_descriptor(
+                user, request, descriptor, field_data_caches[user.id], course_key, grade_bucket_type='xqueue'
+            )
+        if instance is None:
+            log.debug("No module %s for user %s--access denied?", mod_id, user_id)
+            failed.append(header['lms_key'])
+            continue
+
+        data = QueryDict('', mutable=True)
+        data.update({'xqueue_header': result['xqueue_header'], 'xqueue_body': result['xqueue_body']})
+        # Transfer 'queuekey' from xqueue response header to the data, as xqueue_callback does
+        data['queuekey'] = header['lms_key']
+        try:
+            instance.handle_ajax(dispatch, data)
+            # Save any state that has changed to the underlying KeyValueStore
+            instance.save()
+        except Exception:  # pylint: disable=broad-except
+            log.exception("error processing batched xqueue result for user %s", user_id)
+            failed.append(header['lms_key'])
+
+    return JsonResponse({'failed': failed})
+
+
+def _parse_batched_xqueue_result(result, course_id, mod_id, dispatch):
+    """
+    Returns (user id, parsed header, result) for one of the results POSTed to xqueue_batch_callback,
+    or None if it's malformed or its 'lms_callback_url' isn't for `mod_id` and `dispatch`.
+    """
+    if not isinstance(result, dict) or 'xqueue_header' not in result or 'xqueue_body' not in result:
+        return None
+    try:
+        header = json.loads(result['xqueue_header'])
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or 'lms_key' not in header or 'lms_callback_url' not in header:
+        return None
+
+    try:
+        match = resolve(urllib.unquote(urlparse(header['lms_callback_url']).path))
+    except Http404:
+        return None
+    if match.url_name != 'xqueue_callback' or \
+            (match.kwargs['course_id'], match.kwargs['mod_id'], match.kwargs['dispatch']) != (course_id, mod_id, dispatch):
+        return None
+    try:
+        user_id = int(match.kwargs['userid'])
+    except ValueError:
+        return None
+    return user_id, header, result
+
+
 @csrf_exempt
 def handle_xblock_callback_noauth(request, course_id, usage_id, handler, suffix=None):
     """
@@ -0,0 +1,24 @@
+"""
+Celery tasks for the courseware app.
+"""
+import dateutil.parser
+from celery import task
+
+from courseware.models import StudentModuleHistory
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+
+@task()  # pylint: disable=E1102
+def save_student_module_history(entries):
+    """
+    Write a batch of StudentModuleHistory rows in one query. `entries` is a
+    list of dicts as returned by `StudentModuleHistory.to_dict`.
+    """
+    history = []
+    for entry in entries:
+        entry = dict(entry)
+        entry['created'] = dateutil.parser.parse(entry['created'])
+        if entry['course_id'] is not None:
+            entry['course_id'] = SlashSeparatedCourseKey.from_deprecated_string(entry['course_id'])
+        history.append(StudentModuleHistory(**entry))
+    StudentModuleHistory.objects.bulk_create(history)
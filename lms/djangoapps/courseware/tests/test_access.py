@@ -10,6 +10,8 @@ from django.test.utils import override_settings
 from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory
 from student.tests.factories import AnonymousUserFactory, CourseEnrollmentAllowedFactory
 from courseware.tests.tests import TEST_DATA_MIXED_MODULESTORE
+from request_cache.middleware import RequestCache
+from student.roles import CourseStaffRole
 import pytz
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
@@ -232,3 +234,45 @@ class UserRoleTestCase(TestCase):
             'student',
             access.get_user_role(self.anonymous_user, self.course_key)
         )
+
+
+class AccessRequestCacheTestCase(TestCase):
+    """
+    Tests of the memoization of has_access decisions during a request
+    """
+
+    def setUp(self):
+        self.course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        self.student = UserFactory()
+        self.middleware = RequestCache()
+        self.middleware.process_request(Mock())
+
+    def tearDown(self):
+        self.middleware.process_response(Mock(), Mock())
+
+    def test_decisions_cached(self):
+        location = self.course_key.make_usage_key('problem', 'test')
+        with mock.patch('courseware.access._has_access_to_course', wraps=access._has_access_to_course) as mock_check:
+            # staff access to anything in the course is the same decision
+            self.assertFalse(access.has_access(self.student, 'staff', self.course_key))
+            self.assertFalse(access.has_access(self.student, 'staff', location))
+            self.assertFalse(access.has_access(self.student, 'staff', location, self.course_key))
+            self.assertEqual(mock_check.call_count, 1)
+        self.assertEqual(access.access_cache_stats(), {'hits': 2, 'misses': 1})
+
+    def test_cache_cleared_on_role_change(self):
+        self.assertFalse(access.has_access(self.student, 'staff', self.course_key))
+        CourseStaffRole(self.course_key).add_users(self.student)
+        self.assertTrue(access.has_access(self.student, 'staff', self.course_key))
+
+    def test_masquerade(self):
+        staff = UserFactory(is_staff=True)
+        self.assertTrue(access.has_access(staff, 'staff', self.course_key))
+        staff.masquerade_as_student = True
+        self.assertFalse(access.has_access(staff, 'staff', self.course_key))
+
+    def test_not_cached_outside_request(self):
+        self.middleware.process_response(Mock(), Mock())
+        self.assertFalse(access.has_access(self.student, 'staff', self.course_key))
+        self.assertFalse(access.has_access(self.student, 'staff', self.course_key))
+        self.assertEqual(access.access_cache_stats(), {'hits': 0, 'misses': 0})
@@ -0,0 +1,95 @@
+"""
+Tests for StudentModuleHistory storage and its batching middleware.
+"""
+import json
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.client import RequestFactory
+from mock import patch
+
+from courseware.middleware import StudentModuleHistoryMiddleware
+from courseware.models import StudentModuleHistory
+from courseware.tasks import save_student_module_history
+from courseware.tests.factories import StudentModuleFactory
+from request_cache.middleware import RequestCache
+
+
+class StudentModuleHistoryTest(TestCase):
+    """
+    Tests for StudentModuleHistory
+    """
+    def setUp(self):
+        self.state = json.dumps({'attempts': 1, 'student_answers': {'input_1': 'x' * 500}})
+        self.middleware = StudentModuleHistoryMiddleware()
+        self.request = RequestFactory().get('/')
+        RequestCache.clear_request_cache()
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def test_saved_outside_request(self):
+        module = StudentModuleFactory(state=self.state)
+        entry = StudentModuleHistory.objects.get(student_module=module)
+        self.assertEqual(entry.state, self.state)
+        self.assertEqual(entry.course_id, module.course_id)
+
+    def test_state_compressed(self):
+        module = StudentModuleFactory(state=self.state)
+        cursor = connection.cursor()
+        cursor.execute("SELECT state FROM courseware_studentmodulehistory WHERE student_module_id = %s", [module.id])
+        stored = cursor.fetchone()[0]
+        self.assertTrue(stored.startswith('zlib:'))
+        self.assertLess(len(stored), len(self.state))
+
+    def test_short_state_not_compressed(self):
+        module = StudentModuleFactory(state='{}')
+        cursor = connection.cursor()
+        cursor.execute("SELECT state FROM courseware_studentmodulehistory WHERE student_module_id = %s", [module.id])
+        self.assertEqual(cursor.fetchone()[0], '{}')
+        self.assertEqual(StudentModuleHistory.objects.get(student_module=module).state, '{}')
+
+    def test_buffered_until_response(self):
+        self.middleware.process_request(self.request)
+        module = StudentModuleFactory(state=self.state)
+        module.state = json.dumps({'attempts': 2})
+        module.save()
+        self.assertFalse(StudentModuleHistory.objects.filter(student_module=module).exists())
+
+        # Both rows are written by a single INSERT
+        with self.assertNumQueries(1):
+            self.middleware.process_response(self.request, HttpResponse())
+        self.assertEqual(
+            [self.state, json.dumps({'attempts': 2})],
+            [entry.state for entry in StudentModuleHistory.objects.filter(student_module=module).order_by('id')]
+        )
+
+    def test_flush_pending(self):
+        self.middleware.process_request(self.request)
+        module = StudentModuleFactory(state=self.state)
+        StudentModuleHistory.flush_pending()
+        self.assertEqual(1, StudentModuleHistory.objects.filter(student_module=module).count())
+
+        # Nothing is written twice at the end of the request
+        self.middleware.process_response(self.request, HttpResponse())
+        self.assertEqual(1, StudentModuleHistory.objects.filter(student_module=module).count())
+
+    def test_dropped_on_exception(self):
+        self.middleware.process_request(self.request)
+        module = StudentModuleFactory(state=self.state)
+        self.middleware.process_exception(self.request, Exception())
+        self.middleware.process_response(self.request, HttpResponse(status=500))
+        self.assertFalse(StudentModuleHistory.objects.filter(student_module=module).exists())
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_ASYNC_STUDENT_MODULE_HISTORY': True})
+    def test_async_write(self):
+        self.middleware.process_request(self.request)
+        module = StudentModuleFactory(state=self.state)
+        # Run the task in-process in place of handing it to a worker
+        with patch.object(save_student_module_history, 'delay', side_effect=save_student_module_history) as mock_delay:
+            self.middleware.process_response(self.request, HttpResponse())
+        self.assertTrue(mock_delay.called)
+
+        entry = StudentModuleHistory.objects.get(student_module=module)
+        self.assertEqual(entry.state, self.state)
+        self.assertEqual(entry.course_id, module.course_id)
+        self.assertEqual(entry.created, module.modified)
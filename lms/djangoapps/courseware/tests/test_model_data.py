@@ -7,7 +7,7 @@ from functools import partial
 
 from courseware.model_data import DjangoKeyValueStore
 from courseware.model_data import InvalidScopeError, FieldDataCache
-from courseware.models import StudentModule
+from courseware.models import StudentModule, StudentModuleHistory
 from courseware.models import XModuleStudentInfoField, XModuleStudentPrefsField
 
 from student.tests.factories import UserFactory
@@ -162,6 +162,43 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
         for key in kv_dict:
             self.assertEquals(self.kvs.get(key), kv_dict[key])
 
+    def test_set_many_single_update(self):
+        "Test that setting many user_state fields writes the StudentModule (and its history) once"
+        kv_dict = self.construct_kv_dict()
+        history_count = StudentModuleHistory.objects.count()
+
+        # One UPDATE of the StudentModule, one INSERT of its history
+        with self.assertNumQueries(2):
+            self.kvs.set_many(kv_dict)
+
+        self.assertEquals(history_count + 1, StudentModuleHistory.objects.count())
+        self.assertEquals(
+            {'a_field': 'a_value', 'b_field': 'b_value', 'field_a': 'new value', 'field_b': 'newer value'},
+            json.loads(StudentModule.objects.all()[0].state)
+        )
+
+    def test_set_many_deleted_student_module(self):
+        "Test that setting many user_state fields recreates a StudentModule deleted after it was loaded"
+        kv_dict = self.construct_kv_dict()
+        StudentModule.objects.all().delete()
+
+        self.kvs.set_many(kv_dict)
+
+        self.assertEquals(1, StudentModule.objects.all().count())
+        self.assertEquals(
+            {'a_field': 'a_value', 'b_field': 'b_value', 'field_a': 'new value', 'field_b': 'newer value'},
+            json.loads(StudentModule.objects.all()[0].state)
+        )
+
+    def test_delete_deleted_student_module(self):
+        "Test that deleting a field recreates a StudentModule deleted after it was loaded"
+        StudentModule.objects.all().delete()
+
+        self.kvs.delete(user_state_key('a_field'))
+
+        self.assertEquals(1, StudentModule.objects.all().count())
+        self.assertEquals({'b_field': 'b_value'}, json.loads(StudentModule.objects.all()[0].state))
+
     def test_set_many_failure(self):
         "Test failures when setting many fields that are scoped to Scope.user_state"
         kv_dict = self.construct_kv_dict()
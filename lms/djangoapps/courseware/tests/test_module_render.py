@@ -5,10 +5,13 @@ from ddt import ddt, data
 from functools import partial
 from mock import MagicMock, patch, Mock
 import json
+from datetime import datetime, timedelta
+from pytz import UTC
 
 from django.http import Http404, HttpResponse
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
@@ -17,7 +20,7 @@ from django.contrib.auth.models import AnonymousUser
 from capa.tests.response_xml_factory import OptionResponseXMLFactory
 from xblock.field_data import FieldData
 from xblock.runtime import Runtime
-from xblock.fields import ScopeIds
+from xblock.fields import Scope, ScopeIds
 from xmodule.lti_module import LTIDescriptor
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -37,6 +40,7 @@ from courseware.tests.modulestore_config import TEST_DATA_MONGO_MODULESTORE
 from courseware.tests.modulestore_config import TEST_DATA_XML_MODULESTORE
 from courseware.tests.test_submitting_problems import TestSubmittingProblems
 
+from request_cache.middleware import RequestCache
 from student.models import anonymous_id_for_user
 from lms.lib.xblock.runtime import quote_slashes
 
@@ -162,6 +166,92 @@ class ModuleRenderTestCase(ModuleStoreTestCase, LoginEnrollmentTestCase):
         self.assertEquals('Unauthenticated', response.content)
 
 
+@override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
+class TestXQueueBatchCallback(ModuleStoreTestCase):
+    """
+    Tests of applying many graded results for the same problem at once
+    """
+    def setUp(self):
+        self.course = CourseFactory.create()
+        self.problem = ItemFactory.create(parent_location=self.course.location, category='problem')
+        self.users = [UserFactory.create() for __ in range(3)]
+        self.course_id = self.course.id.to_deprecated_string()
+        self.mod_id = self.problem.location.to_deprecated_string()
+        self.dispatch = 'score_update'
+        self.batch_url = reverse('xqueue_batch_callback', kwargs=dict(
+            course_id=self.course_id, mod_id=self.mod_id, dispatch=self.dispatch
+        ))
+
+    def make_result(self, user_id, lms_key, mod_id=None):
+        """Returns a graded result for user `user_id`, as xqueue would send it back"""
+        callback_url = 'http://testserver' + reverse('xqueue_callback', kwargs=dict(
+            course_id=self.course_id, userid=str(user_id), mod_id=mod_id or self.mod_id, dispatch=self.dispatch
+        ))
+        return {
+            'xqueue_header': json.dumps({
+                'lms_key': lms_key,
+                'lms_callback_url': callback_url,
+                'lms_batch_callback_url': 'http://testserver' + self.batch_url,
+            }),
+            'xqueue_body': 'hello world',
+        }
+
+    def post_results(self, results, modules):
+        """Posts `results` to the batch callback, binding each user to its mock module in `modules`"""
+        request = RequestFactory().post(self.batch_url, {'xqueue_results': json.dumps(results)})
+        with patch('courseware.module_render.get_module_for_descriptor') as mock_get_module:
+            mock_get_module.side_effect = lambda user, *args, **kwargs: modules[user.id]
+            response = render.xqueue_batch_callback(request, self.course_id, self.mod_id, self.dispatch)
+        return json.loads(response.content)
+
+    def test_results_applied(self):
+        modules = dict((user.id, MagicMock()) for user in self.users)
+        results = [self.make_result(user.id, 'key{}'.format(user.id)) for user in self.users]
+        self.assertEqual(self.post_results(results, modules), {'failed': []})
+
+        for user in self.users:
+            module = modules[user.id]
+            self.assertEqual(module.handle_ajax.call_count, 1)
+            dispatch, data = module.handle_ajax.call_args[0]
+            self.assertEqual(dispatch, self.dispatch)
+            self.assertEqual(data['queuekey'], 'key{}'.format(user.id))
+            self.assertEqual(data['xqueue_body'], 'hello world')
+            module.save.assert_called_once_with()
+
+    def test_failed_results(self):
+        modules = dict((user.id, MagicMock()) for user in self.users)
+        modules[self.users[0].id].handle_ajax.side_effect = Exception
+        modules[self.users[1].id] = None
+        results = [self.make_result(user.id, 'key{}'.format(user.id)) for user in self.users]
+        results.append(self.make_result(9999, 'unknown'))
+
+        failed = self.post_results(results, modules)['failed']
+        self.assertEqual(failed, ['key{}'.format(self.users[0].id), 'key{}'.format(self.users[1].id), 'unknown'])
+        self.assertEqual(modules[self.users[2].id].save.call_count, 1)
+
+    def test_result_for_other_problem(self):
+        other_mod_id = self.course.id.make_usage_key('problem', 'other').to_deprecated_string()
+        with self.assertRaises(Http404):
+            self.post_results([self.make_result(self.users[0].id, 'key', mod_id=other_mod_id)], {})
+
+    def test_malformed_results(self):
+        with self.assertRaises(Http404):
+            self.post_results({'not': 'a list'}, {})
+        with self.assertRaises(Http404):
+            self.post_results([{'xqueue_header': '{}', 'xqueue_body': ''}], {})
+
+    def test_state_loaded_at_once(self):
+        StudentModuleFactory.create(
+            student=self.users[0], course_id=self.course.id, module_state_key=self.problem.location
+        )
+        with self.assertNumQueries(1):
+            caches = FieldDataCache.cache_for_descriptor_users(self.course.id, self.users, self.problem)
+        self.assertEqual(sorted(caches), sorted(user.id for user in self.users))
+        key = (Scope.user_state, self.problem.location)
+        self.assertIsNotNone(caches[self.users[0].id].cache.get(key))
+        self.assertIsNone(caches[self.users[1].id].cache.get(key))
+
+
 @override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
 class TestHandleXBlockCallback(ModuleStoreTestCase, LoginEnrollmentTestCase):
     """
@@ -380,6 +470,121 @@ class TestTOC(TestCase):
             self.assertIn(toc_section, actual)
 
 
+@override_settings(MODULESTORE=TEST_DATA_MONGO_MODULESTORE, TOC_CACHE_TIMEOUT=60 * 60)
+class TestTOCCache(ModuleStoreTestCase):
+    """Check that tables of contents are cached per user and course version"""
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.request = RequestFactory().get('dummy_url')
+        self.request.user = self.user
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent_location=course.location, category='chapter', display_name='Overview')
+        ItemFactory.create(parent_location=chapter.location, category='sequential', display_name='Welcome')
+        self.chapter = chapter
+
+    def get_course(self):
+        """Reload the course, so that it carries its current version"""
+        return modulestore().get_course(self.chapter.location.course_key, depth=2)
+
+    def get_toc(self, course, chapter=None, section=None):
+        """Returns the table of contents of `course` for self.user"""
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course.id, self.user, course, depth=2)
+        return render.toc_for_course(self.user, self.request, course, chapter, section, field_data_cache)
+
+    def test_cached(self):
+        course = self.get_course()
+        toc = self.get_toc(course)
+
+        with patch('courseware.module_render.get_module_for_descriptor') as mock_get_module:
+            cached_toc = self.get_toc(course, 'Overview', 'Welcome')
+        self.assertFalse(mock_get_module.called)
+
+        # Only the active flags differ
+        self.assertFalse(toc[0]['active'])
+        self.assertFalse(toc[0]['sections'][0]['active'])
+        self.assertTrue(cached_toc[0]['active'])
+        self.assertTrue(cached_toc[0]['sections'][0]['active'])
+        self.assertEqual(toc[0]['sections'][0]['url_name'], cached_toc[0]['sections'][0]['url_name'])
+
+    def test_course_edit(self):
+        self.get_toc(self.get_course())
+        ItemFactory.create(parent_location=self.chapter.location, category='sequential', display_name='Homework')
+        toc = self.get_toc(self.get_course())
+        self.assertEqual(
+            ['Welcome', 'Homework'],
+            [section['display_name'] for section in toc[0]['sections']]
+        )
+
+    def test_timeout_before_start(self):
+        ItemFactory.create(
+            parent_location=self.chapter.location,
+            category='sequential',
+            display_name='Exam',
+            start=datetime.now(UTC) + timedelta(minutes=5),
+            days_early_for_beta=1,
+        )
+        course = self.get_course()
+        self.assertLessEqual(render._toc_timeout(course, False), 5 * 60 + 1)  # pylint: disable=protected-access
+        self.assertEqual(render._toc_timeout(course, True), 60 * 60)  # pylint: disable=protected-access
+
+
+@override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
+class TestSharedModuleSystemParts(ModuleStoreTestCase):
+    """
+    Check that sibling blocks bound during a request share the user and course parts of their runtimes
+    """
+    def setUp(self):
+        self.user = UserFactory.create()
+        self.course = CourseFactory.create()
+        vertical = ItemFactory.create(parent_location=self.course.location, category='vertical')
+        self.descriptors = [
+            ItemFactory.create(parent_location=vertical.location, category='html')
+            for __ in range(3)
+        ]
+        self.field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+            self.course.id, self.user, vertical
+        )
+        self.middleware = RequestCache()
+        self.middleware.process_request(Mock())
+
+    def tearDown(self):
+        self.middleware.process_response(Mock(), Mock())
+
+    def bind_all(self):
+        """Binds every sibling to self.user, returning their runtimes"""
+        return [
+            render.get_module_for_descriptor_internal(
+                self.user, descriptor, self.field_data_cache, self.course.id, Mock(), ''
+            ).runtime
+            for descriptor in self.descriptors
+        ]
+
+    def test_shared_within_request(self):
+        with patch('courseware.module_render.reverse', wraps=reverse) as mock_reverse:
+            systems = self.bind_all()
+        self.assertEqual(mock_reverse.call_count, 1)
+        self.assertEqual(len(set(system.anonymous_student_id for system in systems)), 1)
+        self.assertIs(systems[0].replace_urls, systems[-1].replace_urls)
+        # each block still gets its own list of wrappers
+        self.assertIsNot(systems[0].wrappers, systems[-1].wrappers)
+        self.assertEqual(len(systems[0].wrappers), len(systems[-1].wrappers))
+
+    def test_not_shared_outside_request(self):
+        self.middleware.process_response(Mock(), Mock())
+        with patch('courseware.module_render.reverse', wraps=reverse) as mock_reverse:
+            self.bind_all()
+        self.assertEqual(mock_reverse.call_count, len(self.descriptors))
+
+    def test_staff_flags(self):
+        self.user.is_staff = True
+        systems = self.bind_all()
+        self.assertTrue(all(system.user_is_staff for system in systems))
+        self.user.masquerade_as_student = True
+        systems = self.bind_all()
+        self.assertFalse(any(system.user_is_staff for system in systems))
+
+
 @override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
 class TestHtmlModifiers(ModuleStoreTestCase):
     """
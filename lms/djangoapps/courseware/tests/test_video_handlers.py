@@ -20,6 +20,7 @@ from cache_toolbox.core import del_cached_content
 from xmodule.exceptions import NotFoundError
 
 from xmodule.video_module.transcripts_utils import (
+    Transcript,
     TranscriptException,
     TranscriptsGenerationException,
 )
@@ -261,6 +262,22 @@ class TestTranscriptDownloadDispatch(TestVideo):
         self.assertEqual(response.headers['Content-Type'], 'text/plain; charset=utf-8')
         self.assertEqual(response.headers['Content-Language'], 'en')
 
+    @patch('xmodule.video_module.VideoModule.get_transcript', return_value=('Subs!', 'test_filename.srt', 'application/x-subrip; charset=utf-8'))
+    def test_download_etag(self, __):
+        request = Request.blank('/download')
+        response = self.item.transcript(request=request, dispatch='download')
+        etag = response.headers['ETag']
+
+        request = Request.blank('/download', headers={'If-None-Match': etag})
+        response = self.item.transcript(request=request, dispatch='download')
+        self.assertEqual(response.status, '304 Not Modified')
+        self.assertEqual(response.body, '')
+        self.assertEqual(response.headers['ETag'], etag)
+
+        request = Request.blank('/download', headers={'If-None-Match': '"stale"'})
+        response = self.item.transcript(request=request, dispatch='download')
+        self.assertEqual(response.body, 'Subs!')
+
     def test_download_en_no_sub(self):
         request = Request.blank('/download')
         response = self.item.transcript(request=request, dispatch='download')
@@ -656,6 +673,24 @@ class TestGetTranscript(TestVideo):
         self.assertEqual(filename[:-4], self.item.sub)
         self.assertEqual(mime_type, 'application/x-subrip; charset=utf-8')
 
+    def test_converted_transcript_cached(self):
+        """
+        Test that a transcript is converted once per version of its source.
+        """
+        sjson = _create_file(content='{"start": [270], "end": [2720], "text": ["Hi, welcome to Edx."]}')
+        _upload_sjson_file(sjson, self.item.location)
+        self.item.sub = _get_subs_id(sjson.name)
+        text = self.item.get_transcript()[0]
+
+        with patch.object(Transcript, 'convert') as mock_convert:
+            self.assertEqual(self.item.get_transcript()[0], text)
+        self.assertFalse(mock_convert.called)
+
+        # A new version of the transcript is converted again
+        sjson = _create_file(content='{"start": [270], "end": [2720], "text": ["Bye."]}')
+        _upload_sjson_file(sjson, self.item.location, 'subs_{}.srt.sjson'.format(self.item.sub))
+        self.assertIn('Bye.', self.item.get_transcript()[0])
+
     def test_good_txt_transcript(self):
         good_sjson = _create_file(content=textwrap.dedent("""\
                 {
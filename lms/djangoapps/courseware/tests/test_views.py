@@ -8,6 +8,7 @@ from datetime import datetime
 from mock import MagicMock, patch
 from pytz import UTC
 
+from django.db import connection
 from django.test import TestCase
 from django.http import Http404
 from django.test.utils import override_settings
@@ -29,6 +30,7 @@ from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from student.tests.factories import UserFactory
 
 import courseware.views as views
+from courseware.model_data import FieldDataCache
 from courseware.tests.modulestore_config import TEST_DATA_MIXED_MODULESTORE
 from course_modes.models import CourseMode
 import shoppingcart
@@ -516,3 +518,58 @@ class ProgressPageTests(ModuleStoreTestCase):
     def test_non_asci_grade_cutoffs(self):
         resp = views.progress(self.request, self.course.id.to_deprecated_string())
         self.assertEqual(resp.status_code, 200)
+
+
+@override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
+class IndexQueryTests(ModuleStoreTestCase):
+    """
+    Tests that the courseware index loads the user's data once per request.
+    """
+    def setUp(self):
+        self.user = UserFactory.create()
+        course = CourseFactory(start=datetime(2013, 9, 16, 7, 17, 28, tzinfo=UTC))
+        chapter = ItemFactory(category='chapter', parent_location=course.location)  # pylint: disable=no-member
+        section = ItemFactory(category='sequential', parent_location=chapter.location)
+        vertical = ItemFactory(category='vertical', parent_location=section.location)
+        ItemFactory(category='problem', parent_location=vertical.location)
+        ItemFactory(category='html', parent_location=vertical.location)
+
+        CourseEnrollment.enroll(self.user, course.id)
+        self.assertTrue(self.client.login(username=self.user.username, password='test'))
+        self.url = reverse('courseware_section', kwargs={
+            'course_id': course.id.to_deprecated_string(),
+            'chapter': chapter.location.name,
+            'section': section.location.name,
+        })
+
+    def get_studentmodule_selects(self):
+        """
+        Fetches the section and returns the queries that read StudentModules.
+        """
+        use_debug_cursor = connection.use_debug_cursor
+        connection.use_debug_cursor = True
+        start = len(connection.queries)
+        try:
+            response = self.client.get(self.url)
+        finally:
+            connection.use_debug_cursor = use_debug_cursor
+        self.assertEqual(response.status_code, 200)
+        return [
+            query['sql'] for query in connection.queries[start:]
+            if query['sql'].startswith('SELECT') and 'FROM "courseware_studentmodule" ' in query['sql']
+        ]
+
+    def test_single_field_data_cache(self):
+        with patch.object(
+            FieldDataCache, 'cache_for_descriptor_trees', wraps=FieldDataCache.cache_for_descriptor_trees
+        ) as mock_cache:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_cache.call_count, 1)
+
+    def test_studentmodule_queries(self):
+        # The first visit creates the StudentModules of the course, chapter and section
+        self.get_studentmodule_selects()
+
+        # Afterwards, all of them are read by a single query
+        self.assertEqual(1, len(self.get_studentmodule_selects()))
@@ -104,9 +104,7 @@ def render_accordion(request, course, chapter, section, field_data_cache):
     Returns the html string
     """
     # grab the table of contents
-    user = User.objects.prefetch_related("groups").get(id=request.user.id)
-    request.user = user	 # keep just one instance of User
-    toc = toc_for_course(user, request, course, chapter, section, field_data_cache)
+    toc = toc_for_course(request.user, request, course, chapter, section, field_data_cache)
 
     context = dict([
         ('toc', toc),
@@ -279,8 +277,24 @@ def index(request, course_id, chapter=None, section=None,
     masq = setup_masquerade(request, staff_access)
 
     try:
-        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-            course_key, user, course, depth=2)
+        chapter_descriptor = None
+        section_descriptor = None
+        if chapter is not None:
+            chapter_descriptor = course.get_child_by(lambda m: m.location.name == chapter)
+        if chapter_descriptor is not None and section is not None:
+            section_descriptor = chapter_descriptor.get_child_by(lambda m: m.location.name == section)
+            if section_descriptor is not None:
+                # cdodge: this looks silly, but let's refetch the section_descriptor with depth=None
+                # which will prefetch the children more efficiently than doing a recursive load
+                section_descriptor = modulestore().get_item(section_descriptor.location, depth=None)
+
+        # Load the user's data for the accordion (2 levels of the course) and for all
+        # descendants of the section, because we're going to display its html, which in
+        # general will need all of its children, with a single set of queries
+        trees = [(course, 2)]
+        if section_descriptor is not None:
+            trees.append((section_descriptor, None))
+        field_data_cache = FieldDataCache.cache_for_descriptor_trees(course_key, user, trees)
 
         course_module = get_module_for_descriptor(user, request, course, field_data_cache, course_key)
         if course_module is None:
@@ -325,7 +339,6 @@ def index(request, course_id, chapter=None, section=None,
 
         context['show_chat'] = show_chat
 
-        chapter_descriptor = course.get_child_by(lambda m: m.location.name == chapter)
         if chapter_descriptor is not None:
             save_child_position(course_module, chapter)
         else:
@@ -340,8 +353,6 @@ def index(request, course_id, chapter=None, section=None,
             raise Http404
 
         if section is not None:
-            section_descriptor = chapter_descriptor.get_child_by(lambda m: m.location.name == section)
-
             if section_descriptor is None:
                 # Specifically asked-for section doesn't exist
                 if masq == 'student':  # if staff is masquerading as student be kinder, don't 404
@@ -360,15 +371,6 @@ def index(request, course_id, chapter=None, section=None,
             if section_descriptor.default_tab:
                 context['default_tab'] = section_descriptor.default_tab
 
-            # cdodge: this looks silly, but let's refetch the section_descriptor with depth=None
-            # which will prefetch the children more efficiently than doing a recursive load
-            section_descriptor = modulestore().get_item(section_descriptor.location, depth=None)
-
-            # Load all descendants of the section, because we're going to display its
-            # html, which in general will need all of its children
-            section_field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-                course_key, user, section_descriptor, depth=None)
-
             # Verify that position a string is in fact an int
             if position is not None:
                 try:
@@ -380,7 +382,7 @@ def index(request, course_id, chapter=None, section=None,
                 request.user,
                 request,
                 section_descriptor,
-                section_field_data_cache,
+                field_data_cache,
                 course_key,
                 position
             )
@@ -841,6 +843,7 @@ def submission_history(request, course_id, student_username, location):
     # If no history records exist, let's force a save to get history started.
     if not history_entries:
         student_module.save()
+        StudentModuleHistory.flush_pending()
         history_entries = StudentModuleHistory.objects.filter(
             student_module=student_module
         ).order_by('-id')
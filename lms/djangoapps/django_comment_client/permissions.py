@@ -7,23 +7,103 @@ from types import NoneType
 from django.core import cache
 from opaque_keys.edx.keys import CourseKey
 
+from django_comment_common.models import Role, FORUM_ROLE_STUDENT
+from request_cache import get_cache
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
 CACHE = cache.get_cache('default')
 CACHE_LIFESPAN = 60
+REQUEST_CACHE_NAME = 'django_comment_client.permissions'
 
 
 def cached_has_permission(user, permission, course_id=None):
     """
-    Call has_permission if it's not cached. A change in a user's role or
-    a role's permissions will only become effective after CACHE_LIFESPAN seconds.
+    Check `permission` against the user's permission matrix for the course.
+    A change in a user's role or a role's permissions will only become
+    effective after CACHE_LIFESPAN seconds.
     """
     assert isinstance(course_id, (NoneType, CourseKey))
-    key = u"permission_{user_id:d}_{course_id}_{permission}".format(
-        user_id=user.id, course_id=course_id, permission=permission)
-    val = CACHE.get(key, None)
-    if val not in [True, False]:
-        val = has_permission(user, permission, course_id=course_id)
-        CACHE.set(key, val, CACHE_LIFESPAN)
-    return val
+    return permission in get_user_permissions(user, course_id)
+
+
+def get_user_permissions(user, course_id=None):
+    """
+    Return the frozenset of forum permission names that `user` holds in
+    `course_id`, across all of the user's roles in the course.
+
+    The set is computed at most once per request, and is shared between
+    requests through the default cache for CACHE_LIFESPAN seconds.
+    """
+    assert isinstance(course_id, (NoneType, CourseKey))
+    request_cache = get_cache(REQUEST_CACHE_NAME)
+    request_key = ('user_permissions', user.id, course_id)
+    if request_key not in request_cache:
+        key = u"permissions_{user_id:d}_{course_id}".format(user_id=user.id, course_id=course_id)
+        permissions = CACHE.get(key, None)
+        if permissions is None:
+            permissions = _load_user_permissions(user, course_id)
+            CACHE.set(key, permissions, CACHE_LIFESPAN)
+        request_cache[request_key] = permissions
+    return request_cache[request_key]
+
+
+def _load_user_permissions(user, course_id):
+    """
+    Load the user's roles in the course along with their permissions, and
+    apply the same restrictions as `Role.has_permission`.
+    """
+    permissions = set()
+    roles = user.roles.filter(course_id=course_id).prefetch_related('permissions')
+    for role in roles:
+        role_permissions = set(permission.name for permission in role.permissions.all())
+        if role.name == FORUM_ROLE_STUDENT:
+            course = modulestore().get_course(course_id)
+            if course is None:
+                raise ItemNotFoundError(course_id)
+            if not course.forum_posts_allowed:
+                role_permissions = set(
+                    name for name in role_permissions
+                    if not name.startswith(('edit', 'update', 'create'))
+                )
+        permissions |= role_permissions
+    return frozenset(permissions)
+
+
+def get_course_role_ids(course_id):
+    """
+    Return a dict mapping the name of every non-student forum role in the
+    course to the sorted list of ids of the users holding it.
+
+    Like `get_user_permissions`, the result is computed at most once per
+    request and shared between requests for CACHE_LIFESPAN seconds.
+    """
+    request_cache = get_cache(REQUEST_CACHE_NAME)
+    request_key = ('course_role_ids', course_id)
+    if request_key not in request_cache:
+        key = u"forum_role_ids_{course_id}".format(course_id=course_id)
+        role_ids = CACHE.get(key, None)
+        if role_ids is None:
+            role_ids = _load_course_role_ids(course_id)
+            CACHE.set(key, role_ids, CACHE_LIFESPAN)
+        request_cache[request_key] = role_ids
+    # hand out copies so callers can't modify the cached lists
+    return dict((name, list(ids)) for name, ids in request_cache[request_key].iteritems())
+
+
+def _load_course_role_ids(course_id):
+    """
+    Load the role membership for the course in two queries, regardless of
+    the number of roles.
+    """
+    roles = dict(
+        Role.objects.filter(course_id=course_id).exclude(name=FORUM_ROLE_STUDENT).values_list('id', 'name')
+    )
+    role_ids = dict((name, []) for name in roles.itervalues())
+    memberships = Role.users.through.objects.filter(role__in=roles.keys()).order_by('user').values_list('role', 'user')
+    for role_id, user_id in memberships:
+        role_ids[roles[role_id]].append(user_id)
+    return role_ids
 
 
 def has_permission(user, permission, course_id=None):
@@ -58,19 +138,24 @@ def _check_condition(user, condition, course_id, data):
     return handlers[condition](user, condition, course_id, data)
 
 
-def _check_conditions_permissions(user, permissions, course_id, **kwargs):
+def _check_conditions_permissions(user, permissions, course_id, user_permissions=None, **kwargs):
     """
     Accepts a list of permissions and proceed if any of the permission is valid.
     Note that ["can_view", "can_edit"] will proceed if the user has either
     "can_view" or "can_edit" permission. To use AND operator in between, wrap them in
     a list.
+
+    If `user_permissions` (as returned by `get_user_permissions`) is given,
+    the check is made purely against it.
     """
+    if user_permissions is None:
+        user_permissions = get_user_permissions(user, course_id)
 
     def test(user, per, operator="or"):
         if isinstance(per, basestring):
             if per in CONDITIONS:
                 return _check_condition(user, per, course_id, kwargs)
-            return cached_has_permission(user, per, course_id=course_id)
+            return per in user_permissions
         elif isinstance(per, list) and operator in ["and", "or"]:
             results = [test(user, x, operator="and") for x in per]
             if operator == "or":
@@ -109,10 +194,10 @@ VIEW_PERMISSIONS = {
 }
 
 
-def check_permissions_by_view(user, course_id, content, name):
+def check_permissions_by_view(user, course_id, content, name, user_permissions=None):
     assert isinstance(course_id, CourseKey)
     try:
         p = VIEW_PERMISSIONS[name]
     except KeyError:
         logging.warning("Permission for view named %s does not exist in permissions.py" % name)
-    return _check_conditions_permissions(user, p, course_id, content=content)
+    return _check_conditions_permissions(user, p, course_id, user_permissions=user_permissions, content=content)
@@ -4,13 +4,17 @@ import json
 import mock
 from datetime import datetime
 from pytz import UTC
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.test.utils import override_settings
 from student.tests.factories import UserFactory, CourseEnrollmentFactory
 from django_comment_client.tests.factories import RoleFactory
 from django_comment_client.tests.unicode import UnicodeTestMixin
+from django_comment_client import permissions
 import django_comment_client.utils as utils
+from request_cache.middleware import RequestCache
+from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from courseware.tests.tests import TEST_DATA_MONGO_MODULESTORE
@@ -44,6 +48,8 @@ class DictionaryTestCase(TestCase):
 @override_settings(MODULESTORE=TEST_DATA_MONGO_MODULESTORE)
 class AccessUtilsTestCase(TestCase):
     def setUp(self):
+        RequestCache.clear_request_cache()
+        permissions.CACHE.clear()
         self.course = CourseFactory.create()
         self.course_id = self.course.id
         self.student_role = RoleFactory(name='Student', course_id=self.course_id)
@@ -67,6 +73,12 @@ class AccessUtilsTestCase(TestCase):
         expected = {u'Moderator': [3], u'Community TA': [4, 5]}
         self.assertEqual(ret, expected)
 
+    def test_get_role_ids_cached_for_request(self):
+        utils.get_role_ids(self.course_id)
+        with self.assertNumQueries(0):
+            ret = utils.get_role_ids(self.course_id)
+        self.assertEqual(ret, {u'Moderator': [3], u'Community TA': [4, 5]})
+
     def test_has_forum_access(self):
         ret = utils.has_forum_access('student', self.course_id, 'Student')
         self.assertTrue(ret)
@@ -78,9 +90,80 @@ class AccessUtilsTestCase(TestCase):
         self.assertFalse(ret)
 
 
+@override_settings(MODULESTORE=TEST_DATA_MONGO_MODULESTORE)
+class AnnotatedContentInfoTestCase(TestCase):
+    def setUp(self):
+        RequestCache.clear_request_cache()
+        permissions.CACHE.clear()
+        self.course = CourseFactory.create()
+        self.course_id = self.course.id
+        self.moderator_role = RoleFactory(name='Moderator', course_id=self.course_id)
+        for name in ['edit_content', 'endorse_comment', 'openclose_thread', 'delete_comment', 'vote']:
+            self.moderator_role.add_permission(name)
+        self.moderator = UserFactory(username='moderator', email='staff@edx.org')
+        self.moderator_role.users.add(self.moderator)
+        self.author = UserFactory(username='author', email='author@edx.org')
+        self.user_info = {'upvoted_ids': [], 'downvoted_ids': [], 'subscribed_thread_ids': []}
+
+    def _make_content(self, content_id, content_type, children=()):
+        return {
+            'id': content_id,
+            'type': content_type,
+            'user_id': str(self.author.id),
+            'closed': False,
+            'children': list(children),
+        }
+
+    def test_infos_computed_from_single_permission_load(self):
+        comments = [self._make_content('comment{}'.format(i), 'comment') for i in range(50)]
+        thread = self._make_content('thread', 'thread', comments)
+        with self.assertNumQueries(2):
+            infos = utils.get_annotated_content_infos(self.course_id, thread, self.moderator, self.user_info)
+        self.assertEqual(len(infos), 51)
+        self.assertEqual(
+            infos['thread']['ability'],
+            {
+                'editable': True,
+                'can_reply': False,
+                'can_endorse': False,
+                'can_delete': False,
+                'can_openclose': True,
+                'can_vote': True,
+            }
+        )
+        self.assertEqual(
+            infos['comment0']['ability'],
+            {
+                'editable': True,
+                'can_reply': False,
+                'can_endorse': True,
+                'can_delete': True,
+                'can_openclose': False,
+                'can_vote': True,
+            }
+        )
+
+    def test_ability_is_pure_given_permissions(self):
+        comment = self._make_content('comment', 'comment')
+        with self.assertNumQueries(0):
+            ability = utils.get_ability(self.course_id, comment, self.author, user_permissions=frozenset(['vote']))
+        self.assertEqual(
+            ability,
+            {
+                'editable': False,
+                'can_reply': False,
+                'can_endorse': False,
+                'can_delete': False,
+                'can_openclose': False,
+                'can_vote': True,
+            }
+        )
+
+
 @override_settings(MODULESTORE=TEST_DATA_MONGO_MODULESTORE)
 class CoursewareContextTestCase(ModuleStoreTestCase):
     def setUp(self):
+        cache.clear()
         self.course = CourseFactory.create(org="TestX", number="101", display_name="Test Course")
         self.discussion1 = ItemFactory.create(
             parent_location=self.course.location,
@@ -137,6 +220,7 @@ class CoursewareContextTestCase(ModuleStoreTestCase):
 @override_settings(MODULESTORE=TEST_DATA_MONGO_MODULESTORE)
 class CategoryMapTestCase(ModuleStoreTestCase):
     def setUp(self):
+        cache.clear()
         self.course = CourseFactory.create(
             org="TestX", number="101", display_name="Test Course",
             # This test needs to use a course that has already started --
@@ -173,6 +257,22 @@ class CategoryMapTestCase(ModuleStoreTestCase):
             {"entries": {}, "subcategories": {}, "children": []}
         )
 
+    def test_discussion_modules_cached_per_course_version(self):
+        self.create_discussion("Chapter", "Discussion 1")
+        course = modulestore().get_course(self.course.id)
+        first_map = utils.get_discussion_category_map(course)
+        with mock.patch.object(modulestore(), 'get_items') as mock_get_items:
+            self.assertEqual(utils.get_discussion_category_map(course), first_map)
+            self.assertFalse(mock_get_items.called)
+
+        # Adding a discussion changes the course version, which must not be served stale
+        self.create_discussion("Chapter", "Discussion 2")
+        course = modulestore().get_course(self.course.id)
+        self.assertEqual(
+            utils.get_discussion_category_map(course)["subcategories"]["Chapter"]["children"],
+            ["Discussion 1", "Discussion 2"]
+        )
+
     def test_configured_topics(self):
         self.course.discussion_topics = {
             "Topic A": {"id": "Topic_A"},
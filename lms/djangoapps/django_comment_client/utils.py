@@ -4,17 +4,19 @@ import logging
 from datetime import datetime
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.db import connection
 from django.http import HttpResponse
 from django.utils import simplejson
-from django_comment_common.models import Role, FORUM_ROLE_STUDENT
-from django_comment_client.permissions import check_permissions_by_view
+from django_comment_common.models import Role
+from django_comment_client.permissions import check_permissions_by_view, get_course_role_ids, get_user_permissions
 
 from edxmako import lookup_template
 import pystache_custom as pystache
 
 from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.search import get_course_version
 from django.utils.timezone import UTC
 from opaque_keys.edx.locations import i4xEncoder
 from opaque_keys.edx.keys import CourseKey
@@ -44,8 +46,7 @@ def merge_dict(dic1, dic2):
 
 
 def get_role_ids(course_id):
-    roles = Role.objects.filter(course_id=course_id).exclude(name=FORUM_ROLE_STUDENT)
-    return dict([(role.name, list(role.users.values_list('id', flat=True))) for role in roles])
+    return get_course_role_ids(course_id)
 
 
 def has_forum_access(uname, course_id, rolename):
@@ -56,6 +57,11 @@ def has_forum_access(uname, course_id, rolename):
     return role.users.filter(username=uname).exists()
 
 
+# Discussion modules only change when the course is republished, which changes
+# its version, so this only bounds how long stale versions linger in the cache.
+DISCUSSION_MODULES_CACHE_TIMEOUT = 60 * 60 * 24
+
+
 def _get_discussion_modules(course):
     all_modules = modulestore().get_items(course.id, category='discussion')
 
@@ -69,14 +75,50 @@ def _get_discussion_modules(course):
     return filter(has_required_keys, all_modules)
 
 
+def _get_discussion_module_infos(course):
+    """
+    Return a list of plain dicts describing the course's discussion modules,
+    holding just the fields needed to build the category and id maps.
+
+    The list is cached per course version, so the discussion descriptors are
+    only loaded from the modulestore once for each published version.
+    """
+    version = get_course_version(course)
+    if version is None:
+        return _load_discussion_module_infos(course)
+
+    key = u"django_comment_client.discussion_modules.{course_id}.{version}".format(
+        course_id=course.id, version=version
+    )
+    infos = cache.get(key)
+    if infos is None:
+        infos = _load_discussion_module_infos(course)
+        cache.set(key, infos, DISCUSSION_MODULES_CACHE_TIMEOUT)
+    return infos
+
+
+def _load_discussion_module_infos(course):
+    return [
+        {
+            "discussion_id": module.discussion_id,
+            "discussion_target": module.discussion_target,
+            "discussion_category": module.discussion_category,
+            "sort_key": module.sort_key,
+            "start": module.start,
+            "location": module.location.to_deprecated_string(),
+        }
+        for module in _get_discussion_modules(course)
+    ]
+
+
 def _get_discussion_id_map(course):
-    def get_entry(module):
-        discussion_id = module.discussion_id
-        title = module.discussion_target
-        last_category = module.discussion_category.split("/")[-1].strip()
-        return (discussion_id, {"location": module.location, "title": last_category + " / " + title})
+    def get_entry(info):
+        discussion_id = info["discussion_id"]
+        title = info["discussion_target"]
+        last_category = info["discussion_category"].split("/")[-1].strip()
+        return (discussion_id, {"location": info["location"], "title": last_category + " / " + title})
 
-    return dict(map(get_entry, _get_discussion_modules(course)))
+    return dict(map(get_entry, _get_discussion_module_infos(course)))
 
 
 def _filter_unstarted_categories(category_map):
@@ -134,18 +176,18 @@ def get_discussion_category_map(course):
 
     unexpanded_category_map = defaultdict(list)
 
-    modules = _get_discussion_modules(course)
+    infos = _get_discussion_module_infos(course)
 
     is_course_cohorted = course.is_cohorted
     cohorted_discussion_ids = course.cohorted_discussions
 
-    for module in modules:
-        id = module.discussion_id
-        title = module.discussion_target
-        sort_key = module.sort_key
-        category = " / ".join([x.strip() for x in module.discussion_category.split("/")])
+    for info in infos:
+        id = info["discussion_id"]
+        title = info["discussion_target"]
+        sort_key = info["sort_key"]
+        category = " / ".join([x.strip() for x in info["discussion_category"].split("/")])
         #Handle case where module.start is None
-        entry_start_date = module.start if module.start else datetime.max.replace(tzinfo=pytz.UTC)
+        entry_start_date = info["start"] if info["start"] else datetime.max.replace(tzinfo=pytz.UTC)
         unexpanded_category_map[category].append({"title": title, "id": id, "sort_key": sort_key, "start_date": entry_start_date})
 
     category_map = {"entries": defaultdict(dict), "subcategories": defaultdict(dict)}
@@ -254,20 +296,30 @@ class QueryCountDebugMiddleware(object):
         return response
 
 
-def get_ability(course_id, content, user):
+def get_ability(course_id, content, user, user_permissions=None):
+    """
+    Return the abilities `user` has on `content`. If `user_permissions` (as
+    returned by `get_user_permissions`) is given, no permission lookups are made.
+    """
+    if user_permissions is None:
+        user_permissions = get_user_permissions(user, course_id)
+
+    def check(name):
+        return check_permissions_by_view(user, course_id, content, name, user_permissions=user_permissions)
+
     return {
-        'editable': check_permissions_by_view(user, course_id, content, "update_thread" if content['type'] == 'thread' else "update_comment"),
-        'can_reply': check_permissions_by_view(user, course_id, content, "create_comment" if content['type'] == 'thread' else "create_sub_comment"),
-        'can_endorse': check_permissions_by_view(user, course_id, content, "endorse_comment") if content['type'] == 'comment' else False,
-        'can_delete': check_permissions_by_view(user, course_id, content, "delete_thread" if content['type'] == 'thread' else "delete_comment"),
-        'can_openclose': check_permissions_by_view(user, course_id, content, "openclose_thread") if content['type'] == 'thread' else False,
-        'can_vote': check_permissions_by_view(user, course_id, content, "vote_for_thread" if content['type'] == 'thread' else "vote_for_comment"),
+        'editable': check("update_thread" if content['type'] == 'thread' else "update_comment"),
+        'can_reply': check("create_comment" if content['type'] == 'thread' else "create_sub_comment"),
+        'can_endorse': check("endorse_comment") if content['type'] == 'comment' else False,
+        'can_delete': check("delete_thread" if content['type'] == 'thread' else "delete_comment"),
+        'can_openclose': check("openclose_thread") if content['type'] == 'thread' else False,
+        'can_vote': check("vote_for_thread" if content['type'] == 'thread' else "vote_for_comment"),
     }
 
 # TODO: RENAME
 
 
-def get_annotated_content_info(course_id, content, user, user_info):
+def get_annotated_content_info(course_id, content, user, user_info, user_permissions=None):
     """
     Get metadata for an individual content (thread or comment)
     """
@@ -279,7 +331,7 @@ def get_annotated_content_info(course_id, content, user, user_info):
     return {
         'voted': voted,
         'subscribed': content['id'] in user_info['subscribed_thread_ids'],
-        'ability': get_ability(course_id, content, user),
+        'ability': get_ability(course_id, content, user, user_permissions=user_permissions),
     }
 
 # TODO: RENAME
@@ -290,9 +342,12 @@ def get_annotated_content_infos(course_id, thread, user, user_info):
     Get metadata for a thread and its children
     """
     infos = {}
+    user_permissions = get_user_permissions(user, course_id)
 
     def annotate(content):
-        infos[str(content['id'])] = get_annotated_content_info(course_id, content, user, user_info)
+        infos[str(content['id'])] = get_annotated_content_info(
+            course_id, content, user, user_info, user_permissions=user_permissions
+        )
         for child in content.get('children', []):
             annotate(child)
     annotate(thread)
@@ -352,7 +407,7 @@ def add_courseware_context(content_list, course):
     for content in content_list:
         commentable_id = content['commentable_id']
         if commentable_id in id_map:
-            location = id_map[commentable_id]["location"].to_deprecated_string()
+            location = id_map[commentable_id]["location"]
             title = id_map[commentable_id]["title"]
 
             url = reverse('jump_to', kwargs={"course_id": course.id.to_deprecated_string(),
@@ -6,11 +6,13 @@ import json
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.http import HttpResponseBadRequest
 from django.utils.timezone import utc
 from django.utils.translation import ugettext as _
 
 from courseware.models import StudentModule
+from courseware.module_render import toc_cache_key
 from xmodule.fields import Date
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
@@ -202,6 +204,8 @@ def set_due_date_extension(course, unit, student, due_date):
             set_due_date(child)
 
     set_due_date(unit)
+    # The student's table of contents shows the extended due date
+    cache.delete(toc_cache_key(student.id, course.id))
 
 
 def dump_module_extensions(course, unit):
@@ -136,6 +136,10 @@ EMAIL_FILE_PATH = ENV_TOKENS.get('EMAIL_FILE_PATH', None)
 EMAIL_HOST = ENV_TOKENS.get('EMAIL_HOST', 'localhost')  # django default is localhost
 EMAIL_PORT = ENV_TOKENS.get('EMAIL_PORT', 25)  # django default is 25
 EMAIL_USE_TLS = ENV_TOKENS.get('EMAIL_USE_TLS', False)  # django default is False
+
+XBLOCK_METRICS_SAMPLE_RATE = ENV_TOKENS.get('XBLOCK_METRICS_SAMPLE_RATE', XBLOCK_METRICS_SAMPLE_RATE)
+XBLOCK_METRICS_FLUSH_INTERVAL = ENV_TOKENS.get('XBLOCK_METRICS_FLUSH_INTERVAL', XBLOCK_METRICS_FLUSH_INTERVAL)
+
 SITE_NAME = ENV_TOKENS['SITE_NAME']
 HTTPS = ENV_TOKENS.get('HTTPS', HTTPS)
 SESSION_ENGINE = ENV_TOKENS.get('SESSION_ENGINE', SESSION_ENGINE)
@@ -264,6 +264,10 @@ FEATURES = {
     # Default to false here b/c dev environments won't have the api, will override in aws.py
     'ENABLE_ANALYTICS_ACTIVE_COUNT': False,
 
+    # Write StudentModuleHistory batches from a celery worker rather than at
+    # the end of the request that produced them
+    'ENABLE_ASYNC_STUDENT_MODULE_HISTORY': False,
+
 }
 
 # Ignore static asset files on import which match this pattern
@@ -490,6 +494,12 @@ XBLOCK_MIXINS = (LmsBlockMixin, InheritanceMixin, XModuleMixin)
 # Allow any XBlock in the LMS
 XBLOCK_SELECT_FUNCTION = prefer_xmodules
 
+# XBlock render and handler calls are counted in-process and sent to datadog
+# every XBLOCK_METRICS_FLUSH_INTERVAL seconds. Only this fraction of the calls
+# is timed for the edxapp.xmodule.duration histogram.
+XBLOCK_METRICS_SAMPLE_RATE = 0.1
+XBLOCK_METRICS_FLUSH_INTERVAL = 10
+
 ############# ModuleStore Configuration ##########
 
 MODULESTORE_BRANCH = 'published-only'
@@ -522,6 +532,8 @@ MODULESTORE = {
                     'OPTIONS': {
                         'data_dir': DATA_DIR,
                         'default_class': 'xmodule.hidden_module.HiddenDescriptor',
+                        # Number of threads loading course directories at startup
+                        'load_workers': 4,
                     }
                 },
             ]
@@ -844,6 +856,13 @@ MIDDLEWARE_CLASSES = (
     # Detects user-requested locale from 'accept-language' header in http request
     'django.middleware.locale.LocaleMiddleware',
 
+    # Writes the request's StudentModuleHistory rows in one batch
+    # needs to run before TransactionMiddleware, so it writes after the commit
+    'courseware.middleware.StudentModuleHistoryMiddleware',
+    # Invalidates the cached enrollment counts changed by the request
+    # needs to run before TransactionMiddleware, so it invalidates them after the commit
+    'student.middleware.EnrollmentCountsMiddleware',
+
     'django.middleware.transaction.TransactionMiddleware',
     # 'debug_toolbar.middleware.DebugToolbarMiddleware',
 
@@ -1249,6 +1268,7 @@ INSTALLED_APPS = (
     'licenses',
     'course_groups',
     'bulk_email',
+    'class_dashboard',
 
     # External auth (OpenID, shib)
     'external_auth',
@@ -1344,9 +1364,8 @@ VERIFY_STUDENT = {
 }
 
 ### This enables the Metrics tab for the Instructor dashboard ###########
+# The app itself is always installed so its metrics tables exist before the tab is turned on.
 FEATURES['CLASS_DASHBOARD'] = False
-if FEATURES.get('CLASS_DASHBOARD'):
-    INSTALLED_APPS += ('class_dashboard',)
 
 ######################## CAS authentication ###########################
 
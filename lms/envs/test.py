@@ -173,6 +173,23 @@ CACHES = {
 
 }
 
+# Check the shared cache on every ConfigurationModel.current(), so that tests
+# don't see configuration left behind in the process-local copies by earlier tests
+CONFIGURATION_LOCAL_CACHE_TIMEOUT = 0
+
+# Don't keep the roles of users in the shared cache, which outlives the
+# database rows (and reused user ids) of each test
+ROLE_CACHE_TIMEOUT = 0
+
+# Likewise for the per-user tables of contents of courses
+TOC_CACHE_TIMEOUT = 0
+
+# Likewise for the enrollment counts of courses
+ENROLLMENT_COUNTS_CACHE_TIMEOUT = 0
+
+# Likewise for the cohort memberships of users
+COHORT_CACHE_TIMEOUT = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
@@ -22,6 +22,8 @@ def run():
 
     add_mimetypes()
 
+    configure_xblock_metrics()
+
     if settings.FEATURES.get('USE_CUSTOM_THEME', False):
         enable_theme()
 
@@ -46,6 +48,18 @@ def add_mimetypes():
     mimetypes.add_type('application/font-woff', '.woff')
 
 
+def configure_xblock_metrics():
+    """
+    Apply the XBLOCK_METRICS_* settings to the in-process XBlock metrics aggregator.
+    """
+    from xmodule.util.metrics import BLOCK_METRICS
+
+    BLOCK_METRICS.configure(
+        sample_rate=settings.XBLOCK_METRICS_SAMPLE_RATE,
+        flush_interval=settings.XBLOCK_METRICS_FLUSH_INTERVAL,
+    )
+
+
 def enable_theme():
     """
     Enable the settings for a custom theme, whose files should be stored
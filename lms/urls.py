@@ -211,6 +211,9 @@ if settings.COURSEWARE_ENABLED:
         url(r'^courses/{}/xqueue/(?P<userid>[^/]*)/(?P<mod_id>.*?)/(?P<dispatch>[^/]*)$'.format(settings.COURSE_ID_PATTERN),
             'courseware.module_render.xqueue_callback',
             name='xqueue_callback'),
+        url(r'^courses/{}/xqueue_batch/(?P<mod_id>.*?)/(?P<dispatch>[^/]*)$'.format(settings.COURSE_ID_PATTERN),
+            'courseware.module_render.xqueue_batch_callback',
+            name='xqueue_batch_callback'),
         url(r'^change_setting$', 'student.views.change_setting',
             name='change_setting'),
 